@@ -1,10 +1,11 @@
-from typing import Iterable
+from typing import Any, Iterable
 
 from bob.field import Field
-from bob.basicField import BasicField
+from bob.basicField import BasicField, datasetNames
 from bob.temperature import Temperature
 from bob.combinedField import CombinedField
 from bob.sourceField import SourceField
+from bob.fieldExpression import FieldExpression, isFieldExpression
 
 
 def addFields(fields: Iterable[Field]) -> None:
@@ -28,5 +29,31 @@ addFields(BasicField("PhotonFlux", i) for i in range(5))
 addFields(BasicField("SGCHEM_HeatCoolRates", i) for i in range(12))
 
 
+def resolveFieldName(name: str) -> Field:
+    field = next((field for field in allFields if field.niceName == name), None)
+    if field is not None:
+        return field
+    # Names inside expressions that are not one of the fields above refer to datasets of the gas cells
+    if name not in datasetNames:
+        raise ValueError(f"Unknown field in field expression: {name}")
+    return BasicField(name)
+
+
 def getFieldByName(name: str) -> Field:
-    return next(field for field in allFields if field.niceName == name)
+    field = next((field for field in allFields if field.niceName == name), None)
+    if field is not None:
+        return field
+    if not isFieldExpression(name, resolveFieldName):
+        raise ValueError(f"Unknown field: {name}")
+    return FieldExpression(name, resolveFieldName)
+
+
+class FieldChoices(list):
+    # The names of all fields, but also accepts any valid field expression, e.g. "Density * Abundance1 / protonMass".
+    # Only the syntax and the names in the expression are checked, units are checked once it is evaluated.
+    def __contains__(self, name: Any) -> bool:
+        return super().__contains__(name) or (isinstance(name, str) and isFieldExpression(name, resolveFieldName))
+
+
+def getFieldChoices() -> FieldChoices:
+    return FieldChoices(field.niceName for field in allFields)
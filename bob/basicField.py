@@ -1,4 +1,5 @@
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Sequence, Tuple, Union
 import astropy.units as pq
 import astropy.cosmology.units as cu
 import h5py
@@ -8,7 +9,28 @@ import numpy as np
 if TYPE_CHECKING:
     from bob.snapshot import Snapshot
 
-from bob.field import Field
+import bob.config
+from bob.columnCache import ColumnCache, getColumnName
+from bob.field import Field, FieldKey
+from bob.fieldCache import fieldCache
+from bob.precision import castToFieldPrecision, getFieldDtype
+from bob.selection import Selection, FileSelection, selectionLength
+
+# Datasets of the gas cells that field expressions may refer to by name
+datasetNames = [
+    "Coordinates",
+    "Density",
+    "Masses",
+    "Velocities",
+    "InternalEnergy",
+    "ElectronAbundance",
+    "ChemicalAbundances",
+    "PhotonFlux",
+    "PhotonRates",
+    "IonizationTime",
+    "SGCHEM_HeatCoolRates",
+    "StarFormationRate",
+]
 
 
 class DatasetUnavailableError(Exception):
@@ -19,6 +41,53 @@ class DatasetUnavailableError(Exception):
         return f"DatasetUnaviableError: {self.message}"
 
 
+def splitScale(unit: Union[pq.Quantity, pq.UnitBase]) -> Tuple[float, pq.UnitBase]:
+    if isinstance(unit, pq.Quantity):
+        return unit.value, unit.unit
+    return 1.0, unit
+
+
+def getOutputDtype(dtype: np.dtype) -> np.dtype:
+    fieldDtype = getFieldDtype()
+    if np.issubdtype(dtype, np.floating) and dtype.itemsize <= fieldDtype.itemsize:
+        return dtype
+    return fieldDtype
+
+
+def getReadDtype(dtype: np.dtype, scale: float) -> np.dtype:
+    # Values are converted to cgs in double precision, since they often do not fit into float32 in cgs units.
+    # They are only reduced to the field precision afterwards.
+    if scale != 1.0:
+        return np.promote_types(dtype, np.float64) if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+    if np.issubdtype(dtype, np.floating):
+        return dtype
+    return getOutputDtype(dtype)
+
+
+def scalePiece(piece: np.ndarray, scale: float) -> None:
+    if scale != 1.0:
+        piece *= scale
+
+
+def copyPiece(piece: np.ndarray, source: np.ndarray, scale: float) -> None:
+    if scale != 1.0:
+        np.multiply(source, scale, out=piece)
+    else:
+        np.copyto(piece, source)
+
+
+def memmapDataset(dataset: h5py.Dataset) -> Optional[np.ndarray]:
+    # Only contiguous, unfiltered datasets are stored as a single block at a fixed offset in the file
+    if dataset.chunks is not None or dataset.external is not None or dataset.size == 0:
+        return None
+    if dataset.dtype != getOutputDtype(dataset.dtype) or not dataset.dtype.isnative:
+        return None
+    offset = dataset.id.get_offset()
+    if offset is None:
+        return None
+    return np.memmap(dataset.file.filename, dtype=dataset.dtype, mode="r", offset=offset, shape=dataset.shape)
+
+
 class BasicField(Field):
     def __init__(self, name: str, index: Optional[int] = None, comoving: bool = False, partType: int = 0) -> None:
         self.name = name
@@ -85,13 +154,45 @@ class BasicField(Field):
         unit *= attrs["to_cgs"]
         return unit
 
+    @property
+    def key(self) -> FieldKey:
+        return ("BasicField", self.partType, self.name, self.index)
+
+    def compute(self, snapshot: "Snapshot", inputs: Sequence[pq.Quantity]) -> pq.Quantity:
+        return self.getData(snapshot)
+
     def getData(self, snapshot: "Snapshot", indices: Optional[Any] = None) -> pq.Quantity:
+        key = (str(snapshot.path), self.partType, self.name, self.index, bob.config.precision)
+        fieldData = fieldCache.get(key)
+        if fieldData is None and indices is None:
+            fieldData = self.readData(snapshot)
+            fieldCache.add(key, fieldData)
+        if fieldData is None:
+            return self.readData(snapshot, indices)
+        if indices is None:
+            return fieldData
+        return fieldData[indices]
+
+    def readData(self, snapshot: "Snapshot", indices: Optional[Any] = None) -> pq.Quantity:
+        columnCache = ColumnCache.open(snapshot)
+        column = getColumnName(self.partType, self.name)
+        # Columns stored in a lower precision than requested (e.g. by bob convert --float32) would lose precision
+        if columnCache is None or column not in columnCache or columnCache.dtype(column).itemsize < getFieldDtype().itemsize:
+            return self.readHdf5Data(snapshot, indices)
+        fieldData = castToFieldPrecision(columnCache.read(column))
+        if self.index is not None:
+            fieldData = fieldData[:, self.index]
+        if indices is None:
+            return fieldData
+        return fieldData[indices]
+
+    def readHdf5Data(self, snapshot: "Snapshot", indices: Optional[Any] = None) -> pq.Quantity:
         partTypeKey = f"PartType{self.partType}"
-        files = snapshot.hdf5FilesWithDataset(partTypeKey)
-        if len(files) == 0:
+        filenames = snapshot.filenamesWithDataset(partTypeKey)
+        if len(filenames) == 0:
             raise DatasetUnavailableError(f"Dataset {self.partType}/{self.name} not available in snapshot {snapshot}")
         try:
-            unit = self.getArbitraryUnit(snapshot, files[0][partTypeKey][self.name])
+            unit = self.getArbitraryUnit(snapshot, snapshot.hdf5File(filenames[0])[partTypeKey][self.name])
         except KeyError:
             if self.name == "ChemicalAbundances":
                 unit = pq.dimensionless_unscaled
@@ -105,10 +206,61 @@ class BasicField(Field):
                 unit = pq.g * snapshot.sim.params["UnitMass_in_g"]
             else:
                 raise ValueError("Fix units for field: {}".format(self.name))
-        if indices is None:
-            indices = ...
-        fieldData = np.concatenate(list(f[f"PartType{self.partType}"][self.name][...] * unit for f in files))
+        counts = [snapshot.numPartThisFile(f)[self.partType] for f in filenames]
+        selection = Selection.fromIndices(indices, sum(counts))
+        if selection is None:
+            return self.getData(snapshot)[indices]
+        fileSelections = selection.splitByFile(counts)
+        dataset = snapshot.hdf5File(filenames[0])[partTypeKey][self.name]
+        scale, unit = splitScale(unit)
+        if len(filenames) == 1 and scale == 1.0:
+            # Values that need no conversion can be handed out directly from the page cache
+            mappedData = memmapDataset(dataset)
+            if mappedData is not None:
+                fieldData = mappedData[self.sourceSelection(fileSelections[0])]
+                return selection.restoreOrder(pq.Quantity(fieldData, unit, copy=False))
+        shape = (sum(selectionLength(fileSelection) for fileSelection in fileSelections),)
+        if self.index is None:
+            shape += dataset.shape[1:]
+        fieldData = np.empty(shape, dtype=getReadDtype(dataset.dtype, scale))
+        mappedPieces = []
+        datasetPieces = []
+        start = 0
+        for filename, fileSelection in zip(filenames, fileSelections):
+            length = selectionLength(fileSelection)
+            if length > 0:
+                dataset = snapshot.hdf5File(filename)[partTypeKey][self.name]
+                piece = fieldData[start : start + length]
+                mappedData = memmapDataset(dataset) if len(filenames) > 1 else None
+                if mappedData is not None:
+                    mappedPieces.append((piece, mappedData[self.sourceSelection(fileSelection)]))
+                else:
+                    datasetPieces.append((piece, dataset, self.sourceSelection(fileSelection)))
+            start += length
+        # h5py serializes all calls to the HDF5 library, so only pieces that can be copied straight out of the
+        # file mapping are read in threads, while the other pieces are read from the HDF5 files meanwhile.
+        executor = None
+        copies = []
+        if len(mappedPieces) > 1:
+            executor = ThreadPoolExecutor(max_workers=max(1, min(bob.config.numReadThreads, len(mappedPieces))))
+            copies = [executor.submit(copyPiece, piece, source, scale) for (piece, source) in mappedPieces]
+        else:
+            for piece, source in mappedPieces:
+                copyPiece(piece, source, scale)
+        try:
+            for piece, dataset, sourceSelection in datasetPieces:
+                dataset.read_direct(piece, sourceSelection)
+                scalePiece(piece, scale)
+            for copy in copies:
+                copy.result()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        fieldData = castToFieldPrecision(fieldData)
+        return selection.restoreOrder(pq.Quantity(fieldData, unit, copy=False))
+
+    def sourceSelection(self, selection: FileSelection) -> Any:
         if self.index is None:
-            return fieldData[indices]
+            return np.s_[selection]
         else:
-            return fieldData[indices, self.index]
+            return np.s_[selection, self.index]
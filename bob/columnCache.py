@@ -0,0 +1,55 @@
+from pathlib import Path
+from typing import Dict, List, Optional, TYPE_CHECKING
+import numpy as np
+import astropy.units as pq
+import yaml
+
+import bob.config
+from bob.result import numpyFileEnding, unitFileEnding, readUnit
+from bob.util import getFileStats, yamlLoader
+
+if TYPE_CHECKING:
+    from bob.snapshot import Snapshot
+
+
+def getColumnFolder(snapshot: "Snapshot") -> Path:
+    return snapshot.sim.folder / bob.config.columnCacheFolder / snapshot.path.name
+
+
+def getColumnName(partType: int, name: str) -> str:
+    return f"PartType{partType}_{name}"
+
+
+class ColumnCache:
+    def __init__(self, folder: Path, columns: List[str], dtypes: Dict[str, str]) -> None:
+        self.folder = folder
+        self.columns = columns
+        self.dtypes = dtypes
+
+    @staticmethod
+    def open(snapshot: "Snapshot") -> Optional["ColumnCache"]:
+        folder = getColumnFolder(snapshot)
+        metadataFile = folder / bob.config.columnCacheMetadataFileName
+        if not metadataFile.is_file():
+            return None
+        with metadataFile.open("r") as f:
+            metadata = yaml.load(f, Loader=yamlLoader)
+        # The columns are stale as soon as any file of the snapshot has been rewritten
+        if metadata["stats"] != getFileStats(snapshot.filenames):
+            return None
+        return ColumnCache(folder, metadata["columns"], metadata.get("dtypes", {}))
+
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+
+    def dtype(self, column: str) -> np.dtype:
+        if column in self.dtypes:
+            return np.dtype(self.dtypes[column])
+        # Columns converted before the dtypes were recorded
+        return np.load((self.folder / column).with_suffix(numpyFileEnding), mmap_mode="r").dtype
+
+    def read(self, column: str) -> pq.Quantity:
+        filenameBase = self.folder / column
+        unit = readUnit(filenameBase.with_suffix(unitFileEnding))
+        data = np.load(filenameBase.with_suffix(numpyFileEnding), mmap_mode="r")
+        return pq.Quantity(data, unit, copy=False)
@@ -2,7 +2,7 @@ import astropy.units as pq
 
 from typing import Sequence, Optional
 import numpy as np
-from bob.field import Field
+from bob.field import Field, FieldKey
 from bob.snapshot import Snapshot
 
 
@@ -17,8 +17,14 @@ class CombinedField(Field):
         self.colors = colors
         self.fields = fields
 
-    def getData(self, snapshot: Snapshot) -> np.ndarray:
-        data = [field.getData(snapshot) for field in self.fields]
+    @property
+    def key(self) -> FieldKey:
+        return ("CombinedField", tuple(field.key for field in self.fields), tuple(tuple(color) for color in self.colors))
+
+    def inputs(self, snapshot: Snapshot) -> Sequence[Field]:
+        return self.fields
+
+    def compute(self, snapshot: Snapshot, data: Sequence[pq.Quantity]) -> np.ndarray:
         return sum((np.outer((d - np.min(d)) / (np.max(d) - np.min(d)), color) for (d, color) in zip(data, self.colors)), np.array([0.0, 0.0, 0.0]))
 
     @property
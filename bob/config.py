@@ -5,14 +5,55 @@ cpuLogFile = "cpu.txt"
 
 # Bob names
 picFolder = "pics"
+snapshotIndexFileName = "snapshotIndex.yaml"
+simulationCatalogFileName = "simulationCatalog.sqlite"
+sweepLogCacheFileName = "sweepLog.npz"
+cpuLogCacheFileName = "cpuLog.npz"
+columnCacheFolder = "columns"
+columnCacheMetadataFileName = "columns.yaml"
+spatialIndexFolder = "spatialIndex"
+derivedFieldCacheFolder = "derivedFields"
+
+# Number of consecutive cells that share a bounding box in the spatial index
+spatialIndexBlockSize = 4096
 
 # Plot settings
 dpi = 600
 
 plotSerializationFileName = "plot.info"
+resultFingerprintFileName = "result.fingerprint"
+snapshotValuesFileName = "snapshotValues.pickle"
+runJournalSuffix = ".journal"
 
 defaultTimeUnit = pq.yr
 
 numProcesses = 30
 
+# Processes that render plots while the next results are computed and the number of plots that may wait for them
+numRenderProcesses = 4
+renderQueueSize = 16
+
+# Floating point precision (float32 or float64) in which fields are loaded and results are stored
+precision = "float64"
+
+# Maximum number of simultaneously open snapshot files per process
+maxOpenHdf5Files = 64
+
+# Number of cells that chunked field computations process at once
+fieldChunkSize = 2**18
+
+# Number of threads reading the files of a multi-file snapshot concurrently
+numReadThreads = 8
+
+# Memory budget (in bytes) for snapshot fields that are kept in memory so that
+# multiple postprocessing functions can reuse them
+fieldCacheSize = 4 * 1024**3
+
+# Folder for derived fields (like the temperature) that are stored on disk so that later runs do not
+# have to recompute them. None: a folder in each simulation directory
+derivedFieldCacheDir = None
+
+# Maximum total size (in bytes) of the stored derived fields per folder, 0 disables storing them
+derivedFieldCacheSize = 20 * 1024**3
+
 possibleImageSuffixes = ["png", "pdf"]
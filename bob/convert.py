@@ -0,0 +1,54 @@
+import logging
+import os
+from typing import List
+import numpy as np
+import yaml
+
+import bob.config
+from bob.basicField import BasicField, DatasetUnavailableError
+from bob.columnCache import getColumnFolder, getColumnName
+from bob.result import numpyFileEnding, unitFileEnding, saveUnit
+from bob.simulation import Simulation
+from bob.snapshot import Snapshot
+from bob.snapshotFilter import SnapshotFilter
+from bob.util import getFileStats
+
+defaultFields = ["Coordinates", "Density", "Masses", "ChemicalAbundances", "InternalEnergy", "IonizationTime"]
+
+
+def convertSnapshot(snapshot: Snapshot, fields: List[str], dtype: np.dtype) -> None:
+    folder = getColumnFolder(snapshot)
+    folder.mkdir(parents=True, exist_ok=True)
+    metadataFile = folder / bob.config.columnCacheMetadataFileName
+    # Invalidate the old columns before overwriting them so that an interrupted conversion is never used
+    metadataFile.unlink(missing_ok=True)
+    stats = getFileStats(snapshot.filenames)
+    columns = []
+    dtypes = {}
+    for name in fields:
+        field = BasicField(name)
+        try:
+            data = field.readHdf5Data(snapshot)
+        except (DatasetUnavailableError, KeyError):
+            logging.info(f"Field {name} not available in {snapshot}, skipping")
+            continue
+        column = getColumnName(field.partType, name)
+        values = data.value
+        # Values that would overflow in the requested dtype (e.g. masses in g in float32) are stored as they are
+        if values.size == 0 or np.nanmax(np.abs(values)) <= np.finfo(dtype).max:
+            values = values.astype(dtype, copy=False)
+        np.save(folder / f"{column}{numpyFileEnding}", values)
+        saveUnit(folder / f"{column}{unitFileEnding}", data.unit)
+        columns.append(column)
+        dtypes[column] = values.dtype.name
+    tempFile = metadataFile.with_name(f".{metadataFile.name}")
+    with tempFile.open("w") as f:
+        yaml.dump({"stats": stats, "columns": columns, "dtypes": dtypes}, f)
+    os.replace(tempFile, metadataFile)
+    snapshot.close()
+
+
+def convertSimulation(sim: Simulation, fields: List[str], dtype: np.dtype, snapshotFilter: SnapshotFilter) -> None:
+    for snapshot in snapshotFilter.get_snapshots(sim):
+        logging.info(f"Converting {snapshot}")
+        convertSnapshot(snapshot, fields, dtype)
@@ -0,0 +1,70 @@
+from functools import lru_cache
+from typing import Any
+import numpy as np
+import astropy.units as pq
+from astropy.cosmology import FlatLambdaCDM
+
+# Range of scale factors covered by the tables, values outside are computed by astropy directly
+minScaleFactor = 1e-4
+maxScaleFactor = 2.0
+numTablePoints = 8001
+
+# Maximum relative error of the interpolated ages, checked against astropy when the tables are built
+maxRelativeError = 1e-6
+
+timeUnit = pq.Gyr
+
+
+def getScaleFactorValue(scaleFactor: Any) -> np.ndarray:
+    return np.asarray(pq.Quantity(scaleFactor).to_value(pq.dimensionless_unscaled), dtype=np.float64)
+
+
+class CosmologyTables:
+    # Age of the universe on a dense grid in ln(a). In ln(age) over ln(a), the age is almost linear
+    # (exactly linear during matter domination), so linear interpolation is very accurate and it
+    # works in both directions since the age is monotonic.
+    def __init__(self, cosmology: FlatLambdaCDM) -> None:
+        self.cosmology = cosmology
+        self.lnScaleFactors = np.linspace(np.log(minScaleFactor), np.log(maxScaleFactor), numTablePoints)
+        self.lnAges = np.log(self.astropyAge(np.exp(self.lnScaleFactors)))
+        midpoints = 0.5 * (self.lnScaleFactors[1:] + self.lnScaleFactors[:-1])
+        exact = self.astropyAge(np.exp(midpoints))
+        interpolated = np.exp(np.interp(midpoints, self.lnScaleFactors, self.lnAges))
+        error = np.max(np.abs(interpolated / exact - 1.0))
+        assert error < maxRelativeError, f"Interpolation error of cosmology tables too large: {error}"
+        # Taken from the tables so that the lookback time is exactly zero today
+        self.ageToday = self.age(1.0).value
+
+    def astropyAge(self, scaleFactor: np.ndarray) -> np.ndarray:
+        return self.cosmology.age(1.0 / scaleFactor - 1.0).to_value(timeUnit)
+
+    def isInTable(self, scaleFactor: np.ndarray) -> np.ndarray:
+        return (scaleFactor >= minScaleFactor) & (scaleFactor <= maxScaleFactor)
+
+    def age(self, scaleFactor: Any) -> pq.Quantity:
+        scaleFactor = getScaleFactorValue(scaleFactor)
+        inTable = self.isInTable(scaleFactor)
+        with np.errstate(divide="ignore"):
+            lnScaleFactor = np.log(np.where(inTable, scaleFactor, 1.0))
+        ages = np.where(inTable, np.exp(np.interp(lnScaleFactor, self.lnScaleFactors, self.lnAges)), 0.0)
+        if not np.all(inTable):
+            ages = np.where(inTable, ages, self.astropyAge(np.where(inTable, 1.0, scaleFactor)))
+        return ages * timeUnit
+
+    def lookbackTime(self, scaleFactor: Any) -> pq.Quantity:
+        return self.ageToday * timeUnit - self.age(scaleFactor)
+
+    def scaleFactorAtAge(self, age: pq.Quantity) -> pq.Quantity:
+        ages = np.asarray(age.to_value(timeUnit), dtype=np.float64)
+        lnAges = np.log(np.clip(ages, np.exp(self.lnAges[0]), np.exp(self.lnAges[-1])))
+        scaleFactors = np.exp(np.interp(lnAges, self.lnAges, self.lnScaleFactors))
+        # Infinite ages are mapped to a scale factor of zero (infinite redshift)
+        scaleFactors = np.where(np.isfinite(ages), scaleFactors, 0.0)
+        if np.any(np.isfinite(ages) & ((ages < np.exp(self.lnAges[0])) | (ages > np.exp(self.lnAges[-1])))):
+            raise ValueError(f"Age outside of the tabulated range ({np.exp(self.lnAges[0])} - {np.exp(self.lnAges[-1])} {timeUnit})")
+        return scaleFactors * pq.dimensionless_unscaled
+
+
+@lru_cache(maxsize=None)
+def getCosmologyTables(H0: float, Om0: float, Ob0: float) -> CosmologyTables:
+    return CosmologyTables(FlatLambdaCDM(H0=H0, Om0=Om0, Ob0=Ob0))
@@ -0,0 +1,153 @@
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import astropy.units as pq
+
+import bob.config
+from bob.logPosition import LogPosition
+
+# The first line of each block, e.g. "Step 123, Time: 0.25, CPUs: 64, MultiDomains: 8, HighestActiveTimeBin: 20"
+stepRegex = re.compile(r"^Step (\d+), Time: ([0-9.eE+-]+)")
+
+# Blocks are separated by a blank line
+blockSeparator = b"\n\n"
+
+# Size of the first chunk read from the end of the file when looking for the last block
+tailChunkSize = 64 * 1024
+
+
+class Entry:
+    def __init__(self, name: str, time: pq.Quantity, cumTime: pq.Quantity) -> None:
+        self.name = name
+        self.time = time
+        self.cumTime = cumTime
+
+
+def parseEntry(line: str) -> Entry:
+    split = line.split()
+    return Entry(split[0], float(split[1]) * pq.s, float(split[3]) * pq.s)
+
+
+def parseBlock(block: List[str]) -> Tuple[Entry, List[Entry]]:
+    totalLine = block[2]  # after the step line and the header line
+    assert "total" in totalLine
+    total = parseEntry(totalLine)
+    topLevelEntries = [parseEntry(line) for line in block if line.startswith("  ") and line[2] != " "]
+    return total, topLevelEntries
+
+
+# Returns the lines of the last block without reading the rest of the file
+def readLastBlock(filename: Path) -> List[str]:
+    with filename.open("rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        chunkSize = tailChunkSize
+        while True:
+            start = max(0, end - chunkSize)
+            f.seek(start)
+            lines = f.read(end - start).rstrip().split(b"\n")
+            # The first line of the chunk is incomplete unless the chunk starts at the beginning of the file
+            blankLines = [i for (i, line) in enumerate(lines) if line.strip() == b"" and (i > 0 or start == 0)]
+            if len(blankLines) > 0 or start == 0:
+                blockStart = blankLines[-1] + 1 if len(blankLines) > 0 else 0
+                return [line.decode(errors="replace") for line in lines[blockStart:]]
+            chunkSize *= 2
+
+
+def parseBlocks(data: bytes) -> List[Tuple[int, float, Dict[str, float]]]:
+    rows = []
+    for blockData in data.split(blockSeparator):
+        block = blockData.decode(errors="replace").strip("\n").split("\n")
+        match = stepRegex.match(block[0])
+        if match is None:
+            continue
+        total, entries = parseBlock(block)
+        cumTimes = {entry.name: entry.cumTime.to_value(pq.s) for entry in [total, *entries]}
+        rows.append((int(match.group(1)), float(match.group(2)), cumTimes))
+    return rows
+
+
+class CpuLog:
+    # The cumulative time of each top level timer (and the total) for every block of a cpu.txt file, as a matrix
+    # with one row per block. The matrix is cached together with the position up to which the file was parsed,
+    # so that later runs only parse the blocks that were appended since.
+    def __init__(self, steps: np.ndarray, times: np.ndarray, names: List[str], cumTimes: np.ndarray, position: LogPosition) -> None:
+        self.steps = steps
+        self.times = times
+        self.names = names
+        self.cumTimes = cumTimes
+        self.position = position
+
+    @staticmethod
+    def empty() -> "CpuLog":
+        return CpuLog(np.zeros(0, dtype=np.int64), np.zeros(0), [], np.zeros((0, 0)), LogPosition())
+
+    @staticmethod
+    def load(filename: Path) -> Optional["CpuLog"]:
+        if not filename.is_file():
+            return None
+        try:
+            with np.load(filename) as data:
+                return CpuLog(
+                    data["steps"],
+                    data["times"],
+                    [str(name) for name in data["names"]],
+                    data["cumTimes"],
+                    LogPosition(int(data["offset"]), str(data["tailHash"])),
+                )
+        except (OSError, ValueError, KeyError) as e:
+            logging.debug(f"Ignoring invalid cpu log cache {filename}: {e}")
+            return None
+
+    def save(self, filename: Path) -> None:
+        tempFilename = filename.with_name(f".{filename.name}.{os.getpid()}")
+        try:
+            with tempFilename.open("wb") as f:
+                np.savez(
+                    f,
+                    steps=self.steps,
+                    times=self.times,
+                    names=np.array(self.names, dtype=str),
+                    cumTimes=self.cumTimes,
+                    offset=np.array(self.position.offset),
+                    tailHash=np.array(self.position.tailHash),
+                )
+            os.replace(tempFilename, filename)
+        except OSError as e:
+            logging.debug(f"Could not write cpu log cache {filename}: {e}")
+
+    def update(self, cpuFile: Path) -> bool:
+        previousOffset = self.position.offset
+        rows: List[Tuple[int, float, Dict[str, float]]] = []
+        restarted = self.position.readAppended(cpuFile, blockSeparator, lambda data: rows.extend(parseBlocks(data)))
+        if restarted:
+            empty = CpuLog.empty()
+            self.steps, self.times, self.names, self.cumTimes = empty.steps, empty.times, empty.names, empty.cumTimes
+        self.addRows(rows)
+        return restarted or self.position.offset != previousOffset
+
+    def addRows(self, rows: List[Tuple[int, float, Dict[str, float]]]) -> None:
+        names = self.names + [name for name in dict.fromkeys(name for (_, _, cumTimes) in rows for name in cumTimes) if name not in self.names]
+        # Timers that do not appear in a block are nan
+        cumTimes = np.full((len(self.steps) + len(rows), len(names)), np.nan)
+        cumTimes[: len(self.steps), : len(self.names)] = self.cumTimes
+        columns = {name: i for (i, name) in enumerate(names)}
+        for i, (_, _, rowCumTimes) in enumerate(rows):
+            for name, cumTime in rowCumTimes.items():
+                cumTimes[len(self.steps) + i, columns[name]] = cumTime
+        self.steps = np.concatenate([self.steps, np.array([step for (step, _, _) in rows], dtype=np.int64)])
+        self.times = np.concatenate([self.times, np.array([time for (_, time, _) in rows])])
+        self.names = names
+        self.cumTimes = cumTimes
+
+
+def readCpuLog(simFolder: Path, cpuFile: Path) -> CpuLog:
+    cacheFile = simFolder / bob.config.cpuLogCacheFileName
+    cpuLog = CpuLog.load(cacheFile)
+    if cpuLog is None:
+        cpuLog = CpuLog.empty()
+    if cpuLog.update(cpuFile):
+        cpuLog.save(cacheFile)
+    return cpuLog
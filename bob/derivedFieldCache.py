@@ -0,0 +1,97 @@
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional, TYPE_CHECKING
+import numpy as np
+import astropy.units as pq
+
+import bob.config
+from bob.fingerprint import getCodeVersion, getFingerprint
+from bob.result import numpyFileEnding, unitFileEnding, readUnit, saveUnit
+from bob.util import getFileStats
+
+if TYPE_CHECKING:
+    from bob.field import Field
+    from bob.snapshot import Snapshot
+
+
+def getDerivedFieldCacheFolder(snapshot: "Snapshot") -> Path:
+    if bob.config.derivedFieldCacheDir is not None:
+        return Path(bob.config.derivedFieldCacheDir)
+    return snapshot.sim.folder / bob.config.derivedFieldCacheFolder
+
+
+def getDerivedFieldFingerprint(snapshot: "Snapshot", field: "Field") -> str:
+    dependencies = [filename for filename in [snapshot.sim.folder / "bobParams.yaml", *field.dependencies(snapshot)] if filename.is_file()]
+    return getFingerprint(
+        str(snapshot.path.resolve()),
+        getFileStats(snapshot.filenames),
+        [str(filename) for filename in dependencies],
+        getFileStats(dependencies),
+        field.key,
+        bob.config.precision,
+        getCodeVersion(),
+    )
+
+
+class DerivedFieldCache:
+    # Fields computed from snapshots, stored as npy files named by the fingerprint of everything the data depends on.
+    # The modification time of the files is used to evict the least recently used entries.
+    def __init__(self, folder: Path) -> None:
+        self.folder = folder
+
+    def get(self, fingerprint: str) -> Optional[pq.Quantity]:
+        dataFile = (self.folder / fingerprint).with_suffix(numpyFileEnding)
+        unitFile = (self.folder / fingerprint).with_suffix(unitFileEnding)
+        try:
+            unit = readUnit(unitFile)
+            data = np.load(dataFile, mmap_mode="r")
+            os.utime(dataFile)
+        except (OSError, ValueError):
+            return None
+        return pq.Quantity(data, unit, copy=False)
+
+    def add(self, fingerprint: str, data: pq.Quantity) -> None:
+        dataFile = (self.folder / fingerprint).with_suffix(numpyFileEnding)
+        tempFile = dataFile.with_name(f".{dataFile.name}.{os.getpid()}")
+        try:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            saveUnit((self.folder / fingerprint).with_suffix(unitFileEnding), data.unit)
+            with tempFile.open("wb") as f:
+                np.save(f, data.value)
+            # Concurrent processes may compute the same field, so the data file is never visible half-written
+            os.replace(tempFile, dataFile)
+        except OSError as e:
+            logging.debug(f"Could not write derived field {dataFile}: {e}")
+            tempFile.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        entries: List[os.stat_result] = []
+        dataFiles = []
+        for dataFile in self.folder.glob(f"*{numpyFileEnding}"):
+            try:
+                entries.append(dataFile.stat())
+                dataFiles.append(dataFile)
+            except FileNotFoundError:
+                continue
+        size = sum(entry.st_size for entry in entries)
+        for entry, dataFile in sorted(zip(entries, dataFiles), key=lambda item: item[0].st_mtime_ns):
+            if size <= bob.config.derivedFieldCacheSize:
+                break
+            dataFile.unlink(missing_ok=True)
+            dataFile.with_suffix(unitFileEnding).unlink(missing_ok=True)
+            size -= entry.st_size
+
+
+def readDerivedField(snapshot: "Snapshot", field: "Field") -> Optional[pq.Quantity]:
+    if bob.config.derivedFieldCacheSize <= 0:
+        return None
+    return DerivedFieldCache(getDerivedFieldCacheFolder(snapshot)).get(getDerivedFieldFingerprint(snapshot, field))
+
+
+def storeDerivedField(snapshot: "Snapshot", field: "Field", data: pq.Quantity) -> None:
+    if bob.config.derivedFieldCacheSize <= 0 or not isinstance(data, pq.Quantity) or data.nbytes > bob.config.derivedFieldCacheSize:
+        return
+    DerivedFieldCache(getDerivedFieldCacheFolder(snapshot)).add(getDerivedFieldFingerprint(snapshot, field), data)
@@ -1,4 +1,5 @@
 import numpy as np
+from typing import Sequence
 from bob.field import Field
 from bob.basicField import BasicField
 from bob.snapshot import Snapshot
@@ -6,14 +7,15 @@ import astropy.units as pq
 
 
 class ElectronAbundance(Field):
-    def getData(self, snapshot: Snapshot) -> np.ndarray:
-        try:
-            xHP = BasicField("ChemicalAbundances", 1).getData(snapshot)
-            electronAbundance = xHP
-        except ValueError as e:
-            print(e)
+    def inputs(self, snapshot: Snapshot) -> Sequence[Field]:
+        if len(snapshot.filenamesWithDataset("PartType0/ChemicalAbundances")) > 0:
+            return [BasicField("ChemicalAbundances", 1)]
+        else:
             print("TNG style snapshot, using ElectronAbundance")
-            electronAbundance = BasicField("ElectronAbundance").getData(snapshot)
+            return [BasicField("ElectronAbundance")]
+
+    def compute(self, snapshot: Snapshot, inputs: Sequence[pq.Quantity]) -> np.ndarray:
+        (electronAbundance,) = inputs
         return electronAbundance
 
     @property
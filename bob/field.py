@@ -1,16 +1,44 @@
 import astropy.units as pq
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from bob.fieldEvaluation import evaluateFields
 
 if TYPE_CHECKING:
     from bob.snapshot import Snapshot
 
+FieldKey = Tuple[Any, ...]
+
 
 class Field(ABC):
+    # Whether the computed data is worth storing in the derived field cache on disk
+    persistent = False
+
+    # Fields that are stored in the derived field cache are memory-mapped, so only the selected cells are read from them
+    def getData(self, snapshot: "Snapshot", indices: Optional[Any] = None) -> pq.Quantity:
+        data = evaluateFields(snapshot, [self])[0]
+        if indices is None:
+            return data
+        return data[indices]
+
+    # The fields whose data is passed to compute
+    def inputs(self, snapshot: "Snapshot") -> Sequence["Field"]:
+        return []
+
+    # Files other than the snapshot that the computed data depends on
+    def dependencies(self, snapshot: "Snapshot") -> List[Path]:
+        return []
+
     @abstractmethod
-    def getData(self, snapshot: "Snapshot") -> pq.Quantity:
+    def compute(self, snapshot: "Snapshot", inputs: Sequence[pq.Quantity]) -> pq.Quantity:
         pass
 
+    # Fields with the same key always compute the same data
+    @property
+    def key(self) -> FieldKey:
+        return (type(self).__name__,)
+
     @property
     @abstractmethod
     def niceName(self) -> str:
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import astropy.units as pq
+
+import bob.config
+
+# (snapshot path, part type, dataset name, column index, precision) for basic fields,
+# (snapshot path, *field key, precision) for derived fields
+FieldCacheKey = Tuple[Any, ...]
+
+
+class FieldCache:
+    def __init__(self) -> None:
+        self.entries: "OrderedDict[FieldCacheKey, pq.Quantity]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Number of processes that share the memory budget, each of them has its own cache
+        self.numProcesses = 1
+
+    @property
+    def maxSize(self) -> int:
+        return bob.config.fieldCacheSize // self.numProcesses
+
+    def get(self, key: FieldCacheKey) -> Optional[pq.Quantity]:
+        data = self.entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return data
+
+    def add(self, key: FieldCacheKey, data: pq.Quantity) -> None:
+        if data.nbytes > self.maxSize:
+            return
+        # Entries are shared between all callers, so make sure nobody modifies them in place
+        data.flags.writeable = False
+        self.remove(key)
+        self.entries[key] = data
+        self.size += data.nbytes
+        self.evict()
+
+    def remove(self, key: FieldCacheKey) -> None:
+        data = self.entries.pop(key, None)
+        if data is not None:
+            self.size -= data.nbytes
+
+    def evict(self) -> None:
+        while self.size > self.maxSize:
+            _, data = self.entries.popitem(last=False)
+            self.size -= data.nbytes
+
+    def removeSnapshot(self, snapshotPath: str) -> None:
+        for key in [key for key in self.entries if key[0] == snapshotPath]:
+            self.remove(key)
+
+    def clear(self) -> None:
+        self.entries = OrderedDict()
+        self.size = 0
+
+    # Adds the hits and misses of the cache of a worker process
+    def addStatistics(self, hits: int, misses: int) -> None:
+        self.hits += hits
+        self.misses += misses
+
+    def summary(self) -> str:
+        return f"Field cache: {self.hits} hits, {self.misses} misses, {len(self.entries)} fields ({self.size / 1024**2:.1f} MiB) in memory"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+fieldCache = FieldCache()
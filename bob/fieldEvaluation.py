@@ -0,0 +1,91 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+import astropy.units as pq
+
+import bob.config
+from bob.derivedFieldCache import readDerivedField, storeDerivedField
+from bob.fieldCache import FieldCacheKey, fieldCache
+
+if TYPE_CHECKING:
+    from bob.field import Field, FieldKey
+    from bob.snapshot import Snapshot
+
+
+# Keys of the fields that loadFields has put into the field cache for the snapshot that is being processed
+loadedKeys: Set["FieldKey"] = set()
+
+
+def getFieldCacheKey(snapshot: "Snapshot", field: "Field") -> FieldCacheKey:
+    return (str(snapshot.path),) + field.key + (bob.config.precision,)
+
+
+# If stored is given, fields are looked up in the field cache and persistent fields in the derived field cache
+# first. The inputs of fields that are found there are not needed and the data is put into stored instead.
+def getEvaluationOrder(
+    snapshot: "Snapshot", fields: Sequence["Field"], stored: Optional[Dict["FieldKey", pq.Quantity]] = None
+) -> Tuple[List["FieldKey"], Dict["FieldKey", "Field"], Dict["FieldKey", List["FieldKey"]]]:
+    nodes: Dict["FieldKey", "Field"] = {}
+    inputs: Dict["FieldKey", List["FieldKey"]] = {}
+    order: List["FieldKey"] = []
+
+    def visit(field: "Field") -> None:
+        key = field.key
+        if key in nodes:
+            return
+        nodes[key] = field
+        if stored is not None:
+            data = fieldCache.get(getFieldCacheKey(snapshot, field)) if key in loadedKeys else None
+            if data is None and field.persistent:
+                data = readDerivedField(snapshot, field)
+            if data is not None:
+                stored[key] = data
+                inputs[key] = []
+                order.append(key)
+                return
+        fieldInputs = field.inputs(snapshot)
+        inputs[key] = [inputField.key for inputField in fieldInputs]
+        for inputField in fieldInputs:
+            visit(inputField)
+        order.append(key)
+
+    for field in fields:
+        visit(field)
+    return order, nodes, inputs
+
+
+# Evaluates the fields and all their (transitive) inputs exactly once. Intermediate
+# results are released as soon as the last field that depends on them has been computed.
+def evaluateFields(snapshot: "Snapshot", fields: Sequence["Field"]) -> List[pq.Quantity]:
+    stored: Dict["FieldKey", pq.Quantity] = {}
+    order, nodes, inputs = getEvaluationOrder(snapshot, fields, stored)
+    numConsumers: Counter = Counter(field.key for field in fields)
+    for key in order:
+        numConsumers.update(inputs[key])
+    values: Dict["FieldKey", pq.Quantity] = {}
+    for key in order:
+        if key in stored:
+            values[key] = stored.pop(key)
+        else:
+            values[key] = nodes[key].compute(snapshot, [values[inputKey] for inputKey in inputs[key]])
+            if nodes[key].persistent:
+                storeDerivedField(snapshot, nodes[key], values[key])
+        for inputKey in inputs[key]:
+            numConsumers[inputKey] -= 1
+            if numConsumers[inputKey] == 0:
+                del values[inputKey]
+    return [values[field.key] for field in fields]
+
+
+# Evaluates the fields and keeps their data in the field cache, so that they are not computed again
+# while the snapshot is being processed
+def loadFields(snapshot: "Snapshot", fields: Sequence["Field"]) -> None:
+    for field, data in zip(fields, evaluateFields(snapshot, fields)):
+        # Fields without inputs are read from the snapshot and cache their data themselves
+        if len(field.inputs(snapshot)) > 0:
+            fieldCache.add(getFieldCacheKey(snapshot, field), data)
+            loadedKeys.add(field.key)
+
+
+def releaseFields(snapshot: "Snapshot") -> None:
+    fieldCache.removeSnapshot(str(snapshot.path))
+    loadedKeys.clear()
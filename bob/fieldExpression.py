@@ -0,0 +1,305 @@
+import ast
+import re
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+import astropy.units as pq
+import astropy.cosmology.units as cu
+
+import bob.constants
+from bob.basicField import BasicField, datasetNames
+from bob.field import Field, FieldKey
+from bob.fieldCache import fieldCache
+from bob.fieldEvaluation import getFieldCacheKey
+
+if TYPE_CHECKING:
+    from bob.snapshot import Snapshot
+
+FieldResolver = Callable[[str], Field]
+
+constants = {name: value for (name, value) in vars(bob.constants).items() if isinstance(value, (int, float, pq.Quantity))}
+
+
+class Term:
+    # A value of the evaluation. Owned values are temporaries of the evaluation that may be overwritten.
+    def __init__(self, value: Any, unit: pq.UnitBase, owned: bool = False) -> None:
+        self.value = value
+        self.unit = unit
+        self.owned = owned
+
+
+def applyUfunc(ufunc: np.ufunc, *terms: Term) -> Any:
+    values = [term.value for term in terms]
+    shape = np.broadcast_shapes(*[np.shape(value) for value in values])
+    dtype = np.result_type(*values)
+    for term in terms:
+        if term.owned and term.value.shape == shape and term.value.dtype == dtype:
+            return ufunc(*values, out=term.value)
+    return ufunc(*values)
+
+
+def makeTerm(value: Any, unit: pq.UnitBase) -> Term:
+    return Term(value, unit, isinstance(value, np.ndarray) and value.ndim > 0)
+
+
+def scaleTerm(term: Term, factor: float) -> Term:
+    if factor == 1.0:
+        return term
+    return makeTerm(applyUfunc(np.multiply, term, Term(factor, pq.dimensionless_unscaled)), term.unit)
+
+
+class Node(ABC):
+    @abstractmethod
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        pass
+
+    # Only advisory: the nominal units of the fields are not the units of their data (Masses has none, for example),
+    # so this is only used as the default plot unit and never to validate expressions. Incompatible units are
+    # reported when the expression is evaluated with the units of the data.
+    @abstractmethod
+    def nominalUnit(self) -> pq.UnitBase:
+        pass
+
+    def fields(self) -> List[Field]:
+        return []
+
+
+class FieldNode(Node):
+    def __init__(self, field: Field) -> None:
+        self.field = field
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        data = values[self.field.key]
+        if isinstance(data, pq.Quantity):
+            return Term(data.value, data.unit)
+        return Term(np.asarray(data), pq.dimensionless_unscaled)
+
+    def nominalUnit(self) -> pq.UnitBase:
+        unit = self.field.unit
+        if isinstance(unit, (pq.UnitBase, pq.Quantity)):
+            return pq.Unit(unit)
+        return pq.dimensionless_unscaled
+
+    def fields(self) -> List[Field]:
+        return [self.field]
+
+
+class ConstantNode(Node):
+    def __init__(self, value: Any) -> None:
+        self.value = pq.Quantity(value)
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        return Term(self.value.value, self.value.unit)
+
+    def nominalUnit(self) -> pq.UnitBase:
+        return self.value.unit
+
+
+class BinaryNode(Node):
+    def __init__(self, op: ast.operator, left: Node, right: Node) -> None:
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        left = self.left.evaluate(values, equivalencies)
+        right = self.right.evaluate(values, equivalencies)
+        if isinstance(self.op, (ast.Add, ast.Sub)):
+            ufunc: np.ufunc = np.add if isinstance(self.op, ast.Add) else np.subtract
+            factor = right.unit.to(left.unit, equivalencies=equivalencies)
+            # Convert whichever operand is a temporary already, so that no additional array is needed
+            if left.owned and not right.owned:
+                left = scaleTerm(left, 1.0 / factor)
+                return makeTerm(applyUfunc(ufunc, left, right), right.unit)
+            right = scaleTerm(right, factor)
+            return makeTerm(applyUfunc(ufunc, left, right), left.unit)
+        if isinstance(self.op, ast.Mult):
+            return makeTerm(applyUfunc(np.multiply, left, right), left.unit * right.unit)
+        if isinstance(self.op, ast.Div):
+            return makeTerm(applyUfunc(np.true_divide, left, right), left.unit / right.unit)
+        raise ValueError(f"Unsupported operator: {type(self.op).__name__}")
+
+    def nominalUnit(self) -> pq.UnitBase:
+        if isinstance(self.op, ast.Mult):
+            return self.left.nominalUnit() * self.right.nominalUnit()
+        if isinstance(self.op, ast.Div):
+            return self.left.nominalUnit() / self.right.nominalUnit()
+        return self.left.nominalUnit()
+
+    def fields(self) -> List[Field]:
+        return self.left.fields() + self.right.fields()
+
+
+class PowerNode(Node):
+    def __init__(self, base: Node, exponent: float) -> None:
+        self.base = base
+        self.exponent = exponent
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        base = self.base.evaluate(values, equivalencies)
+        return makeTerm(applyUfunc(np.power, base, Term(self.exponent, pq.dimensionless_unscaled)), base.unit**self.exponent)
+
+    def nominalUnit(self) -> pq.UnitBase:
+        return self.base.nominalUnit() ** self.exponent
+
+    def fields(self) -> List[Field]:
+        return self.base.fields()
+
+
+class NegativeNode(Node):
+    def __init__(self, operand: Node) -> None:
+        self.operand = operand
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        operand = self.operand.evaluate(values, equivalencies)
+        return makeTerm(applyUfunc(np.negative, operand), operand.unit)
+
+    def nominalUnit(self) -> pq.UnitBase:
+        return self.operand.nominalUnit()
+
+    def fields(self) -> List[Field]:
+        return self.operand.fields()
+
+
+# Functions that require a dimensionless argument
+dimensionlessFunctions: Dict[str, np.ufunc] = {"log10": np.log10, "log": np.log, "exp": np.exp}
+
+
+class FunctionNode(Node):
+    def __init__(self, name: str, argument: Node) -> None:
+        if name not in dimensionlessFunctions and name not in ["sqrt", "abs"]:
+            raise ValueError(f"Unknown function in field expression: {name}")
+        self.name = name
+        self.argument = argument
+
+    def evaluate(self, values: Dict[FieldKey, pq.Quantity], equivalencies: Any) -> Term:
+        argument = self.argument.evaluate(values, equivalencies)
+        if self.name == "sqrt":
+            return makeTerm(applyUfunc(np.sqrt, argument), argument.unit**0.5)
+        if self.name == "abs":
+            return makeTerm(applyUfunc(np.abs, argument), argument.unit)
+        argument = scaleTerm(argument, argument.unit.to(pq.dimensionless_unscaled, equivalencies=equivalencies))
+        return makeTerm(applyUfunc(dimensionlessFunctions[self.name], argument), pq.dimensionless_unscaled)
+
+    def nominalUnit(self) -> pq.UnitBase:
+        if self.name == "sqrt":
+            return self.argument.nominalUnit() ** 0.5
+        if self.name == "abs":
+            return self.argument.nominalUnit()
+        return pq.dimensionless_unscaled
+
+    def fields(self) -> List[Field]:
+        return self.argument.fields()
+
+
+def getConstantValue(node: ast.expr) -> float:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = getConstantValue(node.operand)
+        return -value if isinstance(node.op, ast.USub) else value
+    raise ValueError("Exponents in field expressions need to be numbers")
+
+
+def compileNode(node: ast.expr, resolveField: FieldResolver) -> Node:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return ConstantNode(float(node.value))
+    if isinstance(node, ast.Name):
+        if node.id in constants:
+            return ConstantNode(constants[node.id])
+        return FieldNode(resolveField(node.id))
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name):
+        # Column of a dataset, e.g. ChemicalAbundances[1]
+        if not (isinstance(node.slice, ast.Constant) and type(node.slice.value) == int):
+            raise ValueError("Dataset columns in field expressions need to be integers")
+        if node.value.id not in datasetNames:
+            raise ValueError(f"Unknown dataset in field expression: {node.value.id}")
+        return FieldNode(BasicField(node.value.id, node.slice.value))
+    if isinstance(node, ast.BinOp):
+        if isinstance(node.op, ast.Pow):
+            return PowerNode(compileNode(node.left, resolveField), getConstantValue(node.right))
+        return BinaryNode(node.op, compileNode(node.left, resolveField), compileNode(node.right, resolveField))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return NegativeNode(compileNode(node.operand, resolveField))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.UAdd):
+        return compileNode(node.operand, resolveField)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and len(node.args) == 1 and len(node.keywords) == 0:
+        return FunctionNode(node.func.id, compileNode(node.args[0], resolveField))
+    raise ValueError(f"Unsupported syntax in field expression: {ast.unparse(node)}")
+
+
+def parseExpression(expression: str) -> ast.expr:
+    try:
+        return ast.parse(expression.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid field expression: {expression}") from e
+
+
+def isFieldExpression(expression: Any, resolveField: FieldResolver) -> bool:
+    # Plain names are not expressions, so that misspelled field names are still reported
+    try:
+        tree = parseExpression(expression)
+        if isinstance(tree, ast.Name):
+            return False
+        compileNode(tree, resolveField)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+# Expressions contain characters that should not end up in file names
+def getFieldFileName(name: str) -> str:
+    return re.sub(r"\W+", "_", name).strip("_")
+
+
+class FieldExpression(Field):
+    def __init__(self, expression: str, resolveField: FieldResolver) -> None:
+        self.expression = expression
+        tree = parseExpression(expression)
+        self.normalizedExpression = ast.unparse(tree)
+        self.root = compileNode(tree, resolveField)
+        fields: Dict[FieldKey, Field] = {}
+        for field in self.root.fields():
+            fields.setdefault(field.key, field)
+        self.fields = list(fields.values())
+
+    @property
+    def key(self) -> FieldKey:
+        return ("FieldExpression", self.normalizedExpression)
+
+    def inputs(self, snapshot: "Snapshot") -> Sequence[Field]:
+        return self.fields
+
+    def compute(self, snapshot: "Snapshot", inputs: Sequence[pq.Quantity]) -> pq.Quantity:
+        values = {field.key: data for (field, data) in zip(self.fields, inputs)}
+        try:
+            result = self.root.evaluate(values, cu.with_H0(snapshot.H0))
+        except pq.UnitConversionError as e:
+            raise ValueError(f"Incompatible units in field expression {self.expression}: {e}") from e
+        return pq.Quantity(result.value, result.unit, copy=False)
+
+    def getData(self, snapshot: "Snapshot", indices: Optional[Any] = None) -> pq.Quantity:
+        key = getFieldCacheKey(snapshot, self)
+        data = fieldCache.get(key)
+        if data is None:
+            data = super().getData(snapshot)
+            fieldCache.add(key, data)
+        if indices is None:
+            return data
+        return data[indices]
+
+    @property
+    def niceName(self) -> str:
+        return self.expression
+
+    @property
+    def symbol(self) -> str:
+        return self.expression
+
+    # The default unit of plots of the expression, see Node.nominalUnit
+    @property
+    def unit(self) -> pq.UnitBase:
+        try:
+            return self.root.nominalUnit()
+        except pq.UnitsError:
+            return pq.dimensionless_unscaled
@@ -8,5 +8,5 @@ def getDataForRadii(data: pq.Quantity, center: pq.Quantity, coordinates: pq.Quan
     distanceToCenter = np.linalg.norm(coordinates - center, axis=1)
     f = np.mean if mean else np.sum
     for i, radius in enumerate(radii):
-        result[i] = f(data[np.where((distanceToCenter > radius - width) & (distanceToCenter < radius + width))])  # type: ignore[operator]
+        result[i] = f(data[np.where((distanceToCenter > radius - width) & (distanceToCenter < radius + width))], dtype=np.float64)  # type: ignore[operator]
     return result
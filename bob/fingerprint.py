@@ -0,0 +1,19 @@
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+
+# Changes whenever any source file of bob changes, so that everything computed by an older version is recomputed
+@lru_cache(maxsize=None)
+def getCodeVersion() -> str:
+    package = Path(__file__).parent
+    sha = hashlib.sha256()
+    for filename in sorted(package.rglob("*.py")):
+        sha.update(str(filename.relative_to(package)).encode())
+        sha.update(filename.read_bytes())
+    return sha.hexdigest()
+
+
+def getFingerprint(*items: Any) -> str:
+    return hashlib.sha256(repr(items).encode()).hexdigest()
@@ -27,7 +27,7 @@ class GroupFile:
 class GroupFiles:
     def __init__(self, sims: SimulationSet, groupFolder: Path) -> None:
         timeEpsilon = 9e-8
-        originalScaleFactors = [sim.icsFile().attrs["Time"] for sim in sims]
+        originalScaleFactors = [sim.icsTime for sim in sims]
         assert len(originalScaleFactors) > 0
         originalScaleFactor = originalScaleFactors[0]
         assert all(isclose(s, originalScaleFactor) for s in originalScaleFactors)
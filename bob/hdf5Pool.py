@@ -0,0 +1,48 @@
+from collections import OrderedDict
+from pathlib import Path
+import atexit
+import h5py
+
+import bob.config
+
+
+class Hdf5Pool:
+    def __init__(self) -> None:
+        self.files: "OrderedDict[Path, h5py.File]" = OrderedDict()
+
+    def get(self, path: Path) -> h5py.File:
+        f = self.files.get(path)
+        if f is not None and f.id.valid:
+            self.files.move_to_end(path)
+            return f
+        f = h5py.File(path, "r")
+        self.files[path] = f
+        self.evict()
+        return f
+
+    def evict(self) -> None:
+        while len(self.files) > max(1, bob.config.maxOpenHdf5Files):
+            _, f = self.files.popitem(last=False)
+            f.close()
+
+    def close(self, path: Path) -> None:
+        f = self.files.pop(path, None)
+        if f is not None:
+            f.close()
+
+    def closeAll(self) -> None:
+        while len(self.files) > 0:
+            _, f = self.files.popitem()
+            f.close()
+
+    def reset(self) -> None:
+        # Handles inherited from the parent process after a fork share the HDF5 library state
+        # of the parent, so the child should open its own instead of reusing them.
+        self.files = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+
+hdf5Pool = Hdf5Pool()
+atexit.register(hdf5Pool.closeAll)
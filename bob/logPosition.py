@@ -0,0 +1,49 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+# Number of bytes before the position that are used to recognize that the file was
+# only appended to since the last read (and not rewritten)
+tailSize = 4096
+
+# Appended data is read in blocks of roughly this size
+blockSize = 64 * 1024**2
+
+
+def getTailHash(f: BinaryIO, offset: int) -> str:
+    start = max(0, offset - tailSize)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+class LogPosition:
+    # The position up to which a log file that is only ever appended to has been parsed
+    def __init__(self, offset: int = 0, tailHash: str = hashlib.sha256(b"").hexdigest()) -> None:
+        self.offset = offset
+        self.tailHash = tailHash
+
+    # Calls parse with the data appended since the last call, in chunks that end with the separator.
+    # Data after the last separator is incomplete and left for the next call. Returns whether the file
+    # was rewritten, in which case parse has been called with all of its data again.
+    def readAppended(self, filename: Path, separator: bytes, parse: Callable[[bytes], None]) -> bool:
+        with filename.open("rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            restarted = size < self.offset or getTailHash(f, self.offset) != self.tailHash
+            if restarted:
+                self.offset = 0
+            f.seek(self.offset)
+            rest = b""
+            while True:
+                block = f.read(blockSize)
+                if len(block) == 0:
+                    break
+                block = rest + block
+                end = block.rfind(separator)
+                end = 0 if end == -1 else end + len(separator)
+                if end > 0:
+                    parse(block[:end])
+                self.offset += end
+                rest = block[end:]
+            self.tailHash = getTailHash(f, self.offset)
+        return restarted
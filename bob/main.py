@@ -1,6 +1,7 @@
 from pathlib import Path
 import logging
 import argparse
+import numpy as np
 
 from bob.simulationSet import getSimsFromFolders, SimulationSet
 from bob.raxiomSimulation import RaxiomSimulation
@@ -10,6 +11,9 @@ from bob.plotter import Plotter, PlotFilters, PlotFilter
 from bob.postprocess import getFunctionsFromPlotFile, setMatplotlibStyle, runFunctionsWithPlotter, create_pic_folder, generatePlotConfig
 from bob.run import runPlotConfig
 from bob.report import createReport
+from bob.convert import convertSimulation, defaultFields
+from bob.snapshotFilter import SnapshotFilter
+from bob.precision import precisions
 import bob.config
 
 from bob.postprocess import readPlotFile
@@ -20,6 +24,36 @@ def setupArgs() -> argparse.Namespace:
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     parser.add_argument("-r", "--raxiom", action="store_true", help="Run on raxiom simulations")
     parser.add_argument("--num-threads", type=int, default=20, nargs="?", help="Number of worker threads to use")
+    parser.add_argument(
+        "--max-open-files", type=int, default=bob.config.maxOpenHdf5Files, help="Maximum number of snapshot files to keep open at the same time"
+    )
+    parser.add_argument(
+        "--num-read-threads", type=int, default=bob.config.numReadThreads, help="Number of threads reading the files of a snapshot concurrently"
+    )
+    parser.add_argument(
+        "--precision", choices=precisions, default=bob.config.precision, help="Default floating point precision of fields and results"
+    )
+    parser.add_argument(
+        "--derived-field-cache-dir", type=Path, help="Folder in which computed fields are stored (default: a folder in each simulation directory)"
+    )
+    parser.add_argument(
+        "--derived-field-cache-size",
+        type=int,
+        default=bob.config.derivedFieldCacheSize,
+        help="Maximum size of the stored computed fields in bytes, 0 disables storing them",
+    )
+    parser.add_argument(
+        "--field-cache-size",
+        type=int,
+        default=bob.config.fieldCacheSize,
+        help="Memory in bytes for snapshot fields that are kept for reuse, shared between all worker processes",
+    )
+    parser.add_argument(
+        "--num-render-processes",
+        type=int,
+        default=bob.config.numRenderProcesses,
+        help="Number of processes rendering plots while the next results are computed, 0 renders them in between",
+    )
     parser.add_argument("--hide", action="store_true", help="Do not show figures in terminal before saving them")
     parser.add_argument("--post", action="store_true", help="Only postprocess the data, do not run the corresponding plot scripts (for cluster)")
 
@@ -28,6 +62,8 @@ def setupArgs() -> argparse.Namespace:
     plotParser = subparsers.add_parser("plot")
     plotParser.add_argument("simFolders", type=Path, nargs="+", help="Path to simulation directories")
     plotParser.add_argument("plot", type=Path, help="The plot configuration")
+    plotParser.add_argument("--force", action="store_true", help="Recompute all results, even those whose inputs have not changed")
+    plotParser.add_argument("--resume", action="store_true", help="Skip all plots that an earlier, interrupted run of the plot file has completed")
 
     replotParser = subparsers.add_parser("replot")
     replotParser.add_argument("simFolders", type=Path, nargs="+", help="Path to simulation directories")
@@ -46,6 +82,13 @@ def setupArgs() -> argparse.Namespace:
 
     runParser = subparsers.add_parser("run")
     runParser.add_argument("plots", type=Path, nargs="*", help="The plot configurations to run")
+    runParser.add_argument("--resume", action="store_true", help="Continue the interrupted runs of the plot configurations")
+
+    convertParser = subparsers.add_parser("convert")
+    convertParser.add_argument("simFolders", type=Path, nargs="+", help="Path to simulation directories")
+    convertParser.add_argument("--fields", type=str, nargs="+", default=defaultFields, help="The fields to convert")
+    convertParser.add_argument("--snapshots", type=int, nargs="+", help="The snapshots to convert (default: all)")
+    convertParser.add_argument("--float32", action="store_true", help="Store the fields in single precision")
 
     reportParser = subparsers.add_parser("report")
     reportParser.add_argument("simFolder", type=Path, nargs="?", help="Path to simulation directory")
@@ -74,6 +117,13 @@ def setupAstropy() -> None:
 def main() -> None:
     args = setupArgs()
     bob.config.numProcesses = args.num_threads
+    bob.config.numRenderProcesses = args.num_render_processes
+    bob.config.fieldCacheSize = args.field_cache_size
+    bob.config.maxOpenHdf5Files = args.max_open_files
+    bob.config.numReadThreads = args.num_read_threads
+    bob.config.precision = args.precision
+    bob.config.derivedFieldCacheDir = args.derived_field_cache_dir
+    bob.config.derivedFieldCacheSize = args.derived_field_cache_size
     setupLogging(args)
     setupAstropy()
     sim_type = RaxiomSimulation if args.raxiom else Simulation
@@ -92,16 +142,27 @@ def main() -> None:
     elif args.function == "plot":
         sims = getSimsFromFolders(sim_type, args.simFolders)
         parent_folder = getCommonParentFolder(args.simFolders)
-        plotter = Plotter(parent_folder, sims, args.post, not args.hide)
+        plotter = Plotter(parent_folder, sims, args.post, not args.hide, args.force)
         functions = getFunctionsFromPlotFile(args.plot, True)
         create_pic_folder(parent_folder)
-        _ = list(runFunctionsWithPlotter(plotter, functions))
+        plotter.openJournal(args.plot, args.resume)
+        if not args.post:
+            plotter.startRenderQueue()
+        try:
+            _ = list(runFunctionsWithPlotter(plotter, functions))
+        finally:
+            plotter.finishRendering()
+            plotter.closeJournal()
     elif args.function == "generate":
         for name in args.plots:
             generatePlotConfig(name)
     elif args.function == "run":
         for name in args.plots:
-            runPlotConfig(name)
+            runPlotConfig(name, args.resume)
+    elif args.function == "convert":
+        dtype = np.dtype(np.float32) if args.float32 else np.dtype(np.float64)
+        for sim in getSimsFromFolders(sim_type, args.simFolders):
+            convertSimulation(sim, args.fields, dtype, SnapshotFilter(args.snapshots))
     elif args.function == "report":
         createReport(Path(".") if args.simFolder is None else args.simFolder)
     else:
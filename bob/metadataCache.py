@@ -0,0 +1,22 @@
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class MetadataCache:
+    # Lazily computed values that are expensive to derive (they read files or search directories).
+    # Only plain values should be stored, so that objects holding the cache can be sent to worker
+    # processes cheaply. Values that were computed for a different version are recomputed.
+    def __init__(self) -> None:
+        self.values: Dict[str, Tuple[Hashable, Any]] = {}
+
+    def get(self, name: str, compute: Callable[[], Any], version: Hashable = None) -> Any:
+        entry = self.values.get(name)
+        if entry is None or entry[0] != version:
+            entry = (version, compute())
+            self.values[name] = entry
+        return entry[1]
+
+    def invalidate(self, name: str) -> None:
+        self.values.pop(name, None)
+
+    def clear(self) -> None:
+        self.values = {}
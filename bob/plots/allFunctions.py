@@ -24,6 +24,7 @@ from bob.plots.meanIonizationRedshift import MeanIonizationRedshift
 from bob.plots.sourceField import SourceField
 from bob.plots.resolvedEscapeFraction import ResolvedEscapeFraction
 from bob.plots.runTime import RunTime
+from bob.plots.runTimeHistory import RunTimeHistory
 from bob.plots.h2Expansion import H2Expansion
 
 postprocessingFunctions: List[Type[PostprocessingFunction]] = [
@@ -50,6 +51,7 @@ postprocessingFunctions: List[Type[PostprocessingFunction]] = [
     SourceField,
     ResolvedEscapeFraction,
     RunTime,
+    RunTimeHistory,
     H2Expansion,
 ]
 
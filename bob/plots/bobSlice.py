@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Any, List, Optional, Tuple
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
 from scipy.spatial import cKDTree
@@ -11,23 +11,43 @@ from bob.snapshot import Snapshot
 from bob import config
 from bob.postprocessingFunctions import SnapFn
 from bob.result import Result
-from bob.allFields import allFields, getFieldByName
+from bob.allFields import getFieldByName, getFieldChoices
+from bob.fieldExpression import getFieldFileName
 from bob.field import Field
+from bob.basicField import BasicField
+from bob.spatialIndex import Slab, getRegionIndices
 from bob.plotConfig import PlotConfig
 
 
-def getDataAtPoints(field: Field, snapshot: Snapshot, points: pq.Quantity) -> np.ndarray:
-    coords = snapshot.coordinates.to(snapshot.lengthUnit / cu.littleh, cu.with_H0(snapshot.H0)).value
+def getFieldData(field: Field, snapshot: Snapshot, indices: Optional[np.ndarray]) -> pq.Quantity:
+    if indices is None:
+        return field.getData(snapshot)
+    if isinstance(field, BasicField):
+        return field.getData(snapshot, indices)
+    return field.getData(snapshot)[indices]
+
+
+def getDataAtPoints(field: Field, snapshot: Snapshot, points: pq.Quantity, indices: Optional[np.ndarray] = None) -> np.ndarray:
+    coords = getFieldData(BasicField("Coordinates", comoving=True), snapshot, indices)
+    coords = coords.to(snapshot.lengthUnit / cu.littleh, cu.with_H0(snapshot.H0)).value
     tree = cKDTree(coords)
     cellIndices = tree.query(points.to(snapshot.lengthUnit))[1]
-    data = field.getData(snapshot)
+    data = getFieldData(field, snapshot, indices)
     return data[cellIndices]
 
 
-def getSlice(field: Field, snapshot: Snapshot, axisName: str, position: float) -> Tuple[Tuple[float, float, float, float], pq.Quantity]:
+def getSlice(
+    field: Field, snapshot: Snapshot, axisName: str, position: float, thickness: Optional[float] = None
+) -> Tuple[Tuple[float, float, float, float], pq.Quantity]:
     axis = getAxisByName(axisName)
     axis = np.array(axis)
     center = (snapshot.maxExtent * axis) * position
+    indices = None
+    if thickness is not None:
+        # Only look up cells within a slab of the given thickness (relative to the box size) around the slice
+        halfWidth = np.dot(axis, snapshot.maxExtent - snapshot.minExtent) * thickness * 0.5
+        slabCenter = np.dot(axis, center)
+        indices = getRegionIndices(snapshot, [Slab(int(np.argmax(axis)), slabCenter - halfWidth, slabCenter + halfWidth)])
     ortho1, ortho2 = findOrthogonalAxes(axis)
     min1 = np.dot(ortho1, snapshot.minExtent)
     min2 = np.dot(ortho2, snapshot.minExtent)
@@ -37,7 +57,7 @@ def getSlice(field: Field, snapshot: Snapshot, axisName: str, position: float) -
     n2 = config.dpi * 1
     p1, p2 = np.meshgrid(np.linspace(min1, max1, n1), np.linspace(min2, max2, n2))
     coordinates = axis * (center * axis) + np.outer(p1, ortho1) + np.outer(p2, ortho2)
-    data = getDataAtPoints(field, snapshot, coordinates)
+    data = getDataAtPoints(field, snapshot, coordinates, indices)
     if len(data.shape) == 1:
         return (min1, max1, min2, max2), data.reshape((n1, n2))
     else:
@@ -48,7 +68,7 @@ class Slice(SnapFn):
     def __init__(self, config: PlotConfig) -> None:
         super().__init__(config)
         self.config.setDefault("axis", "z", choices=["x", "y", "z"])
-        self.config.setDefault("field", "Abundance1", choices=[f.niceName for f in allFields])
+        self.config.setDefault("field", "Abundance1", choices=getFieldChoices())
         xAxis, yAxis = getOtherAxes(config["axis"])
         self.config.setDefault("xLabel", f"${xAxis} [UNIT]$")
         self.config.setDefault("yLabel", f"${yAxis} [UNIT]$")
@@ -65,15 +85,25 @@ class Slice(SnapFn):
         self.config.setDefault("logmax1", 0)
         self.config.setDefault("logmax2", 0)
         self.config.setDefault("relativePosition", 0.5)
+        self.config.setDefault("slabThickness", None)  # relative to the box size, None: search the whole box
         self.config.setDefault("name", self.name + "_{simName}_{snapName}_{field}_{axis}")
 
     @property
     def field(self) -> Field:
         return getFieldByName(self.config["field"])
 
+    def getName(self, **kwargs: Any) -> str:
+        return super().getName(**{"field": getFieldFileName(self.config["field"]), **kwargs})
+
+    def requiredFields(self, sim: Simulation, snap: Snapshot) -> List[Field]:
+        # With a slab, only the cells in the slab are read
+        if self.config["slabThickness"] is not None:
+            return []
+        return [BasicField("Coordinates", comoving=True), self.field]
+
     def post(self, sim: Simulation, snap: Snapshot) -> Result:
         result = super().post(sim, snap)
-        (extent, result.data) = getSlice(self.field, snap, self.config["axis"], self.config["relativePosition"])
+        (extent, result.data) = getSlice(self.field, snap, self.config["axis"], self.config["relativePosition"], self.config["slabThickness"])
         result.data = result.data.to(self.config["vUnit"], cu.with_H0(snap.H0))
         result.extent = list(extent)
         print(f"Field: {self.field.niceName}: min: {np.min(result.data):.2e}, mean: {np.mean(result.data):.2e}, max: {np.max(result.data):.2e}")
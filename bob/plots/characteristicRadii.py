@@ -17,6 +17,8 @@ from bob.ray import getRandomRaysFrom
 
 
 class CharacteristicRadiiOverTime(TimePlot):
+    quantityConfigKeys = ["yUnit", "numRays", "numPointsAlongRay", "rayLength"]
+
     def __init__(self, config: PlotConfig) -> None:
         super().__init__(config)
         self.config.setDefault("yUnit", pq.kpc)
@@ -68,7 +70,7 @@ def getCharacteristicRadiiReallySlowly(snap: Snapshot, distance: pq.Quantity) ->
     print(f"Found {clustering.n_clusters_} clusters for snap: {snap}.")
 
     def clusterRadius(i: int) -> pq.Quantity:
-        totalVolume = np.sum(volumes[np.where(clustering.labels_ == i)])
+        totalVolume = np.sum(volumes[np.where(clustering.labels_ == i)], dtype=np.float64)
         return 3.0 / (4.0 * np.pi) * np.cbrt(totalVolume)
 
     result = Result()
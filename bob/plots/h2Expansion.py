@@ -1,3 +1,4 @@
+from typing import List
 import matplotlib.pyplot as plt
 import numpy as np
 import astropy.units as pq
@@ -8,8 +9,10 @@ from bob.postprocessingFunctions import SnapFn
 from bob.result import Result
 from bob.plotConfig import PlotConfig
 from bob.fieldOverRadius import getDataForRadii
+from bob.field import Field
 from bob.basicField import BasicField
 from bob.temperature import Temperature
+from bob.fieldEvaluation import evaluateFields
 
 
 class H2Expansion(SnapFn):
@@ -21,16 +24,16 @@ class H2Expansion(SnapFn):
         self.config.setDefault("xUnit", "pc")
         self.config.setDefault("yUnit", "1 / s")
 
+    def requiredFields(self, sim: Simulation, snap: Snapshot) -> List[Field]:
+        return [BasicField("Coordinates"), BasicField("ChemicalAbundances"), BasicField("PhotonFlux"), Temperature()]
+
     def post(self, sim: Simulation, snap: Snapshot) -> Result:
         result = Result()
         boxSize = sim.params["BoxSize"] / 2.0
         lengthUnit = sim.params["UnitLength_in_cm"] * pq.cm
         result.radii = np.linspace(0, boxSize, num=self.config["num"]) * lengthUnit
-        coordinates = BasicField("Coordinates").getData(snap)
         center = np.array([1, 1, 1]) * boxSize * lengthUnit
-        abundances = BasicField("ChemicalAbundances").getData(snap)
-        fluxes = BasicField("PhotonFlux").getData(snap)
-        temperature = Temperature().getData(snap)
+        coordinates, abundances, fluxes, temperature = evaluateFields(snap, self.requiredFields(sim, snap))
 
         result.ab0 = getDataForRadii(abundances[:, 0], center, coordinates, result.radii)
         result.ab1 = getDataForRadii(abundances[:, 1], center, coordinates, result.radii)
@@ -1,3 +1,5 @@
+from abc import abstractmethod
+from typing import List, Tuple
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.colors as colors
@@ -11,6 +13,7 @@ from bob.result import Result
 from bob.basicField import BasicField
 from bob.plotConfig import PlotConfig
 from bob.field import Field
+from bob.fieldEvaluation import evaluateFields
 
 
 class Histogram(SnapFn):
@@ -20,12 +23,26 @@ class Histogram(SnapFn):
         ionizedStr = "_only_ionized" if self.config["only_ionized"] else ""
         self.config.setDefault("name", self.config["name"] + f"{ionizedStr}")
 
-    def postHistogram(self, sim: Simulation, snap: Snapshot, fieldX: Field, fieldY: Field) -> Result:
+    @abstractmethod
+    def getHistogramFields(self) -> Tuple[Field, Field]:
+        pass
+
+    def getFields(self) -> List[Field]:
+        fields = list(self.getHistogramFields())
+        if self.config["only_ionized"]:
+            fields.append(BasicField("ChemicalAbundances", 1))
+        return fields
+
+    def requiredFields(self, sim: Simulation, snap: Snapshot) -> List[Field]:
+        return self.getFields()
+
+    def post(self, sim: Simulation, snap: Snapshot) -> Result:
         result = super().post(sim, snap)
-        dataX = fieldX.getData(snap).to_value(self.config["xUnit"], cu.with_H0(snap.H0))
-        dataY = fieldY.getData(snap).to_value(self.config["yUnit"], cu.with_H0(snap.H0))
+        data = evaluateFields(snap, self.getFields())
+        dataX = data[0].to_value(self.config["xUnit"], cu.with_H0(snap.H0))
+        dataY = data[1].to_value(self.config["yUnit"], cu.with_H0(snap.H0))
         if self.config["only_ionized"]:
-            hpAbundance = BasicField("ChemicalAbundances", 1).getData(snap)
+            hpAbundance = data[2]
             indices = np.where(hpAbundance > 0.5)
             dataX = dataX[indices]
             dataY = dataY[indices]
@@ -1,4 +1,3 @@
-import re
 import itertools
 from typing import List, Tuple, Dict, Any
 import numpy as np
@@ -8,13 +7,13 @@ import matplotlib.ticker
 
 import astropy.units as pq
 
-from bob.util import getArrayQuantity
 from bob.simulation import Simulation
 from bob.postprocessingFunctions import MultiSetFn
 from bob.result import Result
 from bob.multiSet import MultiSet
 from bob.plotConfig import PlotConfig
 from bob.timeUtils import TimeQuantity
+from bob.sweepLog import readSweepLog
 
 
 def printOnce(s: str, previousRuns: Dict[str, bool] = {}) -> None:
@@ -37,26 +36,28 @@ class IonizationData(Result):
             self.addSims(sims)
 
     def addSims(self, sims: List[Simulation]) -> None:
-        data = []
+        scaleFactors, redshifts, columns = [], [], []
         for sim in sims:
-            regex = re.compile(
-                "SWEEP: Time ([0-9.+]+): Volume Av. H ionization: ([0-9.+]+), Mass Av. H ionization: ([0-9.+]+), Volume av. Ionization rate: ([0-9.+-e]+), Mass av. Ionization rate: ([0-9.+-e]+)"
-            )
-            for line in sim.log:
-                match = regex.match(line)
-                if match is not None:
-                    (time, *remainder) = [float(x) for x in match.groups()]
-                    time = time * sim.timeUnit
-                    timeQuantity = TimeQuantity(sim, time)
-                    redshift = timeQuantity.redshift()
-                    data.append((timeQuantity.scaleFactor(), redshift, *remainder))
-
-        self.time.append(getArrayQuantity([d[0] for d in data]))
-        self.redshift.append(getArrayQuantity([d[1] for d in data]))
-        self.volumeAv.append((1.0 - np.array([d[2] for d in data])) * pq.dimensionless_unscaled)
-        self.massAv.append((1.0 - np.array([d[3] for d in data])) * pq.dimensionless_unscaled)
-        self.volumeAvRate.append(np.array([d[4] for d in data]) / pq.s)
-        self.massAvRate.append(np.array([d[5] for d in data]) / pq.s)
+            sweepLog = readSweepLog(sim.folder)
+            # Runs without SWEEP records give an empty curve, even if they are not cosmological
+            if len(sweepLog["time"]) == 0:
+                scaleFactors.append(np.zeros(0) * pq.dimensionless_unscaled)
+                redshifts.append(np.zeros(0) * pq.dimensionless_unscaled)
+            else:
+                timeQuantity = TimeQuantity(sim, sweepLog["time"] * sim.timeUnit)
+                scaleFactors.append(timeQuantity.scaleFactor())
+                redshifts.append(timeQuantity.redshift())
+            columns.append(sweepLog)
+
+        def joinColumn(name: str) -> np.ndarray:
+            return np.concatenate([sweepLog[name] for sweepLog in columns])
+
+        self.time.append(np.concatenate(scaleFactors))
+        self.redshift.append(np.concatenate(redshifts))
+        self.volumeAv.append((1.0 - joinColumn("volumeAv")) * pq.dimensionless_unscaled)
+        self.massAv.append((1.0 - joinColumn("massAv")) * pq.dimensionless_unscaled)
+        self.volumeAvRate.append(joinColumn("volumeAvRate") / pq.s)
+        self.massAvRate.append(joinColumn("massAvRate") / pq.s)
 
 
 class Ionization(MultiSetFn):
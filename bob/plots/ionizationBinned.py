@@ -15,6 +15,8 @@ from bob.util import getArrayQuantity
 
 
 class IonizationBinned(TimePlot):
+    quantityConfigKeys = ["densityFactors", "numSamples"]
+
     def __init__(self, config: PlotConfig) -> None:
         config.setDefault("numSamples", 100000)
         config.setDefault("xLim", [10.0, 4.2])
@@ -43,7 +45,7 @@ class IonizationBinned(TimePlot):
         densityUnit = pq.g / pq.cm**3 * cu.littleh**2
         data = []
         density = BasicField("Density").getData(snap).to(densityUnit, cu.with_H0(snap.H0))
-        meanDensity = np.mean(density)
+        meanDensity = np.mean(density, dtype=np.float64)
         densities = [meanDensity * factor for factor in self.config["densityFactors"]]
         epsilon = 0.01
         densityBins = [[dens * (1 - epsilon), dens * (1 + epsilon)] for dens in densities]
@@ -53,7 +55,7 @@ class IonizationBinned(TimePlot):
             indices = allIndices[0][::skip]
             masses = BasicField("Masses").getData(snap, indices=indices)
             ionization = BasicField("ChemicalAbundances", 1).getData(snap, indices=indices)
-            avIonization = np.sum(ionization * masses / np.sum(masses))
+            avIonization = np.sum(ionization * masses / np.sum(masses, dtype=np.float64), dtype=np.float64)
             print(f"{density1} - {density2}: {np.mean(avIonization)} ({indices.shape} values)")
             data.append(avIonization)
         return getArrayQuantity(data)
@@ -38,12 +38,12 @@ class IonizationLevel(SetFn):
             snapshots = SnapshotFilter(self.config["snapshots"]).get_snapshots(sim)
             for snap in snapshots:
                 volumes = Volume(comoving=True).getData(snap)
-                totalVolume = np.sum(volumes)
+                totalVolume = np.sum(volumes, dtype=np.float64)
                 ionization = BasicField("ChemicalAbundances", 1).getData(snap)
                 volumeFraction = []
                 for bMin, bMax in zip(binsX, binsX[1:]):
                     indices = np.where((bMin <= ionization) & (ionization < bMax))
-                    volumeFraction.append(np.sum(volumes[indices]) / totalVolume)
+                    volumeFraction.append(np.sum(volumes[indices], dtype=np.float64) / totalVolume)
                 result.volumeFraction.append(getArrayQuantity(volumeFraction) * np.diff(binsX))
         return result
 
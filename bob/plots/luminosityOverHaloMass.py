@@ -1,4 +1,6 @@
+from typing import Optional
 import astropy.units as pq
+import numpy as np
 
 from bob.plotConfig import PlotConfig
 from bob.sourceField import SourceField
@@ -14,5 +16,5 @@ class LuminosityOverHaloMass(OverHaloMass):
         config.setDefault("statistic", "sum")
         super().__init__(config)
 
-    def quantity(self, snap: Snapshot) -> pq.Quantity:
-        return SourceField().getData(snap)
+    def quantity(self, snap: Snapshot, indices: Optional[np.ndarray]) -> pq.Quantity:
+        return SourceField().getData(snap, indices)
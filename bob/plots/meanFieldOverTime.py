@@ -3,11 +3,13 @@ import numpy as np
 from bob.field import Field
 from bob.snapshot import Snapshot
 from bob.simulation import Simulation
-from bob.allFields import allFields, getFieldByName
+from bob.allFields import getFieldByName, getFieldChoices
+from bob.fieldExpression import getFieldFileName
 from bob.basicField import BasicField
 from bob.plots.timePlots import TimePlot
 
 from bob.volume import Volume
+from bob.fieldEvaluation import evaluateFields
 from bob.plotConfig import PlotConfig
 
 
@@ -16,10 +18,12 @@ def getField(config: PlotConfig) -> Field:
 
 
 class MeanFieldOverTime(TimePlot):
+    quantityConfigKeys = ["field", "average"]
+
     def __init__(self, config: PlotConfig) -> None:
-        config.setDefault("field", "Temperature", choices=[f.niceName for f in allFields])
+        config.setDefault("field", "Temperature", choices=getFieldChoices())
         super().__init__(config)
-        field = self.config["field"]
+        field = getFieldFileName(self.config["field"])
         self.config.setDefault("yUnit", getField(self.config).unit)
         if self.config.get("time") == "z":
             self.config.setDefault("xLim", [40, 0])
@@ -34,10 +38,9 @@ class MeanFieldOverTime(TimePlot):
         return getField(self.config).symbol
 
     def getQuantity(self, sim: Simulation, snap: Snapshot) -> float:
-        data = getField(self.config).getData(snap)
         if self.config["average"] == "mass":
-            masses = BasicField("Masses").getData(snap)
-            return np.mean(data * masses) / np.mean(masses)
+            data, masses = evaluateFields(snap, [getField(self.config), BasicField("Masses")])
+            return (data * masses).mean(dtype=np.float64) / masses.mean(dtype=np.float64)
         else:
-            volumes = Volume().getData(snap)
-            return np.mean(data * volumes) / np.mean(volumes)
+            data, volumes = evaluateFields(snap, [getField(self.config), Volume()])
+            return (data * volumes).mean(dtype=np.float64) / volumes.mean(dtype=np.float64)
@@ -13,6 +13,7 @@ from bob.plotConfig import PlotConfig
 from bob.haloCatalog import GroupFiles
 from bob.basicField import BasicField
 from bob.timeUtils import TimeQuantity
+from bob.spatialIndex import Sphere, getRegionIndices
 
 
 class MeanIonizationRedshift(MultiSetFn):
@@ -38,11 +39,12 @@ class MeanIonizationRedshift(MultiSetFn):
             assert len(sims) == 1
             sim = sims[0]
             snap = sim.snapshots[-1]
-            coords = BasicField("Coordinates", partType=0, comoving=True).getData(snap)
             center_of_mass = files.center_of_mass().to(lengthUnit)
             radius = (files.halfmass_rad()).to(lengthUnit) * self.config["radiusFactor"]
+            indices = getRegionIndices(snap, [Sphere(center, r) for (center, r) in zip(center_of_mass, radius)])
+            coords = BasicField("Coordinates", partType=0, comoving=True).getData(snap, indices)
             tree = cKDTree(coords.to(lengthUnit, cu.with_H0(snap.H0)))
-            ionizationTime = BasicField("IonizationTime").getData(snap)
+            ionizationTime = BasicField("IonizationTime").getData(snap, indices)
             ionizationRedshift = TimeQuantity(sim, ionizationTime).redshift()
             _, bins = np.histogram(haloMasses, bins=self.config["numBins"])
             meanBins = []
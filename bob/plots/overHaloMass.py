@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from pathlib import Path
+from typing import Optional
 import astropy.units as pq
 import astropy.cosmology.units as cu
 import matplotlib.pyplot as plt
@@ -15,6 +16,7 @@ from bob.plotConfig import PlotConfig
 from bob.haloCatalog import GroupFiles
 from bob.basicField import BasicField
 from bob.snapshot import Snapshot
+from bob.spatialIndex import Sphere, getRegionIndices
 
 
 class OverHaloMass(SetFn):
@@ -38,17 +40,21 @@ class OverHaloMass(SetFn):
         config.setDefault("statistic", "mean")
         super().__init__(config)
 
+    # Only the cells with the given indices (all cells if None) need to be read
     @abstractmethod
-    def quantity(self, snap: Snapshot) -> pq.Quantity:
+    def quantity(self, snap: Snapshot, indices: Optional[np.ndarray]) -> pq.Quantity:
         pass
 
+    def getHaloCellIndices(self, snap: Snapshot, centers: pq.Quantity, radii: pq.Quantity) -> Optional[np.ndarray]:
+        return getRegionIndices(snap, [Sphere(center, radius) for (center, radius) in zip(centers, radii)])
+
     def evaluateQuantityForHalo(self, tree: cKDTree, quantity: pq.Quantity, pos: pq.Quantity, r: pq.Quantity) -> pq.Quantity:
         indices = tree.query_ball_point(pos, r)
         statistic = self.config["statistic"]
         if statistic == "sum":
-            return np.sum(quantity[indices])
+            return np.sum(quantity[indices], dtype=np.float64)
         elif statistic == "mean":
-            return np.mean(quantity[indices])
+            return np.mean(quantity[indices], dtype=np.float64)
         else:
             raise ValueError("Unknown statistic f{statistic}")
 
@@ -69,9 +75,10 @@ class OverHaloMass(SetFn):
         result.time = snap.timeQuantity(self.config["time"])
         center_of_mass = files.center_of_mass().to(lengthUnit, cu.with_H0(snap.H0))
         radius = (files.halfmass_rad()).to(lengthUnit, cu.with_H0(snap.H0)) * self.config["radiusFactor"]
-        coords = BasicField("Coordinates", partType=0, comoving=True).getData(snap)
+        cellIndices = self.getHaloCellIndices(snap, center_of_mass, radius)
+        coords = BasicField("Coordinates", partType=0, comoving=True).getData(snap, cellIndices)
         tree = cKDTree(coords.to(lengthUnit, cu.with_H0(snap.H0)))
-        quantity = self.quantity(snap)
+        quantity = self.quantity(snap, cellIndices)
         values = np.zeros(masses.shape) * self.config["yUnit"]
         numHaloes = center_of_mass.shape[0]
         for i in tqdm.trange(numHaloes):
@@ -93,7 +100,7 @@ class OverHaloMass(SetFn):
                     if self.config["median"]:
                         result.values.append(np.median(values[indices]))
                     else:
-                        result.values.append(np.mean(values[indices]))
+                        result.values.append(np.mean(values[indices], dtype=np.float64))
             result.values = getArrayQuantity(result.values)
             result.bins = bins[1:]
         return result
@@ -3,6 +3,7 @@ from scipy.spatial import cKDTree
 import astropy.cosmology.units as cu
 import astropy.units as pq
 import numpy as np
+from typing import Optional
 
 from bob.result import Result
 from bob.plotConfig import PlotConfig
@@ -22,13 +23,17 @@ class ResolvedEscapeFraction(OverHaloMass):
         config.setDefault("numPointsAlongRay", 10)
         super().__init__(config)
 
-    def quantity(self, snap: Snapshot) -> pq.Quantity:
-        density = BasicField("Density").getData(snap).to(pq.g / pq.cm**3, cu.with_H0(snap.H0))
-        xHP = BasicField("ChemicalAbundances", 1).getData(snap)
+    def quantity(self, snap: Snapshot, indices: Optional[np.ndarray]) -> pq.Quantity:
+        density = BasicField("Density").getData(snap, indices).to(pq.g / pq.cm**3, cu.with_H0(snap.H0))
+        xHP = BasicField("ChemicalAbundances", 1).getData(snap, indices)
         n = density / protonMass
         sigma = (1.0 - xHP) * sigmaH136Bin
         return n * sigma
 
+    def getHaloCellIndices(self, snap: Snapshot, centers: pq.Quantity, radii: pq.Quantity) -> Optional[np.ndarray]:
+        # The rays look up the nearest cells, which can lie outside of the halo
+        return None
+
     def evaluateQuantityForHalo(self, tree: cKDTree, quantity: pq.Quantity, pos: pq.Quantity, r: pq.Quantity) -> pq.Quantity:
         return np.mean(integrateWithRandomRays(tree, quantity, pos, r, self.config["numRays"], self.config["numPointsAlongRay"]))
 
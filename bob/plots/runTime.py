@@ -1,46 +1,14 @@
 import numpy as np
-import itertools
-from typing import Iterator
 import matplotlib.pyplot as plt
 import astropy.units as pq
 
+from bob.cpuLog import Entry, parseBlock, readLastBlock
 from bob.postprocessingFunctions import SetFn
 from bob.result import Result
 from bob.plotConfig import PlotConfig
 from bob.simulationSet import SimulationSet
 
 
-class Entry:
-    def __init__(self, name: str, time: pq.Quantity, cumTime: pq.Quantity) -> None:
-        self.name = name
-        self.time = time
-        self.cumTime = cumTime
-
-
-def parseEntry(line: str) -> Entry:
-    split = line.split()
-    return Entry(split[0], float(split[1]) * pq.s, float(split[3]) * pq.s)
-
-
-def getBlocks(lines: list[str]) -> Iterator[list[str]]:
-    linesIter = iter(lines)
-    while True:
-        try:
-            if next(linesIter) != "":
-                yield list(itertools.takewhile(lambda x: x.strip() != "", linesIter))
-        except StopIteration:
-            return
-
-
-def parseBlock(block: list[str]) -> tuple[Entry, list[Entry]]:
-    del block[0]  # header line
-    totalLine = block[0]
-    assert "total" in totalLine
-    total = parseEntry(totalLine)
-    topLevelEntries = [parseEntry(line) for line in block if line.startswith("  ") and line[2] != " "]
-    return total, topLevelEntries
-
-
 class RunTime(SetFn):
     def __init__(self, config: PlotConfig):
         super().__init__(config)
@@ -52,10 +20,8 @@ class RunTime(SetFn):
         result = Result()
         result.saveArraysWithoutUnits = True
         for sim in sims:
-            contents = sim.cpuFile
             numRanks = sim.params["numCores"]
-            lastBlock = list(getBlocks(contents))[-1]
-            total, entries = parseBlock(lastBlock)
+            total, entries = parseBlock(readLastBlock(sim.cpuLogFile))
             shownEntries = [entry for entry in entries if entry.name in self.config["requiredEntries"] or entry.cumTime / total.cumTime >= THRESHOLD]
 
             def sortKey(entry: Entry) -> float:
@@ -0,0 +1,54 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import astropy.units as pq
+
+from bob.cpuLog import readCpuLog
+from bob.postprocessingFunctions import SetFn
+from bob.result import Result
+from bob.plotConfig import PlotConfig
+from bob.simulationSet import SimulationSet
+
+
+class RunTimeHistory(SetFn):
+    def __init__(self, config: PlotConfig):
+        super().__init__(config)
+        self.config.setDefault("yUnit", pq.h)
+        self.config.setDefault("requiredEntries", [])  # entries we should show even if theyre below the threshold
+        self.config.setDefault("cumulative", False)  # show the cumulative time instead of the time per step
+
+    def post(self, sims: SimulationSet) -> Result:
+        THRESHOLD = 0.05
+        result = Result()
+        result.saveArraysWithoutUnits = True
+        for sim in sims:
+            numRanks = sim.params["numCores"]
+            cpuLog = readCpuLog(sim.folder, sim.cpuLogFile)
+            # Timers that did not exist yet have not used any time
+            cumTimes = np.nan_to_num(cpuLog.cumTimes)
+            total = cumTimes[:, cpuLog.names.index("total")]
+            timers = [i for (i, name) in enumerate(cpuLog.names) if name != "total"]
+            shown = [i for i in timers if cpuLog.names[i] in self.config["requiredEntries"] or cumTimes[-1, i] / total[-1] >= THRESHOLD]
+            hidden = [i for i in timers if i not in shown]
+            rest = cumTimes[:, hidden].sum(axis=1)
+            result.steps = cpuLog.steps
+            result.times = cpuLog.times
+            result.names = np.array([cpuLog.names[i] for i in shown] + ["rest"])
+            result.cumTimes = np.column_stack([cumTimes[:, shown], rest]) * pq.s * numRanks
+            result.total = total * pq.s * numRanks
+        return result
+
+    def plot(self, plt: plt.axes, result: Result) -> None:
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+        ax.set_xlabel("step")
+        if self.config["cumulative"]:
+            ax.set_ylabel("T [core h]")
+            steps = result.steps
+            times = result.cumTimes.to_value(self.config["yUnit"])
+        else:
+            ax.set_ylabel("T / step [core h]")
+            steps = result.steps[1:]
+            times = np.diff(result.cumTimes.to_value(self.config["yUnit"]), axis=0) / np.maximum(np.diff(result.steps), 1)[:, np.newaxis]
+        for i, name in enumerate(result.names):
+            ax.plot(steps, times[:, i], label=name)
+        ax.legend()
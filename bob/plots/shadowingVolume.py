@@ -65,7 +65,7 @@ class ShadowingVolume(TimePlot):
         )
         data = BasicField("ChemicalAbundances", 1).getData(snap)[selection]
         masses = BasicField("Masses").getData(snap)[selection]
-        return np.sum(data * masses) / np.sum(masses)
+        return np.sum(data * masses, dtype=np.float64) / np.sum(masses, dtype=np.float64)
 
     def plot(self, plt: plt.axes, result: Result) -> None:
         super().plot(plt, result)
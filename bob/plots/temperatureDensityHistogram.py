@@ -1,9 +1,9 @@
+from typing import Tuple
 import matplotlib.pyplot as plt
 import astropy.units as pq
 
-from bob.simulation import Simulation
-from bob.snapshot import Snapshot
 from bob.result import Result
+from bob.field import Field
 from bob.basicField import BasicField
 from bob.temperature import Temperature
 from bob.plotConfig import PlotConfig
@@ -24,8 +24,8 @@ class TemperatureDensityHistogram(Histogram):
         self.config.setDefault("xTicks", [1e-31, 1e-30, 1e-29, 1e-28, 1e-27, 1e-26])
         self.config.setDefault("yTicks", [1e0, 1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7])
 
-    def post(self, sim: Simulation, snap: Snapshot) -> Result:
-        return super().postHistogram(sim, snap, BasicField("Density"), Temperature())
+    def getHistogramFields(self) -> Tuple[Field, Field]:
+        return BasicField("Density"), Temperature()
 
     def plot(self, plt: plt.axes, result: Result) -> None:
         super().plot(plt, result)
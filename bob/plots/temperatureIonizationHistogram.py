@@ -1,9 +1,9 @@
+from typing import Tuple
 import matplotlib.pyplot as plt
 import astropy.units as pq
 
-from bob.simulation import Simulation
-from bob.snapshot import Snapshot
 from bob.result import Result
+from bob.field import Field
 from bob.basicField import BasicField
 from bob.temperature import Temperature
 from bob.plotConfig import PlotConfig
@@ -24,8 +24,8 @@ class TemperatureIonizationHistogram(Histogram):
         self.config.setDefault("xTicks", [1e-10, 1e-8, 1e-6, 1e-4, 1e-2, 1e0])
         self.config.setDefault("yTicks", [1e0, 1e1, 1e2, 1e3, 1e4, 1e5])
 
-    def post(self, sim: Simulation, snap: Snapshot) -> Result:
-        return super().postHistogram(sim, snap, BasicField("ChemicalAbundances", 1), Temperature())
+    def getHistogramFields(self) -> Tuple[Field, Field]:
+        return BasicField("ChemicalAbundances", 1), Temperature()
 
     def plot(self, plt: plt.axes, result: Result) -> None:
         super().plot(plt, result)
@@ -9,6 +9,7 @@ from bob.snapshot import Snapshot
 from bob.basicField import BasicField
 from bob.simulation import Simulation
 from bob.temperature import Temperature
+from bob.fieldEvaluation import evaluateFields
 from bob.plotConfig import PlotConfig
 from bob.plots.meanFieldOverTime import MeanFieldOverTime
 
@@ -24,14 +25,14 @@ class TemperatureOverTime(MeanFieldOverTime):
         return "$T [\\mathrm{K}]$"
 
     def getQuantity(self, sim: Simulation, snap: Snapshot) -> List[float]:  # type: ignore
-        density = BasicField("Density").getData(snap) / (pq.g / pq.cm**3)
-        masses = BasicField("Masses").getData(snap)
-        temperature = Temperature().getData(snap) / pq.K
+        density, masses, temperature = evaluateFields(snap, [BasicField("Density"), BasicField("Masses"), Temperature()])
+        density = density / (pq.g / pq.cm**3)
+        temperature = temperature / pq.K
         result = []
         self.densityBins = [1e-31, 1e-29, 1e-27, 1e-25]
         for density1, density2 in zip(self.densityBins, self.densityBins[1:]):
             indices = np.where((density1 < density) & (density < density2))
-            avTemp = np.sum(temperature[indices] * masses[indices] / np.sum(masses[indices]))
+            avTemp = np.sum(temperature[indices] * masses[indices] / np.sum(masses[indices], dtype=np.float64), dtype=np.float64)
             result.append(avTemp)
             result.append(avTemp)
         return result
@@ -20,7 +20,7 @@ def getRateForSnap(snap: Snapshot) -> pq.Quantity:
     xe = ElectronAbundance().getData(snap)
     density = BasicField("Density").getData(snap).to(pq.g / pq.cm**3, cu.with_H0(snap.H0))
     ne = xe * density / protonMass
-    return speedOfLight * sig * np.mean(ne)
+    return speedOfLight * sig * np.mean(ne, dtype=np.float64)
 
 
 class ThomsonScattering(MultiSetFn):
@@ -1,4 +1,8 @@
-from typing import Tuple, List, Optional
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, List, Optional
 from abc import abstractmethod
 
 import matplotlib.pyplot as plt
@@ -10,10 +14,14 @@ from bob.result import Result
 from bob.simulationSet import SimulationSet
 from bob.simulation import Simulation
 from bob.multiSet import MultiSet
-from bob.util import getArrayQuantity
+from bob.util import getArrayQuantity, getFileStats
+from bob.fingerprint import getCodeVersion, getFingerprint
 from bob.plotConfig import PlotConfig
 from bob.snapshotFilter import SnapshotFilter
 from bob.timeUtils import TimeQuantity
+import bob.config
+
+SnapshotValue = Tuple[pq.Quantity, Any]
 
 
 def addTimeArg(fn: PostprocessingFunction) -> None:
@@ -35,7 +43,51 @@ def getTimeQuantityFromTimeOrScaleFactor(quantity: str, sim: Simulation, snap: S
         raise NotImplementedError
 
 
+class SnapshotValues:
+    # The time and value of each snapshot of a time plot, stored in the data folder of the plot by the
+    # fingerprint of the snapshot, so that reruns only evaluate snapshots that are new or have changed
+    def __init__(self, filename: Optional[Path], stored: Dict[str, SnapshotValue]) -> None:
+        self.filename = filename
+        self.stored = stored
+        self.values: Dict[str, SnapshotValue] = {}
+
+    @staticmethod
+    def load(filename: Optional[Path]) -> "SnapshotValues":
+        if filename is None or not filename.is_file():
+            return SnapshotValues(filename, {})
+        try:
+            with filename.open("rb") as f:
+                return SnapshotValues(filename, pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logging.debug(f"Ignoring invalid snapshot values {filename}: {e}")
+            return SnapshotValues(filename, {})
+
+    def get(self, fingerprint: str, compute: Callable[[], SnapshotValue]) -> SnapshotValue:
+        value = self.stored.get(fingerprint)
+        if value is None:
+            value = compute()
+        self.values[fingerprint] = value
+        return value
+
+    # Only the values of the snapshots used in this run are kept
+    def save(self) -> None:
+        if self.filename is None:
+            return
+        tempFilename = self.filename.with_name(f".{self.filename.name}.{os.getpid()}")
+        try:
+            self.filename.parent.mkdir(parents=True, exist_ok=True)
+            with tempFilename.open("wb") as f:
+                pickle.dump(self.values, f)
+            os.replace(tempFilename, self.filename)
+        except OSError as e:
+            logging.debug(f"Could not write snapshot values {self.filename}: {e}")
+
+
 class TimePlot(MultiSetFn):
+    # The config entries that getQuantity depends on. Stored values of a snapshot are reused as long as these and the
+    # files of the snapshot are unchanged, so changing the labels or limits of the plot does not recompute them.
+    quantityConfigKeys: List[str] = []
+
     def __init__(self, config: PlotConfig) -> None:
         super().__init__(config)
         addTimeArg(self)
@@ -58,11 +110,20 @@ class TimePlot(MultiSetFn):
         return ""
 
     def post(self, simSets: MultiSet) -> Result:
+        filename = None if self.dataFolder is None else self.dataFolder / bob.config.snapshotValuesFileName
+        values = SnapshotValues.load(filename) if self.reuseStoredData else SnapshotValues(filename, {})
         results = Result()
-        results.data = [self.getQuantityOverTime(self.config["time"], simSet) for simSet in simSets]
+        results.data = [self.getQuantityOverTime(self.config["time"], simSet, values) for simSet in simSets]
         results.data = [x for x in results.data if x is not None]
+        values.save()
         return results
 
+    def getSnapshotFingerprint(self, timeQuantity: str, snap: Snapshot) -> str:
+        config = [(key, repr(self.config[key])) for key in sorted(self.quantityConfigKeys)]
+        return getFingerprint(
+            self.name, config, timeQuantity, bob.config.precision, str(snap.path.resolve()), getFileStats(snap.filenames), getCodeVersion()
+        )
+
     def plot(self, plt: plt.axes, result: Result) -> None:
         fig = plt.figure()
         ax = fig.add_subplot(1, 1, 1)
@@ -72,11 +133,15 @@ class TimePlot(MultiSetFn):
             self.addLine(result.times, result.values, label=label, color=color, **style)
         plt.legend()
 
-    def getQuantityOverTime(self, timeQuantity: str, simSet: SimulationSet) -> Optional[Result]:
+    def getQuantityOverTime(self, timeQuantity: str, simSet: SimulationSet, values: Optional[SnapshotValues] = None) -> Optional[Result]:
         filter_ = SnapshotFilter(self.config["snapshots"])
         snapshots = [(snap, sim) for sim in simSet for snap in filter_.get_snapshots(sim)]
 
-        data = [getTimeAndResultForSnap(self, timeQuantity, s) for s in snapshots]
+        if values is None:
+            values = SnapshotValues(None, {})
+        data = [
+            values.get(self.getSnapshotFingerprint(timeQuantity, s[0]), lambda: getTimeAndResultForSnap(self, timeQuantity, s)) for s in snapshots
+        ]
         # I had very interesting problems where doing the following would just stop
         # execution forever without any reason. I suspect some kind of memory problem,
         # but am not sure. For now, I am disabling any parallelism
@@ -105,4 +170,6 @@ def getAllSnapshotsWithTime(timeQuantity: str, simSet: SimulationSet) -> List[Tu
 def getTimeAndResultForSnap(plot: TimePlot, timeQuantity: str, snapSim: Tuple[Snapshot, Simulation]) -> Tuple[pq.Quantity, pq.Quantity]:
     (snap, sim) = snapSim
     print(snap)
-    return (snap.timeQuantity(timeQuantity), plot.getQuantity(sim, snap))
+    result = (snap.timeQuantity(timeQuantity), plot.getQuantity(sim, snap))
+    snap.close()
+    return result
@@ -1,6 +1,8 @@
 import os
+import re
+import shutil
 import yaml
-from typing import Iterator, List, Optional, Callable, Union, Tuple, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Callable, Union, Tuple, Any
 from pathlib import Path
 import matplotlib.pyplot as plt
 import logging
@@ -12,16 +14,26 @@ from bob.postprocessingFunctions import (
     SnapFn,
     SliceFn,
 )
-from bob.simulationSet import SimulationSet, Single
+from bob.simulation import Simulation
+from bob.simulationSet import SimulationSet, Single, querySims
+from bob.snapshot import Snapshot
+from bob.simulationCatalog import isSimulationQuery
 import bob.config
-from bob.result import Result
+from bob.result import Result, numpyFileEnding, unitFileEnding
 from bob.postprocessingFunctions import PostprocessingFunction
 from bob.multiSet import MultiSet
-from bob.pool import runInPool
-from bob.util import zeroPadToLength, showImageInTerminal, walkfiles, getFolderNames
+from bob.pool import iterInPool, runInPool
+from bob.util import zeroPadToLength, showImageInTerminal, walkfiles, getFolderNames, getFileStats, listdir
+from bob.fingerprint import getCodeVersion, getFingerprint
 from bob.snapshotFilter import SnapshotFilter
+from bob.precision import fieldPrecision
+from bob.fieldEvaluation import loadFields, releaseFields
+from bob.runJournal import RunJournal
+from bob.renderQueue import RenderQueue
 
 QuotientParams = Optional[Union[List[str], Single]]
+# A snapshot and all snapshot functions (with the qualified names of their plots) that run on it
+SnapshotItem = Tuple[Simulation, Snapshot, List[Tuple[SnapFn, str]]]
 
 
 def transformReadable(item: Tuple[str, Any]) -> Tuple[str, Any]:
@@ -31,6 +43,104 @@ def transformReadable(item: Tuple[str, Any]) -> Tuple[str, Any]:
     return (k, v)
 
 
+# All files that functions of whole simulations may read
+def getSimulationFiles(sim: Simulation) -> List[Path]:
+    files = sorted(walkfiles(sim.outputDir))
+    logFile = sim.folder / bob.config.arepoLogFile
+    if logFile.is_file():
+        files.append(logFile)
+    return files
+
+
+# Input files that the parameters of the simulation refer to, like the sources file or the initial conditions
+def getParamFiles(sim: Simulation) -> List[Path]:
+    files: List[Path] = []
+    for key in sorted(sim.params):
+        value = sim.params[key]
+        if not isinstance(value, str) or value in ["", "."]:
+            continue
+        # The initial conditions are given without their suffix
+        for path in [sim.folder / value, sim.folder / f"{value}.hdf5", sim.folder / f"{value}.0.hdf5"]:
+            try:
+                if path.is_file():
+                    files.append(path)
+            except (OSError, ValueError):
+                continue
+    return files
+
+
+# Files that the config of the function refers to, like the group catalog folder of OverHaloMass
+def getConfigFiles(fn: PostprocessingFunction) -> List[Path]:
+    files: List[Path] = []
+    # The files of the selected simulations are part of the fingerprint anyway
+    for key in sorted((set(fn.config.defaults) | set(fn.config)) - {"sims"}):
+        values = fn.config[key]
+        for value in values if isinstance(values, list) else [values]:
+            if not isinstance(value, (str, Path)) or str(value) in ["", "."]:
+                continue
+            try:
+                path = Path(value)
+                if path.is_file():
+                    files.append(path)
+                elif path.is_dir():
+                    files.extend(sorted(walkfiles(path)))
+            except (OSError, ValueError):
+                # Not a path (e.g. a label that is too long to be a file name)
+                continue
+    return files
+
+
+def getResultFingerprint(fn: PostprocessingFunction, sims: Iterable[Simulation], files: List[Path]) -> str:
+    config = sorted(transformReadable(item) for item in fn.config.items())
+    sims = list(sims)
+    files = files + [f for sim in sims for f in getParamFiles(sim)] + getConfigFiles(fn)
+    return getFingerprint(fn.name, config, [sim.params for sim in sims], [str(f) for f in files], getFileStats(files), getCodeVersion())
+
+
+def readResultFingerprint(plotDataFolder: Path) -> Optional[str]:
+    fingerprintFile = plotDataFolder / bob.config.resultFingerprintFileName
+    if not fingerprintFile.is_file():
+        return None
+    return fingerprintFile.read_text()
+
+
+# Replaces the target folder by the source folder. The target never contains only part of the source, but it is briefly
+# missing between moving the old target away and moving the source in. A run that is killed in that moment leaves the
+# old target behind as a hidden sibling, which cleanUpInterruptedSave restores.
+def replaceFolder(source: Path, target: Path) -> None:
+    oldFolder = target.with_name(f".{target.name}.old.{os.getpid()}")
+    if target.is_dir():
+        os.replace(target, oldFolder)
+    os.replace(source, target)
+    shutil.rmtree(oldFolder, ignore_errors=True)
+
+
+# Removes the hidden temporary folders that runs which were killed while saving into the target left behind
+# and restores the previous target if it had already been moved away
+def cleanUpInterruptedSave(target: Path) -> None:
+    if not target.parent.is_dir():
+        return
+    pattern = re.compile(rf"\.{re.escape(target.name)}\.(old\.)?[0-9]+")
+    leftovers = [f for f in listdir(target.parent) if pattern.fullmatch(f.name) is not None]
+    # Old targets first, the most recent one is restored
+    leftovers.sort(key=lambda f: (".old." not in f.name, -f.stat().st_mtime))
+    for folder in leftovers:
+        if ".old." in folder.name and not target.exists():
+            logging.info(f"Restoring {target} from interrupted run")
+            os.replace(folder, target)
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+# Moves files that functions store in their data folder besides the result (e.g. the snapshot values of time plots)
+def moveAuxiliaryFiles(source: Path, target: Path) -> None:
+    for f in listdir(source):
+        if f.suffix in [numpyFileEnding, unitFileEnding] or f.name == bob.config.resultFingerprintFileName:
+            continue
+        if f.is_file() and not (target / f.name).exists():
+            os.replace(f, target / f.name)
+
+
 class PlotName:
     def __init__(self, picFolder: Path, baseName: str, qualifiedName: str) -> None:
         self.picFolder = picFolder
@@ -47,12 +157,23 @@ class PlotName:
     def getOutputFile(self, outputFileType: str) -> Path:
         return self.folder() / "{}.{}".format(self.qualifiedName, outputFileType)
 
+    def journalEntry(self) -> str:
+        return f"{self.baseName}/{self.qualifiedName}"
+
     def withPicFolder(self, picFolder: Path) -> "PlotName":
         return PlotName(picFolder, self.baseName, self.qualifiedName)
 
     def __repr__(self) -> str:
         return "{} {} {} {}".format(self.picFolder, self.baseName, self.qualifiedName, self.subName)
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlotName):
+            return NotImplemented
+        return (self.picFolder, self.baseName, self.qualifiedName) == (other.picFolder, other.baseName, other.qualifiedName)
+
+    def __hash__(self) -> int:
+        return hash((self.picFolder, self.baseName, self.qualifiedName))
+
 
 class PlotFilter:
     def __init__(self, baseName: Optional[str] = None, qualifiedName: Optional[str] = None) -> None:
@@ -85,15 +206,49 @@ class Plotter:
         sims: SimulationSet,
         postprocess_only: bool,
         show: bool,
+        force: bool = False,
     ) -> None:
         self.picFolder = parent_folder / bob.config.picFolder
         self.sims = sims
         self.postprocess_only = postprocess_only
         self.show = show
-
-    def filterSims(self, select: Optional[List[str]]) -> SimulationSet:
+        self.force = force
+        self.journal: Optional[RunJournal] = None
+        self.renderQueue: Optional[RenderQueue] = None
+        # Set in worker processes whose plots are rendered by the render queue of the main process
+        self.deferRendering = False
+        self.deferredPlots: List[PlotName] = []
+
+    # The render queue belongs to the main process, worker processes hand the plots they saved back to it
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["renderQueue"] = None
+        state["deferRendering"] = self.deferRendering or self.renderQueue is not None
+        return state
+
+    def startRenderQueue(self) -> None:
+        if bob.config.numRenderProcesses > 0:
+            self.renderQueue = RenderQueue(bob.config.numRenderProcesses, bob.config.renderQueueSize)
+
+    def finishRendering(self) -> None:
+        if self.renderQueue is not None:
+            renderQueue, self.renderQueue = self.renderQueue, None
+            renderQueue.finish()
+
+    # Each plot file has its own journal, since the plot files of a run are run as separate jobs at the same time
+    def openJournal(self, plotFile: Path, resume: bool) -> None:
+        self.journal = RunJournal.open(self.picFolder / f"{plotFile.stem}{bob.config.runJournalSuffix}", resume)
+
+    def closeJournal(self) -> None:
+        if self.journal is not None:
+            self.journal.close()
+
+    def filterSims(self, select: Optional[Union[str, List[str]]]) -> SimulationSet:
         if select is None:
             return self.sims
+        elif isSimulationQuery(select):
+            assert isinstance(select, str)
+            return SimulationSet(self.sims.sim_type, querySims(self.sims, select))
         else:
             select = [str(x) for x in select]
             return SimulationSet(self.sims.sim_type, (sim for sim in self.sims if sim.name in select))
@@ -142,25 +297,93 @@ class Plotter:
             if self.show:
                 showImageInTerminal(path)
 
+    # Whether the stored result of the plot was completed earlier in this run or was computed from the same inputs
+    def isUpToDate(self, fn: PostprocessingFunction, qualifiedName: str, fingerprint: Optional[str]) -> bool:
+        name = PlotName(self.picFolder, fn.name, qualifiedName)
+        if self.journal is not None and self.journal.contains(name.journalEntry()):
+            return True
+        if fingerprint is None or self.force:
+            return False
+        return readResultFingerprint(name.dataFolder()) == fingerprint
+
     def runPostAndPlot(
-        self, fn: PostprocessingFunction, qualifiedName: str, post: Callable[[], Result], plot: Callable[[plt.axes, Result], None]
+        self,
+        fn: PostprocessingFunction,
+        qualifiedName: str,
+        post: Callable[[], Result],
+        plot: Callable[[plt.axes, Result], None],
+        fingerprint: Optional[str] = None,
     ) -> PlotName:
         name = PlotName(self.picFolder, fn.name, qualifiedName)
-        logging.info("Running {}".format(name.qualifiedName))
-        result = post()
-        self.save(fn, name, result)
-        if not self.postprocess_only:
+        if not name.dataFolder().is_dir():
+            cleanUpInterruptedSave(name.dataFolder())
+        if self.isUpToDate(fn, qualifiedName, fingerprint):
+            if self.postprocess_only or not self.isNew(name, fn.config["outputFileType"]):
+                logging.info("Skipping {} (unchanged)".format(name.qualifiedName))
+                self.addToJournal(name)
+                return name
+            logging.info("Plotting stored result of {}".format(name.qualifiedName))
+            result = None
+        else:
+            logging.info("Running {}".format(name.qualifiedName))
+            fn.dataFolder = name.dataFolder()
+            fn.reuseStoredData = not self.force
+            with fieldPrecision(fn.config["precision"]):
+                result = post()
+                self.save(fn, name, result, fingerprint)
+        if self.postprocess_only:
+            self.addToJournal(name)
+        elif self.renderQueue is not None:
+            self.render(name)
+        elif self.deferRendering:
+            self.deferredPlots.append(name)
+        else:
+            if result is None:
+                result = Result.readFromFolder(name.dataFolder())
             plot(plt, result)
-            path = self.saveAndShow(name, fn)
-            if self.show:
-                showImageInTerminal(path)
+            self.finishPlot(name, self.saveAndShow(name, fn))
         return name
 
-    def save(self, fn: PostprocessingFunction, name: PlotName, result: Result) -> None:
+    # Renders the plot from the saved result (the same way as a replot) in the render queue
+    def render(self, name: PlotName) -> None:
+        assert self.renderQueue is not None
+        self.renderQueue.submit(runPlot, (self, None, name), lambda path: self.finishPlot(name, path))
+
+    # Runs the items in the process pool. The plots that the workers saved are rendered in the render queue
+    # as soon as the workers return them, while the workers continue with the next items.
+    def runInPool(self, fn: Callable[..., Any], items: List[Any], *args: Any) -> List[Any]:
+        if self.renderQueue is None:
+            return runInPool(fn, items, self, *args)
+        results = []
+        for result, deferredPlots in iterInPool(runDeferringRendering, items, self, fn, args):
+            for name in deferredPlots:
+                self.render(name)
+            results.append(result)
+        return results
+
+    def finishPlot(self, name: PlotName, path: Path) -> None:
+        if self.show:
+            showImageInTerminal(path)
+        self.addToJournal(name)
+
+    def addToJournal(self, name: PlotName) -> None:
+        if self.journal is not None and not self.journal.contains(name.journalEntry()):
+            self.journal.add(name.journalEntry())
+
+    def save(self, fn: PostprocessingFunction, name: PlotName, result: Result, fingerprint: Optional[str] = None) -> None:
         plotDataFolder = name.dataFolder()
-        plotDataFolder.mkdir(parents=True, exist_ok=True)
-        self.savePlotInfo(fn, plotDataFolder)
-        self.saveResult(result, plotDataFolder)
+        # The result is written to a temporary folder which replaces the data folder once it is complete,
+        # so that the data folder never contains a partially written result
+        cleanUpInterruptedSave(plotDataFolder)
+        tempFolder = plotDataFolder.with_name(f".{plotDataFolder.name}.{os.getpid()}")
+        tempFolder.mkdir(parents=True)
+        self.savePlotInfo(fn, tempFolder)
+        self.saveResult(result, tempFolder)
+        if fingerprint is not None:
+            (tempFolder / bob.config.resultFingerprintFileName).write_text(fingerprint)
+        if plotDataFolder.is_dir():
+            moveAuxiliaryFiles(plotDataFolder, tempFolder)
+        replaceFolder(tempFolder, plotDataFolder)
 
     def savePlotInfo(self, fn: PostprocessingFunction, plotDataFolder: Path) -> None:
         filename = plotDataFolder / bob.config.plotSerializationFileName
@@ -170,7 +393,7 @@ class Plotter:
         result.save(plotDataFolder)
 
     def getQuotient(
-        self, quotient_params: Optional[Union[str, List[str]]], sims_filter: Optional[List[str]], labels: Optional[List[str]]
+        self, quotient_params: Optional[Union[str, List[str]]], sims_filter: Optional[Union[str, List[str]]], labels: Optional[List[str]]
     ) -> MultiSet:
         if type(quotient_params) == str and quotient_params.lower() == "single":
             params: Union[Single, List[str]] = Single()
@@ -186,32 +409,59 @@ class Plotter:
     def runMultiSetFn(self, function: MultiSetFn) -> Iterator[PlotName]:
         quotient = self.getQuotient(function.config["quotient"], function.config["sims"], function.config["labels"])
         function.updateLabelsInConfig(quotient)
-        yield self.runPostAndPlot(function, function.getName(), lambda: function.post(quotient), function.plot)
+        sims = [sim for simSet in quotient for sim in simSet]
+        fingerprint = getResultFingerprint(function, sims, [f for sim in sims for f in getSimulationFiles(sim)])
+        yield self.runPostAndPlot(function, function.getName(), lambda: function.post(quotient), function.plot, fingerprint)
 
     def runSetFn(self, function: SetFn) -> Iterator[PlotName]:
         quotient = self.getQuotient(function.config["quotient"], function.config["sims"], function.config["labels"])
         numSims = len(quotient)
-        for i, (config, sims) in enumerate(quotient.iterWithConfigs()):
-            yield self.runPostAndPlot(function, function.getName(setNum=zeroPadToLength(i, numSims)), lambda: function.post(sims), function.plot)
+        items = [(function.getName(setNum=zeroPadToLength(i, numSims)), sims) for i, (config, sims) in enumerate(quotient.iterWithConfigs())]
+        yield from self.runInPool(runSetFnItem, items, function)
 
-    def runSnapFn(self, function: SnapFn) -> Iterator[PlotName]:
+    def getSnapFnItems(self, function: SnapFn) -> List[Tuple[str, Simulation, Snapshot]]:
         sims = self.filterSims(function.config["sims"])
+        items = []
         for sim in sims:
             snapshots = SnapshotFilter(function.config["snapshots"]).get_snapshots(sim)
             for snap in snapshots:
                 simName = zeroPadToLength(int(sim.name), len(sims))
                 snapName = zeroPadToLength(int(snap.name), len(snapshots))
-                qualifiedName = function.getName(sim=sim, snap=snap, simName=simName, snapName=snapName)
-                yield self.runPostAndPlot(function, qualifiedName, lambda: function.post(sim, snap), function.plot)
+                items.append((function.getName(sim=sim, snap=snap, simName=simName, snapName=snapName), sim, snap))
+        return items
+
+    def runSnapFn(self, function: SnapFn) -> Iterator[PlotName]:
+        yield from self.runSnapFns([function])[0]
+
+    # Runs all functions on one snapshot after the other, so that each snapshot is only loaded once.
+    # Returns the plot names of each function in the same order as runSnapFn.
+    def runSnapFns(self, functions: List[SnapFn]) -> List[List[PlotName]]:
+        snapshotItems: Dict[Tuple[str, str], SnapshotItem] = {}
+        positions: Dict[Tuple[str, str], List[Tuple[int, int]]] = {}
+        itemsPerFunction = [self.getSnapFnItems(function) for function in functions]
+        for i, (function, items) in enumerate(zip(functions, itemsPerFunction)):
+            for j, (qualifiedName, sim, snap) in enumerate(items):
+                key = (str(sim.folder), str(snap.path))
+                if key not in snapshotItems:
+                    snapshotItems[key] = (sim, snap, [])
+                    positions[key] = []
+                snapshotItems[key][2].append((function, qualifiedName))
+                positions[key].append((i, j))
+        names: List[List[Optional[PlotName]]] = [[None for _ in items] for items in itemsPerFunction]
+        for key, snapshotNames in zip(snapshotItems, self.runInPool(runSnapshotItem, list(snapshotItems.values()))):
+            for (i, j), name in zip(positions[key], snapshotNames):
+                names[i][j] = name
+        return [[name for name in functionNames if name is not None] for functionNames in names]
 
     def runSliceFn(self, function: SliceFn) -> Iterator[PlotName]:
         sims = self.filterSims(function.config["sims"])
+        items = []
         for sim in sims:
             for slice_ in sim.getSlices(function.config["field"]):
                 if function.config["snapshots"] is None or any(str(arg_snap) == slice_.name for arg_snap in function.config["snapshots"]):
                     simName = zeroPadToLength(int(sim.name), len(sims))
-                    qualifiedName = function.getName(simName=simName, sliceName=slice_.name)
-                    yield self.runPostAndPlot(function, qualifiedName, lambda: function.post(sim, slice_), function.plot)
+                    items.append((function.getName(simName=simName, sliceName=slice_.name), sim, slice_))
+        yield from self.runInPool(runSliceFnItem, items, function)
 
     def saveAndShow(self, name: PlotName, fn: PostprocessingFunction) -> Path:
         filepath = name.getOutputFile(fn.config["outputFileType"])
@@ -227,6 +477,42 @@ def getBaseName(plotName: str) -> str:
     return plotName[: plotName.index("_")]
 
 
+# The work items of the postprocessing functions, these need to be top-level functions so they can be used by multiprocessing
+def runDeferringRendering(plotter: Plotter, fn: Callable[..., Any], args: Tuple[Any, ...], item: Any) -> Tuple[Any, List[PlotName]]:
+    plotter.deferredPlots = []
+    result = fn(plotter, *args, item)
+    return result, plotter.deferredPlots
+
+
+def runSetFnItem(plotter: Plotter, function: SetFn, item: Tuple[str, SimulationSet]) -> PlotName:
+    qualifiedName, sims = item
+    fingerprint = getResultFingerprint(function, sims, [f for sim in sims for f in getSimulationFiles(sim)])
+    return plotter.runPostAndPlot(function, qualifiedName, lambda: function.post(sims), function.plot, fingerprint)
+
+
+def runSnapshotItem(plotter: Plotter, item: SnapshotItem) -> List[PlotName]:
+    sim, snap, functions = item
+    fingerprints = [getResultFingerprint(function, [sim], snap.filenames) for (function, _) in functions]
+    try:
+        for (function, qualifiedName), fingerprint in zip(functions, fingerprints):
+            if not plotter.isUpToDate(function, qualifiedName, fingerprint):
+                with fieldPrecision(function.config["precision"]):
+                    loadFields(snap, function.requiredFields(sim, snap))
+        return [
+            plotter.runPostAndPlot(function, qualifiedName, lambda: function.post(sim, snap), function.plot, fingerprint)
+            for ((function, qualifiedName), fingerprint) in zip(functions, fingerprints)
+        ]
+    finally:
+        releaseFields(snap)
+        snap.close()
+
+
+def runSliceFnItem(plotter: Plotter, function: SliceFn, item: Tuple[str, Simulation, Any]) -> PlotName:
+    qualifiedName, sim, slice_ = item
+    fingerprint = getResultFingerprint(function, [sim], [slice_.path])
+    return plotter.runPostAndPlot(function, qualifiedName, lambda: function.post(sim, slice_), function.plot, fingerprint)
+
+
 # Needs to be a top-level function so it can be used by multiprocessing
 def runPlot(plotter: Plotter, customConfig: Optional[dict], plot: PlotName) -> Path:
     from bob.postprocess import getFunctionsFromPlotFile, getFunctionsFromPlotConfigs
@@ -1,8 +1,39 @@
-from typing import Any, Callable, List
+from typing import Any, Callable, Iterator, List, Tuple
 import multiprocessing
-from bob.config import numProcesses
+import bob.config
+from bob.fieldCache import fieldCache
+from bob.hdf5Pool import hdf5Pool
 
 
-def runInPool(fn: Callable[..., Any], items: List[Any], *args: Any) -> Any:
-    with multiprocessing.Pool(numProcesses) as pool:
-        return pool.starmap(fn, zip(*[[arg for _ in items] for arg in args], items))
+def initWorker(numProcesses: int = 1) -> None:
+    hdf5Pool.reset()
+    fieldCache.numProcesses = numProcesses
+    fieldCache.evict()
+
+
+# Also returns the hits and misses of the field cache during the call, so that the main process can report them
+def callWithArgs(call: Tuple[Callable[..., Any], Tuple[Any, ...]]) -> Tuple[Any, Tuple[int, int]]:
+    fn, args = call
+    hits, misses = fieldCache.hits, fieldCache.misses
+    result = fn(*args)
+    return result, (fieldCache.hits - hits, fieldCache.misses - misses)
+
+
+# Yields the results in the order of the items, each as soon as it (and all results before it) is available
+def iterInPool(fn: Callable[..., Any], items: List[Any], *args: Any) -> Iterator[Any]:
+    calls = list(zip(*[[arg for _ in items] for arg in args], items))
+    # Workers of a pool cannot start a pool of their own
+    if bob.config.numProcesses == 1 or len(calls) <= 1 or multiprocessing.current_process().daemon:
+        for call in calls:
+            yield fn(*call)
+        return
+    numProcesses = min(bob.config.numProcesses, len(calls))
+    # The memory budget of the field cache is split between the workers
+    with multiprocessing.Pool(numProcesses, initializer=initWorker, initargs=(numProcesses,)) as pool:
+        for result, (hits, misses) in pool.imap(callWithArgs, [(fn, call) for call in calls]):
+            fieldCache.addStatistics(hits, misses)
+            yield result
+
+
+def runInPool(fn: Callable[..., Any], items: List[Any], *args: Any) -> List[Any]:
+    return list(iterInPool(fn, items, *args))
@@ -1,5 +1,5 @@
 import os
-from typing import List, Iterator, Union, Any, Dict
+from typing import List, Iterator, Optional, Union, Any, Dict
 from pathlib import Path
 import yaml
 import logging
@@ -18,6 +18,7 @@ from bob.postprocessingFunctions import PostprocessingFunction
 from bob.plotConfig import PlotConfig
 from bob.plots.allFunctions import getFunctionByName
 from bob.plotter import PlotName
+from bob.fieldCache import fieldCache
 
 from bob.postprocessingFunctions import (
     SnapFn,
@@ -79,9 +80,14 @@ def runFunctionsWithPlotter(plotter: Plotter, functions: List[PostprocessingFunc
     logging.debug(functions)
 
     def run() -> Iterator[PlotName]:
+        # All snapshot functions run together, one snapshot at a time, when the first of them is reached
+        snapFns = [function for function in functions if isinstance(function, SnapFn)]
+        snapFnNames: Optional[Iterator[List[PlotName]]] = None
         for function in functions:
             if isinstance(function, SnapFn):
-                yield from plotter.runSnapFn(function)
+                if snapFnNames is None:
+                    snapFnNames = iter(plotter.runSnapFns(snapFns))
+                yield from next(snapFnNames)
             elif isinstance(function, SetFn):
                 yield from plotter.runSetFn(function)
             elif isinstance(function, MultiSetFn):
@@ -97,6 +103,7 @@ def runFunctionsWithPlotter(plotter: Plotter, functions: List[PostprocessingFunc
             raise ValueError(f"Duplicate name: {name}")
         namesUsed.add(name)
         yield name
+    logging.info(fieldCache.summary())
 
 
 def create_pic_folder(parent_folder: Path) -> None:
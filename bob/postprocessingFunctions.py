@@ -4,13 +4,17 @@ import astropy.units as pq
 import matplotlib.pyplot as plt
 
 from abc import ABC, abstractmethod
-from typing import Any, Tuple, Iterable, Dict
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Iterable, Dict
+from bob.field import Field
 from bob.simulation import Simulation
 from bob.simulationSet import SimulationSet
 from bob.snapshot import Snapshot
 from bob.result import Result
 from bob.multiSet import MultiSet
 from bob.plotConfig import PlotConfig
+from bob.precision import precisions
+import bob.config
 
 
 def fillInUnit(label: str, unit: str) -> str:
@@ -27,6 +31,11 @@ class PostprocessingFunction(ABC):
         self.config = config
         self.config.setDefault("sims", None)
         self.config.setDefault("outputFileType", "png")
+        self.config.setDefault("precision", bob.config.precision, choices=precisions)
+        # Set by the plotter before post is called: the folder the result is saved to and whether data
+        # that earlier runs stored there may be reused
+        self.dataFolder: Optional[Path] = None
+        self.reuseStoredData = True
 
     def getName(self, **kwargs: Any) -> str:
         combined = self.config.copy()
@@ -111,6 +120,11 @@ class SnapFn(PostprocessingFunction):
         result.time = snap.timeQuantity(self.config["time"])
         return result
 
+    # Fields that post will need for the whole snapshot. They are loaded once before all functions
+    # that run on the snapshot and kept until all of them are done.
+    def requiredFields(self, sim: Simulation, snap: Snapshot) -> List[Field]:
+        return []
+
 
 class SetFn(PostprocessingFunction):
     def __init__(self, config: PlotConfig) -> None:
@@ -0,0 +1,32 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+import numpy as np
+
+import bob.config
+
+precisions = ["float32", "float64"]
+
+
+def getFieldDtype() -> np.dtype:
+    return np.dtype(bob.config.precision)
+
+
+def castToFieldPrecision(data: Any) -> Any:
+    # Only reduces the precision of floating point data, everything else is kept as is.
+    # Data that would overflow in the lower precision (e.g. volumes in cm^3) is also kept.
+    fieldDtype = getFieldDtype()
+    if isinstance(data, np.ndarray) and np.issubdtype(data.dtype, np.floating) and data.dtype.itemsize > fieldDtype.itemsize:
+        if data.size > 0 and np.nanmax(np.abs(np.asarray(data))) > np.finfo(fieldDtype).max:
+            return data
+        return data.astype(fieldDtype)
+    return data
+
+
+@contextmanager
+def fieldPrecision(precision: str) -> Iterator[None]:
+    previous = bob.config.precision
+    bob.config.precision = precision
+    try:
+        yield
+    finally:
+        bob.config.precision = previous
@@ -0,0 +1,39 @@
+import multiprocessing
+import threading
+from multiprocessing.pool import AsyncResult
+from typing import Any, Callable, List, Tuple
+
+from bob.pool import initWorker
+
+
+class RenderQueue:
+    # Renders plots in separate processes while the next results are being computed. At most maxSize plots
+    # wait for (or are being) rendered, submitting more blocks until one of them is done, so that memory stays bounded.
+    def __init__(self, numProcesses: int, maxSize: int) -> None:
+        self.pool = multiprocessing.Pool(numProcesses, initializer=initWorker)
+        self.slots = threading.BoundedSemaphore(maxSize)
+        self.pending: List[AsyncResult] = []
+
+    def submit(self, fn: Callable[..., Any], args: Tuple[Any, ...], callback: Callable[[Any], None]) -> None:
+        self.slots.acquire()
+
+        def onSuccess(value: Any) -> None:
+            try:
+                callback(value)
+            finally:
+                self.slots.release()
+
+        def onError(_: BaseException) -> None:
+            self.slots.release()
+
+        self.pending.append(self.pool.apply_async(fn, args, callback=onSuccess, error_callback=onError))
+
+    # Waits for all plots to be rendered, errors of the rendering processes are raised here
+    def finish(self) -> None:
+        self.pool.close()
+        try:
+            for pending in self.pending:
+                pending.get()
+        finally:
+            self.pool.terminate()
+            self.pool.join()
@@ -7,6 +7,7 @@ import numpy as np
 import astropy.units as pq
 
 from bob.util import getFolders, getFilesWithSuffix
+from bob.precision import castToFieldPrecision
 
 numpyFileEnding = ".npy"
 unitFileEnding = ".unit"
@@ -46,7 +47,7 @@ def saveUnit(filename: Path, unit: pq.UnitBase) -> None:
 def saveQuantity(filenameBase: Path, quantity: pq.Quantity) -> None:
     dataFileName = filenameBase.with_suffix(numpyFileEnding)
     unitFileName = filenameBase.with_suffix(unitFileEnding)
-    np.save(dataFileName, quantity.value)
+    np.save(dataFileName, castToFieldPrecision(quantity.value))
     saveUnit(unitFileName, quantity.unit)
 
 
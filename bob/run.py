@@ -17,7 +17,7 @@ def getJobFileContents(params: dict[str, Any]) -> str:
     return jobFileTemplate.format(**params)
 
 
-def runPlotConfig(plot: Path) -> None:
+def runPlotConfig(plot: Path, resume: bool = False) -> None:
     name = plot.name
     logFile = Path(name).with_suffix(".log")
     params = {
@@ -28,7 +28,7 @@ def runPlotConfig(plot: Path) -> None:
         "logFile": logFile,
         "runProgram": "/gpfs/bwfor/home/hd/hd_hd/hd_hp240/projects/cpython/python",
         "executableName": "/gpfs/bwfor/home/hd/hd_hd/hd_hp240/projects/pybob/main.py",
-        "params": f"--post plot . {plot}",
+        "params": f"--post plot {'--resume ' if resume else ''}. {plot}",
     }
     jobFile = (Path(".") / plot.name).with_suffix(".job")
     with open(jobFile, "w") as f:
@@ -0,0 +1,61 @@
+import fcntl
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, IO, Optional, Set
+
+
+class RunJournal:
+    # The plots that a run has completed, one line per plot, appended as soon as the result of the plot has been
+    # saved. Lines are short and written with a single append, so workers can write to the journal concurrently.
+    # The run that opened the journal holds a lock on it until it is closed, so that no other run rewrites it meanwhile.
+    def __init__(self, filename: Path, entries: Set[str], lockFile: Optional[IO[str]] = None) -> None:
+        self.filename = filename
+        self.entries = entries
+        self.lockFile = lockFile
+
+    # Worker processes only append to the journal, the lock stays with the run that opened it
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["lockFile"] = None
+        return state
+
+    # Continues the journal of an earlier run if resume is set, otherwise starts a new one.
+    # Returns None if another run is currently using the journal.
+    @staticmethod
+    def open(filename: Path, resume: bool) -> Optional["RunJournal"]:
+        filename.parent.mkdir(parents=True, exist_ok=True)
+        lockFile = filename.with_name(f".{filename.name}.lock").open("w")
+        try:
+            fcntl.flock(lockFile, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lockFile.close()
+            logging.warning(f"Journal {filename} is in use by another run, this run will not be journaled")
+            return None
+        entries: Set[str] = set()
+        if resume and filename.is_file():
+            with filename.open("r") as f:
+                # The last line might be incomplete if the run was killed while writing it
+                entries = set(line[:-1] for line in f if line.endswith("\n"))
+            logging.info(f"Resuming run, {len(entries)} plots are already done")
+        journal = RunJournal(filename, entries, lockFile)
+        journal.rewrite()
+        return journal
+
+    def rewrite(self) -> None:
+        tempFilename = self.filename.with_name(f".{self.filename.name}.{os.getpid()}")
+        tempFilename.write_text("".join(f"{entry}\n" for entry in sorted(self.entries)))
+        os.replace(tempFilename, self.filename)
+
+    def close(self) -> None:
+        if self.lockFile is not None:
+            self.lockFile.close()
+            self.lockFile = None
+
+    def contains(self, entry: str) -> bool:
+        return entry in self.entries
+
+    def add(self, entry: str) -> None:
+        self.entries.add(entry)
+        with self.filename.open("a") as f:
+            f.write(f"{entry}\n")
@@ -0,0 +1,80 @@
+from typing import Any, List, Optional, Sequence, Union
+import numpy as np
+
+FileSelection = Union[slice, np.ndarray]
+
+
+# Evenly strided, sorted indices can be read as a single hyperslab
+def toSlice(indices: np.ndarray) -> FileSelection:
+    if indices.shape[0] == 0:
+        return slice(0, 0, 1)
+    if indices.shape[0] == 1:
+        return slice(int(indices[0]), int(indices[0]) + 1, 1)
+    steps = np.diff(indices)
+    if np.all(steps == steps[0]):
+        return slice(int(indices[0]), int(indices[-1]) + 1, int(steps[0]))
+    return indices
+
+
+class Selection:
+    def __init__(self, indices: FileSelection, inverse: Optional[np.ndarray] = None) -> None:
+        self.indices = indices
+        self.inverse = inverse
+
+    @staticmethod
+    def fromIndices(indices: Any, length: int) -> Optional["Selection"]:
+        # Returns None for index types that cannot be translated into per-file selections
+        if indices is None or indices is Ellipsis:
+            return Selection(slice(0, length, 1))
+        if type(indices) == tuple and len(indices) == 1:
+            indices = indices[0]
+        if isinstance(indices, slice):
+            start, stop, step = indices.indices(length)
+            if step > 0:
+                return Selection(slice(start, max(start, stop), step))
+            indices = np.arange(start, stop, step)
+        indices = np.asarray(indices)
+        if indices.ndim != 1:
+            return None
+        if indices.dtype == bool:
+            if indices.shape[0] != length:
+                return None
+            return Selection(toSlice(np.flatnonzero(indices)))
+        if indices.shape[0] == 0:
+            return Selection(slice(0, 0, 1))
+        if not np.issubdtype(indices.dtype, np.integer):
+            return None
+        indices = np.where(indices < 0, indices + length, indices)
+        if np.any(indices < 0) or np.any(indices >= length):
+            raise IndexError(f"Index out of bounds for field of length {length}")
+        if np.all(np.diff(indices) > 0):
+            return Selection(toSlice(indices))
+        unique, inverse = np.unique(indices, return_inverse=True)
+        return Selection(toSlice(unique), inverse)
+
+    def splitByFile(self, counts: Sequence[int]) -> List[FileSelection]:
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return [self.restrictTo(int(lower), int(upper)) for (lower, upper) in zip(offsets, offsets[1:])]
+
+    def restrictTo(self, lower: int, upper: int) -> FileSelection:
+        if isinstance(self.indices, slice):
+            start, stop, step = self.indices.start, self.indices.stop, self.indices.step
+            if start < lower:
+                start += -(-(lower - start) // step) * step
+            stop = min(stop, upper)
+            if start >= stop:
+                return slice(0, 0, 1)
+            return slice(start - lower, stop - lower, step)
+        first, last = np.searchsorted(self.indices, [lower, upper])
+        return toSlice(self.indices[first:last] - lower)
+
+    def restoreOrder(self, data: Any) -> Any:
+        if self.inverse is None:
+            return data
+        return data[self.inverse]
+
+
+def selectionLength(selection: FileSelection) -> int:
+    if isinstance(selection, slice):
+        return len(range(selection.start, selection.stop, selection.step))
+    return selection.shape[0]
@@ -1,22 +1,30 @@
+import bisect
 import os
 from pathlib import Path
 
 import numpy as np
-from typing import Dict, Any, List, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 import yaml
-from astropy.cosmology import FlatLambdaCDM, z_at_value
+from astropy.cosmology import FlatLambdaCDM
 import astropy.units as pq
 
 import bob.config as config
 from bob.simType import SimType
 from bob.snapshot import Snapshot
+from bob.snapshotIndex import SnapshotIndex, SnapshotMetadata
 from bob.sources import Sources
 from bob.baseSim import BaseSim
+from bob.metadataCache import MetadataCache
+from bob.cosmologyTables import CosmologyTables, getCosmologyTables
+from bob.util import yamlLoader
+
+paramsFileName = "bobParams.yaml"
 
 
 def getParams(folder: Path) -> Dict[str, Any]:
-    bobParamsFile = folder / "bobParams.yaml"
-    contents = yaml.load(bobParamsFile.open("r"), Loader=yaml.SafeLoader)
+    bobParamsFile = folder / paramsFileName
+    with bobParamsFile.open("r") as f:
+        contents = yaml.load(f, Loader=yamlLoader)
     result = {}
     for k, v in contents.items():
         if v == "None":
@@ -41,20 +49,27 @@ def getParamValue(type_: str, value: Any) -> Union[str, bool, int, float, List[i
 
 
 class Simulation(BaseSim):
-    def __init__(self, folder: Path) -> None:
+    def __init__(self, folder: Path, params: Optional[Dict[str, Any]] = None) -> None:
         self.folder = folder
-        self.params = getParams(folder)
+        self.params = getParams(folder) if params is None else params
+        self.label = self.params.get("simLabel")
+        self.snapshotIndex = SnapshotIndex(folder / config.snapshotIndexFileName)
+        self.metadata = MetadataCache()
+
+    # Rereads the parameters and forgets everything derived from them or from the files of the simulation
+    def invalidate(self) -> None:
+        self.params = getParams(self.folder)
         self.label = self.params.get("simLabel")
+        self.metadata.clear()
 
     @property  # type: ignore
     def log(self) -> List[str]:
         with (self.folder / config.arepoLogFile).open("r", errors="replace") as f:
             return f.readlines()
 
-    @property  # type: ignore
-    def cpuFile(self) -> List[str]:
-        with (self.outputDir / config.cpuLogFile).open("r", errors="replace") as f:
-            return f.readlines()
+    @property
+    def cpuLogFile(self) -> Path:
+        return self.outputDir / config.cpuLogFile
 
     def __repr__(self) -> str:
         return f"Sim{self.name}"
@@ -65,6 +80,15 @@ class Simulation(BaseSim):
 
     @property
     def snapshots(self) -> List[Snapshot]:
+        # Snapshots are only added, removed or replaced by changing the output directory, which updates its modification time.
+        # The snapshot files are therefore only listed and checked against the index again once it has changed.
+        snapshotMetadata = self.metadata.get("snapshotMetadata", self.readSnapshotMetadata, self.outputDir.stat().st_mtime_ns)
+        return [Snapshot(self, metadata.path, metadata) for metadata in snapshotMetadata]
+
+    def readSnapshotMetadata(self) -> List[SnapshotMetadata]:
+        return self.snapshotIndex.update(self.findSnapshotFiles())
+
+    def findSnapshotFiles(self) -> List[Path]:
         if self.params["NumFilesPerSnapshot"] > 1:
             snapshotFileBase = "snapdir"  # just arepo things
             snapshotGlob = "snapdir*"
@@ -81,11 +105,25 @@ class Simulation(BaseSim):
             return int(nameRep)
 
         snapshotFiles.sort(key=getNumber)
-        return [Snapshot(self, s) for s in snapshotFiles]
+        return snapshotFiles
 
     def getSnapshotAtRedshift(self, redshift: pq.dimensionless_unscaled) -> Snapshot:
+        assert self.params["ComovingIntegrationOn"]
         snapshots = self.snapshots
-        return min(snapshots, key=lambda snap: abs(redshift - self.getRedshift(snap.scale_factor)))
+        redshifts = [self.getSnapshotRedshift(snap) for snap in snapshots]
+        candidates = list(range(len(snapshots)))
+        # Bisect on the negated redshifts, which increase with the snapshot number
+        negatedRedshifts = [-z for z in redshifts]
+        if all(z1 <= z2 for (z1, z2) in zip(negatedRedshifts, negatedRedshifts[1:])):
+            # The closest snapshot is one of the two neighbours of the requested redshift
+            i = bisect.bisect_left(negatedRedshifts, -float(redshift))
+            candidates = candidates[max(0, i - 1) : i + 1]
+        return snapshots[min(candidates, key=lambda i: abs(float(redshift) - redshifts[i]))]
+
+    def getSnapshotRedshift(self, snap: Snapshot) -> float:
+        if snap.metadata is not None and snap.metadata.redshift is not None:
+            return snap.metadata.redshift
+        return float(self.getRedshift(snap.scale_factor))
 
     def icsFile(self) -> Snapshot:
         icsFilePath = self.folder / "{}.hdf5".format(self.params["InitCondFile"])
@@ -94,6 +132,10 @@ class Simulation(BaseSim):
             print(f"ics are not a file, trying {icsFilePath}, not checking other files")
         return Snapshot(self, icsFilePath)
 
+    @property
+    def icsTime(self) -> float:
+        return self.metadata.get("icsTime", lambda: float(self.icsFile().attrs["Time"]))
+
     def sources(self) -> Sources:
         return Sources(self.folder / self.params["TestSrcFile"])
 
@@ -112,32 +154,32 @@ class Simulation(BaseSim):
             lines = f.readlines()
             assert len(lines) == 1
             minX, maxX, minY, maxY, minZ, maxZ = [float(x) for x in lines[0].split(" ")]
-            raise NotImplementedError("Need to get the length unit of the subbox snapshot here")
-            unit = pq.m
+            unit = self.lengthUnit
             return (unit * np.array([minX, minY, minZ]), unit * np.array([maxX, maxY, maxZ]))
 
-    def getCosmology(self) -> FlatLambdaCDM:
+    def getCosmologyTables(self) -> CosmologyTables:
         Ob0 = self.params["OmegaBaryon"]
         Om0 = self.params["Omega0"]
         H0 = self.params["HubbleParam"] * 100.0
-        return FlatLambdaCDM(H0=H0, Om0=Om0, Ob0=Ob0)
+        return getCosmologyTables(H0, Om0, Ob0)
+
+    def getCosmology(self) -> FlatLambdaCDM:
+        return self.getCosmologyTables().cosmology
 
     def getRedshift(self, scale_factor: float, doAssert: bool = True) -> pq.Quantity:
-        if abs(1.0 - scale_factor) < 1e-4:
-            print("Found scale factor ~= 1, returning redshift 0")
-            return 0.0 * pq.dimensionless_unscaled
-        cosmology = self.getCosmology()
         if doAssert:
             assert self.params["ComovingIntegrationOn"]
-        return z_at_value(cosmology.scale_factor, scale_factor)
+        return (1.0 / pq.Quantity(scale_factor) - 1.0) * pq.dimensionless_unscaled
 
     def getLookbackTime(self, scale_factor: float, doAssert: bool = True) -> float:
-        cosmology = self.getCosmology()
-        return cosmology.lookback_time(self.getRedshift(scale_factor, doAssert=doAssert))
+        if doAssert:
+            assert self.params["ComovingIntegrationOn"]
+        return self.getCosmologyTables().lookbackTime(scale_factor)
 
     def getAge(self, scale_factor: float, doAssert: bool = True) -> float:
-        cosmology = self.getCosmology()
-        return cosmology.age(self.getRedshift(scale_factor, doAssert=doAssert))
+        if doAssert:
+            assert self.params["ComovingIntegrationOn"]
+        return self.getCosmologyTables().age(scale_factor)
 
     @property
     def lengthUnit(self) -> pq.Quantity:
@@ -155,6 +197,9 @@ class Simulation(BaseSim):
             return pq.dimensionless_unscaled
 
     def simType(self) -> SimType:
+        return self.metadata.get("simType", self.findSimType)
+
+    def findSimType(self) -> SimType:
         if self.params.get("simType") == "POST_STANDARD_ICS_COSMOLOGICAL":
             return SimType.POST_STANDARD_ICS_COSMOLOGICAL
         comoving = self.params["ComovingIntegrationOn"]
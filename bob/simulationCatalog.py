@@ -0,0 +1,119 @@
+import json
+import logging
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import yaml
+
+import bob.config
+from bob.simulation import getParams, paramsFileName
+from bob.util import getFileStats
+
+# Conditions like "SX_SOURCES == 10", multiple conditions are separated by "," or "and"
+conditionPattern = re.compile(r"^\s*(\w+)\s*(==|!=|<=|>=|<|>|=)\s*(.+?)\s*$")
+conditionSeparator = re.compile(r"\s*,\s*|\s+and\s+")
+
+
+def getNumber(value: Any) -> Optional[float]:
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return None
+
+
+def getConditionSql(name: str, operator: str, valueString: str) -> Tuple[str, List[Any]]:
+    value = yaml.safe_load(valueString)
+    operator = "==" if operator == "=" else operator
+    number = getNumber(value)
+    if number is not None:
+        return f"SELECT folder FROM params WHERE name = ? AND number {operator} ?", [name, number]
+    if operator not in ["==", "!="]:
+        raise ValueError(f"Only numbers can be compared with {operator}: {valueString}")
+    return f"SELECT folder FROM params WHERE name = ? AND value {operator} ?", [name, json.dumps(value)]
+
+
+def isSimulationQuery(select: Any) -> bool:
+    return isinstance(select, str)
+
+
+class SimulationCatalog:
+    # The parameters of all simulations in a simulation set folder. Each parameter is a row of an
+    # indexed table, so that simulations can be selected by their parameters without parsing any files.
+    def __init__(self, filename: Path) -> None:
+        try:
+            self.connection = sqlite3.connect(filename, timeout=60)
+            self.createTables()
+        except sqlite3.Error as e:
+            logging.debug(f"Could not open simulation catalog {filename}: {e}")
+            self.connection = sqlite3.connect(":memory:")
+            self.createTables()
+
+    @staticmethod
+    def open(simSetFolder: Path) -> "SimulationCatalog":
+        return SimulationCatalog(simSetFolder / bob.config.simulationCatalogFileName)
+
+    def createTables(self) -> None:
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS sims (folder TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, params TEXT)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS params (folder TEXT, name TEXT, value TEXT, number REAL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS paramsByValue ON params (name, value)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS paramsByNumber ON params (name, number)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS paramsByFolder ON params (folder)")
+
+    # Returns the parameters of the simulations, only parameter files that changed since the last call are parsed
+    def update(self, folders: List[Path]) -> Dict[Path, Dict[str, Any]]:
+        stats = {folder: getFileStats([folder / paramsFileName])[0] for folder in folders}
+        stored = {
+            folder: (mtime, size, params) for (folder, mtime, size, params) in self.connection.execute("SELECT folder, mtime, size, params FROM sims")
+        }
+        result: Dict[Path, Dict[str, Any]] = {}
+        stale = []
+        for folder in folders:
+            entry = stored.get(str(folder.resolve()))
+            if entry is not None and [entry[0], entry[1]] == stats[folder]:
+                result[folder] = json.loads(entry[2])
+            else:
+                stale.append(folder)
+        if len(stale) > 1 and bob.config.numProcesses > 1:
+            with ProcessPoolExecutor(min(bob.config.numProcesses, len(stale))) as executor:
+                parsed = list(executor.map(getParams, stale))
+        else:
+            parsed = [getParams(folder) for folder in stale]
+        try:
+            with self.connection:
+                for folder, params in zip(stale, parsed):
+                    self.store(folder, stats[folder], params)
+        except sqlite3.Error as e:
+            logging.debug(f"Could not update simulation catalog: {e}")
+        result.update(zip(stale, parsed))
+        return result
+
+    def store(self, folder: Path, stats: List[int], params: Dict[str, Any]) -> None:
+        key = str(folder.resolve())
+        self.connection.execute("DELETE FROM params WHERE folder = ?", (key,))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sims (folder, mtime, size, params) VALUES (?, ?, ?, ?)",
+            (key, stats[0], stats[1], json.dumps(params, default=repr)),
+        )
+        self.connection.executemany(
+            "INSERT INTO params (folder, name, value, number) VALUES (?, ?, ?, ?)",
+            [(key, name, json.dumps(value, default=repr), getNumber(value)) for (name, value) in params.items()],
+        )
+
+    # Returns the folders of all simulations that fulfill all conditions of the query, e.g. "SX_SOURCES == 10, OmegaBaryon < 0.05"
+    def query(self, query: str) -> List[Path]:
+        statement = "SELECT folder FROM sims"
+        arguments: List[Any] = []
+        conditions = [condition for condition in conditionSeparator.split(query.strip()) if condition != ""]
+        for condition in conditions:
+            match = conditionPattern.match(condition)
+            if match is None:
+                raise ValueError(f"Invalid simulation query: {condition}")
+            conditionStatement, conditionArguments = getConditionSql(*match.groups())
+            statement = f"{statement} INTERSECT {conditionStatement}"
+            arguments.extend(conditionArguments)
+        return [Path(folder) for (folder,) in self.connection.execute(statement, arguments)]
+
+    def close(self) -> None:
+        self.connection.close()
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from bob.simulation import Simulation
 from bob.raxiomSimulation import RaxiomSimulation
+from bob.simulationCatalog import SimulationCatalog
 
 AnySim = Simulation | RaxiomSimulation
 
@@ -34,23 +35,20 @@ class SimulationSet(list):
             # Return one SimSet per simulation
             return [(dict(getConfiguration(sim, [])), SimulationSet(self.sim_type, [sim])) for sim in self]
         else:
-            configurations = list(set(getConfiguration(sim, parameters) for sim in self))
-            configurations.sort()
-            return [
-                (
-                    dict(configuration),
-                    SimulationSet(
-                        self.sim_type,
-                        [sim for sim in self if getConfiguration(sim, parameters) == configuration],
-                    ),
-                )
-                for configuration in configurations
-            ]
+            groups: Dict[Tuple[Tuple[Any, Any], ...], List[AnySim]] = {}
+            for sim in self:
+                groups.setdefault(getConfiguration(sim, parameters), []).append(sim)
+            return [(dict(configuration), SimulationSet(self.sim_type, groups[configuration])) for configuration in sorted(groups)]
 
 
 def getSimsFromFolder(sim_type: Any, sim_set_folder: Path) -> SimulationSet:
     folders = [sim_set_folder / Path(folder) for folder in os.listdir(sim_set_folder) if stringIsInt(folder)]
     folders.sort(key=lambda x: int(str(x.stem)))
+    if sim_type == Simulation:
+        catalog = SimulationCatalog.open(sim_set_folder)
+        params = catalog.update(folders)
+        catalog.close()
+        return SimulationSet(sim_type, (Simulation(folder, params[folder]) for folder in folders))
     return SimulationSet(sim_type, (sim_type(folder) for folder in folders))
 
 
@@ -69,3 +67,14 @@ def stringIsInt(s: str) -> bool:
         return True
     except ValueError:
         return False
+
+
+# Returns the simulations whose parameters match the query (see SimulationCatalog.query)
+def querySims(sims: SimulationSet, query: str) -> List[AnySim]:
+    matching = set()
+    for simSetFolder in set(sim.folder.parent for sim in sims):
+        catalog = SimulationCatalog.open(simSetFolder)
+        catalog.update([sim.folder for sim in sims if sim.folder.parent == simSetFolder])
+        matching.update(catalog.query(query))
+        catalog.close()
+    return [sim for sim in sims if sim.folder.resolve() in matching]
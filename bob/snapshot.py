@@ -1,5 +1,5 @@
 import os
-from typing import Union, Tuple, TYPE_CHECKING, Dict, Any, Callable
+from typing import Union, Tuple, TYPE_CHECKING, Dict, Any, Callable, Iterator, List, Optional
 from pathlib import Path
 import numpy as np
 import h5py
@@ -7,9 +7,11 @@ import re
 import astropy.units as pq
 from bob.basicField import BasicField
 from bob.timeUtils import TimeQuantity
+from bob.hdf5Pool import hdf5Pool
 
 if TYPE_CHECKING:
     from bob.simulation import Simulation
+    from bob.snapshotIndex import SnapshotMetadata
 
 
 class SnapNumber:
@@ -17,13 +19,29 @@ class SnapNumber:
         self.value = value
 
 
+def getFileNumber(filename: Path) -> int:
+    # Files of a multi-file snapshot are named snap_005.3.hdf5
+    m = re.match(".*\\.([0-9]+)\\.hdf5", filename.name)
+    if m is None:
+        return 0
+    return int(m.groups()[0])
+
+
+def getSnapshotFilenames(path: Path) -> List[Path]:
+    if path.is_dir():
+        return sorted((path / f for f in os.listdir(path)), key=getFileNumber)
+    else:
+        return [path]
+
+
 class Snapshot:
-    def __init__(self, sim: "Simulation", path: Path) -> None:
+    def __init__(self, sim: "Simulation", path: Path, metadata: Optional["SnapshotMetadata"] = None) -> None:
         self.path = path
-        if path.is_dir():
-            self.filenames = [path / f for f in os.listdir(path)]
+        self.metadata = metadata
+        if metadata is not None:
+            self.filenames = metadata.files
         else:
-            self.filenames = [path]
+            self.filenames = getSnapshotFilenames(path)
         self.name = self.getName()
         self.sim = sim
         if "subbox" in self.name:
@@ -40,19 +58,29 @@ class Snapshot:
             self.maxExtent = np.array([1.0, 1.0, 1.0]) * sim.params["BoxSize"] * self.lengthUnit
             self.center = (self.maxExtent + self.minExtent) * 0.5
 
-    @property
-    def hdf5Files(self) -> list[h5py.File]:
+    def hdf5File(self, filename: Path) -> h5py.File:
         try:
-            return [h5py.File(f, "r") for f in self.filenames]
+            return hdf5Pool.get(filename)
         except OSError:
             print(f"Failed to open snapshot: {self.path}")
             raise
 
-    def filterHdf5Files(self, predicate: Callable[[h5py.File], bool]) -> list[h5py.File]:
-        return [f for f in self.hdf5Files if predicate(f)]
+    @property
+    def hdf5Files(self) -> Iterator[h5py.File]:
+        return (self.hdf5File(f) for f in self.filenames)
+
+    def filterFilenames(self, predicate: Callable[[h5py.File], bool]) -> List[Path]:
+        return [f for f in self.filenames if predicate(self.hdf5File(f))]
+
+    def filenamesWithDataset(self, dataset: str) -> List[Path]:
+        return self.filterFilenames(lambda f: dataset in f)
+
+    def numPartThisFile(self, filename: Path) -> np.ndarray:
+        return self.hdf5File(filename)["Header"].attrs["NumPart_ThisFile"]
 
-    def hdf5FilesWithDataset(self, dataset: str) -> list[h5py.File]:
-        return self.filterHdf5Files(lambda f: dataset in f)
+    def close(self) -> None:
+        for f in self.filenames:
+            hdf5Pool.close(f)
 
     def getName(self) -> str:
         if self.path.is_dir():
@@ -107,11 +135,13 @@ class Snapshot:
 
     @property
     def scale_factor(self) -> float:
-        return self.hdf5Files[0]["Header"].attrs["Time"]
+        if self.metadata is not None:
+            return self.metadata.time
+        return self.attrs["Time"]
 
     @property
     def time(self) -> pq.Quantity:
-        return self.hdf5Files[0]["Header"].attrs["Time"] * self.timeUnit
+        return self.scale_factor * self.timeUnit
 
     def timeQuantity(self, quantity: str) -> pq.Quantity:
         time = TimeQuantity(self.sim, self.scale_factor * self.timeUnit)
@@ -125,4 +155,4 @@ class Snapshot:
 
     @property
     def attrs(self) -> Dict[str, Any]:
-        return self.hdf5Files[0]["Header"].attrs
+        return self.hdf5File(self.filenames[0])["Header"].attrs
@@ -0,0 +1,107 @@
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import h5py
+import yaml
+
+from bob.snapshot import getSnapshotFilenames
+from bob.util import getFileStats, yamlDumper, yamlLoader
+
+
+class SnapshotMetadata:
+    def __init__(
+        self,
+        path: Path,
+        files: List[Path],
+        stats: List[List[int]],
+        time: float,
+        redshift: Optional[float],
+        numPartTotal: List[int],
+    ) -> None:
+        self.path = path
+        self.files = files
+        self.stats = stats
+        self.time = time
+        self.redshift = redshift
+        self.numPartTotal = numPartTotal
+
+    @staticmethod
+    def read(path: Path) -> "SnapshotMetadata":
+        files = getSnapshotFilenames(path)
+        # Stat before reading so that a file that changes in between is picked up on the next update
+        stats = getFileStats(files)
+        with h5py.File(files[0], "r") as f:
+            attrs = f["Header"].attrs
+            time = float(attrs["Time"])
+            redshift = float(attrs["Redshift"]) if "Redshift" in attrs else None
+            numPartTotal = [int(n) for n in attrs["NumPart_Total"]]
+            if "NumPart_Total_HighWord" in attrs:
+                numPartTotal = [n + (int(high) << 32) for (n, high) in zip(numPartTotal, attrs["NumPart_Total_HighWord"])]
+        return SnapshotMetadata(path, files, stats, time, redshift, numPartTotal)
+
+    def isValid(self) -> bool:
+        try:
+            return getSnapshotFilenames(self.path) == self.files and getFileStats(self.files) == self.stats
+        except OSError:
+            return False
+
+    def toDict(self) -> Dict[str, Any]:
+        return {
+            "files": [f.name for f in self.files],
+            "stats": self.stats,
+            "time": self.time,
+            "redshift": self.redshift,
+            "numPartTotal": self.numPartTotal,
+        }
+
+    @staticmethod
+    def fromDict(path: Path, d: Dict[str, Any]) -> "SnapshotMetadata":
+        files = [path / f for f in d["files"]] if path.is_dir() else [path]
+        return SnapshotMetadata(path, files, d["stats"], d["time"], d["redshift"], d["numPartTotal"])
+
+
+class SnapshotIndex:
+    def __init__(self, filename: Path) -> None:
+        self.filename = filename
+        self.entries: Optional[Dict[Path, SnapshotMetadata]] = None
+
+    def load(self, outputDir: Path) -> Dict[Path, SnapshotMetadata]:
+        if not self.filename.is_file():
+            return {}
+        try:
+            with self.filename.open("r") as f:
+                contents = yaml.load(f, Loader=yamlLoader)
+            return {outputDir / name: SnapshotMetadata.fromDict(outputDir / name, d) for (name, d) in contents.items()}
+        except Exception as e:
+            logging.debug(f"Ignoring invalid snapshot index {self.filename}: {e}")
+            return {}
+
+    def save(self) -> None:
+        assert self.entries is not None
+        contents = {path.name: entry.toDict() for (path, entry) in self.entries.items()}
+        # Write to a temporary file first so that concurrent readers never see a partially written index
+        tempFilename = self.filename.with_name(f".{self.filename.name}.{os.getpid()}")
+        try:
+            with tempFilename.open("w") as f:
+                yaml.dump(contents, f, Dumper=yamlDumper)
+            os.replace(tempFilename, self.filename)
+        except OSError as e:
+            logging.debug(f"Could not write snapshot index {self.filename}: {e}")
+
+    def update(self, paths: List[Path]) -> List[SnapshotMetadata]:
+        if self.entries is None:
+            self.entries = self.load(paths[0].parent) if len(paths) > 0 else {}
+        changed = set(self.entries) != set(paths)
+        entries = {}
+        for path in paths:
+            entry = self.entries.get(path)
+            if entry is None or not entry.isValid():
+                entry = SnapshotMetadata.read(path)
+                changed = True
+            entries[path] = entry
+        self.entries = entries
+        if changed:
+            self.save()
+        return list(entries.values())
@@ -1,3 +1,5 @@
+from pathlib import Path
+from typing import List, Sequence
 from bob.field import Field
 from bob.basicField import BasicField
 from bob.snapshot import Snapshot
@@ -9,8 +11,18 @@ from scipy.spatial import cKDTree
 
 
 class SourceField(Field):
-    def getData(self, snapshot: Snapshot) -> np.ndarray:
-        coords = BasicField("Coordinates", partType=0).getData(snapshot)
+    persistent = True
+
+    def inputs(self, snapshot: Snapshot) -> Sequence[Field]:
+        return [BasicField("Coordinates", partType=0)]
+
+    def dependencies(self, snapshot: Snapshot) -> List[Path]:
+        if snapshot.sim.params["SX_SOURCES"] == 10:
+            return [snapshot.sim.folder / snapshot.sim.params["TestSrcFile"]]
+        return []
+
+    def compute(self, snapshot: Snapshot, inputs: Sequence[pq.Quantity]) -> np.ndarray:
+        (coords,) = inputs
         tree = cKDTree(coords)
         source = np.zeros(coords.shape[0]) / pq.s
         type_ = snapshot.sim.params["SX_SOURCES"]
@@ -0,0 +1,150 @@
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+import astropy.units as pq
+import astropy.cosmology.units as cu
+
+import bob.config
+from bob.basicField import BasicField, splitScale
+from bob.util import getFileStats
+
+if TYPE_CHECKING:
+    from bob.snapshot import Snapshot
+
+ToValue = Callable[[pq.Quantity], np.ndarray]
+
+
+class Region(ABC):
+    # Returns for each bounding box (given by its lower and upper corner) whether it could contain cells of the region
+    @abstractmethod
+    def intersects(self, lower: np.ndarray, upper: np.ndarray, toValue: ToValue) -> np.ndarray:
+        pass
+
+
+class Box(Region):
+    def __init__(self, lower: pq.Quantity, upper: pq.Quantity) -> None:
+        self.lower = lower
+        self.upper = upper
+
+    def intersects(self, lower: np.ndarray, upper: np.ndarray, toValue: ToValue) -> np.ndarray:
+        return np.all((lower <= toValue(self.upper)) & (upper >= toValue(self.lower)), axis=1)
+
+
+class Sphere(Region):
+    def __init__(self, center: pq.Quantity, radius: pq.Quantity) -> None:
+        self.center = center
+        self.radius = radius
+
+    def intersects(self, lower: np.ndarray, upper: np.ndarray, toValue: ToValue) -> np.ndarray:
+        center = toValue(self.center)
+        closestPoint = np.clip(center, lower, upper)
+        return np.sum((closestPoint - center) ** 2, axis=1) <= toValue(self.radius) ** 2
+
+
+class Slab(Region):
+    def __init__(self, axis: int, lower: pq.Quantity, upper: pq.Quantity) -> None:
+        self.axis = axis
+        self.lower = lower
+        self.upper = upper
+
+    def intersects(self, lower: np.ndarray, upper: np.ndarray, toValue: ToValue) -> np.ndarray:
+        return (lower[:, self.axis] <= toValue(self.upper)) & (upper[:, self.axis] >= toValue(self.lower))
+
+
+def getSpatialIndexFile(snapshot: "Snapshot") -> Path:
+    return snapshot.sim.folder / bob.config.spatialIndexFolder / f"{snapshot.path.name}.npz"
+
+
+class SpatialIndex:
+    # Bounding boxes of the gas cell coordinates in blocks of consecutive cells. The cells of
+    # each block are given by the range starts[i]:stops[i] of the indices accepted by BasicField.getData
+    def __init__(
+        self, stats: List[List[int]], starts: np.ndarray, stops: np.ndarray, lower: np.ndarray, upper: np.ndarray, unit: pq.UnitBase
+    ) -> None:
+        self.stats = stats
+        self.starts = starts
+        self.stops = stops
+        self.lower = lower
+        self.upper = upper
+        self.unit = unit
+
+    @staticmethod
+    def build(snapshot: "Snapshot") -> "SpatialIndex":
+        field = BasicField("Coordinates", comoving=True)
+        stats = getFileStats(snapshot.filenames)
+        filenames = snapshot.filenamesWithDataset("PartType0")
+        blockSize = bob.config.spatialIndexBlockSize
+        starts, stops, lower, upper = [], [], [], []
+        offset = 0
+        for filename in filenames:
+            dataset = snapshot.hdf5File(filename)["PartType0"]["Coordinates"]
+            count = snapshot.numPartThisFile(filename)[0]
+            for start in range(0, count, blockSize):
+                block = dataset[start : start + blockSize]
+                starts.append(offset + start)
+                stops.append(offset + start + block.shape[0])
+                lower.append(np.min(block, axis=0))
+                upper.append(np.max(block, axis=0))
+            offset += count
+        scale, unit = splitScale(field.getArbitraryUnit(snapshot, snapshot.hdf5File(filenames[0])["PartType0"]["Coordinates"]))
+        return SpatialIndex(
+            stats,
+            np.array(starts, dtype=np.int64),
+            np.array(stops, dtype=np.int64),
+            np.array(lower, dtype=np.float64).reshape(-1, 3) * scale,
+            np.array(upper, dtype=np.float64).reshape(-1, 3) * scale,
+            unit,
+        )
+
+    @staticmethod
+    def load(filename: Path) -> "SpatialIndex":
+        with np.load(filename) as data:
+            return SpatialIndex(data["stats"].tolist(), data["starts"], data["stops"], data["lower"], data["upper"], pq.Unit(str(data["unit"])))
+
+    def save(self, filename: Path) -> None:
+        try:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            with filename.open("wb") as f:
+                np.savez(
+                    f,
+                    stats=np.array(self.stats, dtype=np.int64),
+                    starts=self.starts,
+                    stops=self.stops,
+                    lower=self.lower,
+                    upper=self.upper,
+                    unit=np.array(self.unit.to_string()),
+                )
+        except OSError as e:
+            logging.debug(f"Could not write spatial index {filename}: {e}")
+
+    def getIndices(self, snapshot: "Snapshot", regions: Sequence[Region]) -> np.ndarray:
+        def toValue(quantity: pq.Quantity) -> np.ndarray:
+            return quantity.to_value(self.unit, cu.with_H0(snapshot.H0))
+
+        selected = np.zeros(self.starts.shape, dtype=bool)
+        for region in regions:
+            selected |= region.intersects(self.lower, self.upper, toValue)
+        if not np.any(selected):
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate([np.arange(start, stop) for (start, stop) in zip(self.starts[selected], self.stops[selected])])
+
+
+def getSpatialIndex(snapshot: "Snapshot") -> SpatialIndex:
+    filename = getSpatialIndexFile(snapshot)
+    spatialIndex: Optional[SpatialIndex] = None
+    if filename.is_file():
+        spatialIndex = SpatialIndex.load(filename)
+        if spatialIndex.stats != getFileStats(snapshot.filenames):
+            spatialIndex = None
+    if spatialIndex is None:
+        spatialIndex = SpatialIndex.build(snapshot)
+        spatialIndex.save(filename)
+    return spatialIndex
+
+
+# Returns the (sorted) indices of all gas cells in blocks that intersect any of the regions.
+# This is a superset of the cells inside the regions.
+def getRegionIndices(snapshot: "Snapshot", regions: Sequence[Region]) -> np.ndarray:
+    return getSpatialIndex(snapshot).getIndices(snapshot, regions)
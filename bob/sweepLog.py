@@ -0,0 +1,77 @@
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+
+import bob.config
+from bob.logPosition import LogPosition
+
+sweepRegex = re.compile(
+    rb"^SWEEP: Time ([0-9.+]+): Volume Av. H ionization: ([0-9.+]+), Mass Av. H ionization: ([0-9.+]+), Volume av. Ionization rate: ([0-9.+-e]+), Mass av. Ionization rate: ([0-9.+-e]+)",
+    re.MULTILINE,
+)
+columnNames = ["time", "volumeAv", "massAv", "volumeAvRate", "massAvRate"]
+
+
+def parseSweepRecords(data: bytes) -> np.ndarray:
+    matches = sweepRegex.findall(data)
+    if len(matches) == 0:
+        return np.zeros((0, len(columnNames)))
+    return np.array(matches, dtype=bytes).astype(np.float64)
+
+
+class SweepLog:
+    # The SWEEP records of an arepo log as columns (time in code units, volume and mass averaged
+    # ionization and ionization rates). The parsed records are cached together with the position up
+    # to which the log was parsed, so that later runs only parse the lines that were appended since.
+    def __init__(self, columns: np.ndarray, position: LogPosition) -> None:
+        self.columns = columns
+        self.position = position
+
+    @staticmethod
+    def empty() -> "SweepLog":
+        return SweepLog(np.zeros((0, len(columnNames))), LogPosition())
+
+    @staticmethod
+    def load(filename: Path) -> Optional["SweepLog"]:
+        if not filename.is_file():
+            return None
+        try:
+            with np.load(filename) as data:
+                return SweepLog(data["columns"], LogPosition(int(data["offset"]), str(data["tailHash"])))
+        except (OSError, ValueError, KeyError) as e:
+            logging.debug(f"Ignoring invalid sweep log cache {filename}: {e}")
+            return None
+
+    def save(self, filename: Path) -> None:
+        tempFilename = filename.with_name(f".{filename.name}.{os.getpid()}")
+        try:
+            with tempFilename.open("wb") as f:
+                np.savez(f, columns=self.columns, offset=np.array(self.position.offset), tailHash=np.array(self.position.tailHash))
+            os.replace(tempFilename, filename)
+        except OSError as e:
+            logging.debug(f"Could not write sweep log cache {filename}: {e}")
+
+    def update(self, logFile: Path) -> bool:
+        previousOffset = self.position.offset
+        newColumns: List[np.ndarray] = []
+        restarted = self.position.readAppended(logFile, b"\n", lambda data: newColumns.append(parseSweepRecords(data)))
+        if restarted:
+            self.columns = np.zeros((0, len(columnNames)))
+        self.columns = np.concatenate([self.columns, *newColumns])
+        return restarted or self.position.offset != previousOffset
+
+    def getColumns(self) -> Dict[str, np.ndarray]:
+        return {name: self.columns[:, i] for (i, name) in enumerate(columnNames)}
+
+
+def readSweepLog(simFolder: Path) -> Dict[str, np.ndarray]:
+    cacheFile = simFolder / bob.config.sweepLogCacheFileName
+    sweepLog = SweepLog.load(cacheFile)
+    if sweepLog is None:
+        sweepLog = SweepLog.empty()
+    if sweepLog.update(simFolder / bob.config.arepoLogFile):
+        sweepLog.save(cacheFile)
+    return sweepLog.getColumns()
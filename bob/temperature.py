@@ -1,31 +1,73 @@
 import numpy as np
+from typing import Any, Sequence
+import bob.config
 from bob.constants import kB, protonMass, gamma
 from bob.field import Field
-from bob.basicField import BasicField
+from bob.basicField import BasicField, getOutputDtype
 from bob.snapshot import Snapshot
 import astropy.units as pq
 
+x0He = 0.1
+xH = 0.76
+
+
+def getValue(data: Any, unit: pq.UnitBase) -> np.ndarray:
+    if isinstance(data, pq.Quantity):
+        return data.to_value(unit)
+    return np.asarray(data)
+
+
+# Computes numerator * internalEnergy / (offset + sum(xFactor * x for x in xs)) in chunks,
+# so that only a few chunk sized temporaries are needed in addition to the result
+def temperatureKernel(
+    internalEnergy: pq.Quantity, numerator: pq.Quantity, offset: float, xs: Sequence[np.ndarray], xFactors: Sequence[float]
+) -> pq.Quantity:
+    factor = (numerator * internalEnergy.unit).to_value(pq.K)
+    energy = internalEnergy.value
+    result = np.empty(energy.shape, dtype=getOutputDtype(np.result_type(energy, *xs)))
+    chunkSize = bob.config.fieldChunkSize
+    denominator = np.empty(min(chunkSize, energy.shape[0]), dtype=np.float64)
+    for start in range(0, energy.shape[0], chunkSize):
+        chunk = slice(start, start + chunkSize)
+        buffer = denominator[: len(energy[chunk])]
+        buffer.fill(offset)
+        for x, xFactor in zip(xs, xFactors):
+            buffer += xFactor * x[chunk]
+        np.divide(energy[chunk], buffer, out=buffer)
+        np.multiply(buffer, factor, out=result[chunk], casting="same_kind")
+    return pq.Quantity(result, pq.K, copy=False)
+
+
+def getSgchemTemperature(internalEnergy: pq.Quantity, xH2: Any, xHP: Any) -> pq.Quantity:
+    # T = (gamma - 1) * u * mu / kB with mu = rho / n_tot. The density cancels.
+    numerator = (gamma - 1.0) * (1.0 + 4.0 * x0He) * protonMass / kB
+    return temperatureKernel(
+        internalEnergy, numerator, 1.0 + x0He, [getValue(xH2, pq.dimensionless_unscaled), getValue(xHP, pq.dimensionless_unscaled)], [-1.0, 1.0]
+    )
+
+
+def getTngTemperature(internalEnergy: pq.Quantity, electronAbundance: Any) -> pq.Quantity:
+    numerator = (gamma - 1.0) * 4.0 * protonMass / kB
+    return temperatureKernel(internalEnergy, numerator, 1.0 + 3.0 * xH, [getValue(electronAbundance, pq.dimensionless_unscaled)], [4.0 * xH])
+
 
 class Temperature(Field):
-    def getData(self, snapshot: Snapshot) -> np.ndarray:
-        density = BasicField("Density").getData(snapshot)
+    persistent = True
+
+    def inputs(self, snapshot: Snapshot) -> Sequence[Field]:
+        if snapshot.sim.params["SGCHEM"]:
+            return [BasicField("InternalEnergy"), BasicField("ChemicalAbundances", 0), BasicField("ChemicalAbundances", 1)]
+        else:
+            return [BasicField("InternalEnergy"), BasicField("ElectronAbundance")]
+
+    def compute(self, snapshot: Snapshot, inputs: Sequence[pq.Quantity]) -> np.ndarray:
         if snapshot.sim.params["SGCHEM"]:
-            x0He = 0.1
-            yn = density / ((1.0 + 4.0 * x0He) * protonMass)
-            en = BasicField("InternalEnergy").getData(snapshot) * density
-            xH2 = BasicField("ChemicalAbundances", 0).getData(snapshot)
-            xHP = BasicField("ChemicalAbundances", 1).getData(snapshot)
-            yntot = (1.0 + x0He - xH2 + xHP) * yn
-            mu = 1.0 / yntot
+            internalEnergy, xH2, xHP = inputs
+            return getSgchemTemperature(internalEnergy, xH2, xHP)
         else:
             print("TNG style snapshot, using ElectronAbundance")
-            en = BasicField("InternalEnergy").getData(snapshot)
-            xe = BasicField("ElectronAbundance").getData(snapshot)
-            xH = 0.76
-            mu = 4.0 / (1 + 3 * xH + 4 * xH * xe) * protonMass
-        temperature = ((gamma - 1.0) * en * mu / kB).decompose()
-        assert temperature.unit == pq.K
-        return temperature
+            internalEnergy, xe = inputs
+            return getTngTemperature(internalEnergy, xe)
 
     @property
     def niceName(self) -> str:
@@ -1,9 +1,7 @@
-import numpy as np
 import astropy.units as pq
-from astropy.cosmology import z_at_value, Cosmology
 from bob.simType import SimType
 from enum import Enum
-from typing import TYPE_CHECKING, Callable, Any
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from bob.simulation import Simulation
@@ -20,44 +18,9 @@ def scaleFactorToRedshift(scaleFactor: pq.Quantity) -> pq.Quantity:
     return 1.0 / scaleFactor - 1.0 * pq.dimensionless_unscaled
 
 
-def lin_interpolated(f: Callable[..., Any]) -> Callable[..., Any]:
-    def wrapper(values: pq.Quantity) -> pq.Quantity:
-        if values.size > 5000:
-            print("Using cached version of redshift -> age conversion for performance reasons")
-            nValues = 500
-            minValue = np.min(values)
-            maxValue = np.max(values)
-            xs = np.linspace(minValue, maxValue, nValues)
-            ys = f(xs)
-            assert np.all(np.diff(xs) > 0)
-            return np.interp(values, xs, ys)
-        else:
-            return f(values)
-
-    return wrapper
-
-
-def redshiftToAge(cosmology: Cosmology, redshift: pq.Quantity) -> pq.Quantity:
-    return lin_interpolated(lambda z: cosmology.age(z))(redshift)
-
-
-def ageToRedshift(cosmology: Cosmology, age: pq.Quantity) -> pq.Quantity:
-    return lin_interpolated(lambda a: z_at_value(cosmology.age, a))(age)
-
-
 def shiftByIcsTime(sim: "Simulation", values: pq.Quantity) -> pq.Quantity:
-    icsTime = sim.icsFile().attrs["Time"]
-    cosmology = sim.getCosmology()
-    ageIcs = redshiftToAge(cosmology, scaleFactorToRedshift(icsTime))
-    ageNow = ageIcs + values
-    if ageNow.shape == ():
-        redshiftNow = ageToRedshift(cosmology, ageNow)
-    else:
-        validTimes = np.where(ageNow < np.Infinity)
-        redshiftNow = np.ones(ageNow.shape) * np.Infinity
-        if validTimes[0].shape[0] > 0:
-            redshiftNow[validTimes] = ageToRedshift(cosmology, ageNow[validTimes])
-    return cosmology.scale_factor(redshiftNow) * pq.dimensionless_unscaled
+    tables = sim.getCosmologyTables()
+    return tables.scaleFactorAtAge(tables.age(sim.icsTime) + values)
 
 
 class TimeQuantity:
@@ -82,8 +45,7 @@ class TimeQuantity:
 
     def age(self) -> pq.Quantity:
         if self.type_ == TimeType.SCALE_FACTOR:
-            cosmology = self.sim.getCosmology()
-            return cosmology.age(self.redshift())
+            return self.sim.getCosmologyTables().age(self.values)
         raise NotImplementedError("")
 
     def time(self) -> pq.Quantity:
@@ -7,11 +7,16 @@ import logging
 from math import log10
 import numpy as np
 import astropy.units as pq
+import yaml
 
 import tracemalloc
 import os
 import linecache
 
+# The C implementations of the parser and emitter are much faster, but they are only available if PyYAML was built with libyaml
+yamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+yamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 def getCommonParentFolder(folders: List[Path]) -> Path:
     parts = (folder.parts for folder in folders)
@@ -66,14 +71,20 @@ def getFiles(folder: Path) -> Iterator[Path]:
     return (f for f in listdir(folder) if f.is_file())
 
 
+# Hidden folders are temporary and not part of the output
 def getFolderNames(folder: Path) -> Iterator[str]:
-    return (f.name for f in listdir(folder) if f.is_dir())
+    return (f.name for f in listdir(folder) if f.is_dir() and not f.name.startswith("."))
 
 
 def getFilesWithSuffix(folder: Path, suffix: str) -> Iterator[Path]:
     return (folder / f for f in os.listdir(folder) if Path(f).suffix == suffix)
 
 
+def getFileStats(filenames: List[Path]) -> List[List[int]]:
+    stats = [os.stat(f) for f in filenames]
+    return [[s.st_mtime_ns, s.st_size] for s in stats]
+
+
 def walkfiles(path: Path) -> Iterator[Path]:
     for root, dirs, files in os.walk(path):
         for f in files:
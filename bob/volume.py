@@ -1,18 +1,28 @@
 import numpy as np
-from bob.field import Field
+from typing import Sequence
+from bob.field import Field, FieldKey
 from bob.basicField import BasicField
 from bob.snapshot import Snapshot
+from bob.precision import castToFieldPrecision
 import astropy.units as pq
 
 
 class Volume(Field):
+    persistent = True
+
     def __init__(self, comoving: bool = False) -> None:
         self.comoving = comoving
 
-    def getData(self, snapshot: Snapshot) -> np.ndarray:
-        density = BasicField("Density").getData(snapshot)
-        masses = BasicField("Masses").getData(snapshot)
-        return masses / density
+    @property
+    def key(self) -> FieldKey:
+        return ("Volume", self.comoving)
+
+    def inputs(self, snapshot: Snapshot) -> Sequence[Field]:
+        return [BasicField("Density"), BasicField("Masses")]
+
+    def compute(self, snapshot: Snapshot, inputs: Sequence[pq.Quantity]) -> np.ndarray:
+        density, masses = inputs
+        return castToFieldPrecision(masses.astype(np.float64, copy=False) / density)
 
     @property
     def niceName(self) -> str:
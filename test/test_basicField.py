@@ -0,0 +1,139 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+from unittest import mock
+
+import astropy.units as pq
+import h5py
+import numpy as np
+import yaml
+
+import bob.config
+from bob.basicField import BasicField, memmapDataset
+from bob.columnCache import getColumnFolder
+from bob.fieldCache import fieldCache
+from bob.hdf5Pool import hdf5Pool
+from bob.precision import fieldPrecision
+from bob.result import saveQuantity
+from bob.util import getFileStats
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = Path(self.folder.name) / "snap.hdf5"
+        self.data = np.arange(30, dtype=np.float64).reshape(10, 3)
+        with h5py.File(self.path, "w") as f:
+            f.create_dataset("contiguous", data=self.data)
+            f.create_dataset("compressed", data=self.data, compression="gzip")
+            f.create_dataset("integer", data=np.arange(10))
+            f.create_dataset("PartType0/Masses", data=np.array([1e6, 2e6], dtype=np.float32))
+            f.create_group("Header").attrs["NumPart_ThisFile"] = np.array([2, 0, 0, 0, 0, 0])
+        self.snapshot = SimpleNamespace(
+            path=self.path,
+            filenames=[self.path],
+            sim=SimpleNamespace(folder=Path(self.folder.name), params={"UnitMass_in_g": 1.989e33}),
+            filenamesWithDataset=lambda dataset: [self.path],
+            hdf5File=hdf5Pool.get,
+            numPartThisFile=lambda filename: hdf5Pool.get(filename)["Header"].attrs["NumPart_ThisFile"],
+        )
+
+    def tearDown(self) -> None:
+        hdf5Pool.close(self.path)
+        self.folder.cleanup()
+
+    def writeSnapdir(self, counts: List[int], compressed: List[bool]) -> List[np.ndarray]:
+        folder = Path(self.folder.name) / "snapdir_000"
+        folder.mkdir()
+        self.filenames = [folder / f"snap_000.{i}.hdf5" for i in range(len(counts))]
+        pieces = []
+        start = 0
+        for filename, count, compress in zip(self.filenames, counts, compressed):
+            data = np.arange(start, start + count * 3, dtype=np.float64).reshape(count, 3) / 100.0
+            with h5py.File(filename, "w") as f:
+                f.create_dataset("PartType0/ChemicalAbundances", data=data, compression="gzip" if compress else None)
+                f.create_group("Header").attrs["NumPart_ThisFile"] = np.array([count, 0, 0, 0, 0, 0])
+            pieces.append(data)
+            start += count * 3
+        self.snapshot.path = folder
+        self.snapshot.filenames = self.filenames
+        self.snapshot.filenamesWithDataset = lambda dataset: self.filenames
+        return pieces
+
+    def test_multi_file_reads_match_concatenated_files(self) -> None:
+        pieces = self.writeSnapdir([4, 0, 5, 3], [False, False, True, False])
+        expected = np.concatenate(pieces)
+        mask = np.arange(12) % 3 != 1
+        try:
+            for index in [None, 1]:
+                field = BasicField("ChemicalAbundances", index)
+                column = expected if index is None else expected[:, index]
+                for indices in [None, np.array([11, 2, 7, 2, 0]), np.array([1, 3, 8, 9]), mask, np.s_[2:11:3], np.s_[::-2]]:
+                    data = field.readData(self.snapshot, indices)  # type: ignore
+                    assert np.array_equal(data.value, column if indices is None else column[indices])
+        finally:
+            for filename in self.filenames:
+                hdf5Pool.close(filename)
+
+    def test_get_data_with_unsorted_and_repeated_indices(self) -> None:
+        (data,) = self.writeSnapdir([6], [False])
+        indices = np.array([4, 0, 4, 2, 5, 0])
+        try:
+            for index in [None, 2]:
+                field = BasicField("ChemicalAbundances", index)
+                column = data if index is None else data[:, index]
+                assert np.array_equal(field.getData(self.snapshot, indices).value, column[indices])  # type: ignore
+                assert np.array_equal(field.getData(self.snapshot).value, column)  # type: ignore
+                # Now from the cached field
+                assert np.array_equal(field.getData(self.snapshot, indices).value, column[indices])  # type: ignore
+        finally:
+            fieldCache.removeSnapshot(str(self.snapshot.path))
+            for filename in self.filenames:
+                hdf5Pool.close(filename)
+
+    def test_threads_are_only_used_for_multiple_mapped_pieces(self) -> None:
+        self.writeSnapdir([4, 0, 5, 3], [False, False, True, False])
+        try:
+            with mock.patch("bob.basicField.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor:
+                BasicField("ChemicalAbundances").readData(self.snapshot, np.array([0, 1, 5]))  # type: ignore
+                assert executor.call_count == 0
+                BasicField("ChemicalAbundances").readData(self.snapshot)  # type: ignore
+                assert executor.call_count == 1
+        finally:
+            for filename in self.filenames:
+                hdf5Pool.close(filename)
+
+    def test_contiguous_dataset_is_mapped(self) -> None:
+        with h5py.File(self.path, "r") as f:
+            data = memmapDataset(f["contiguous"])
+        assert isinstance(data, np.memmap)
+        assert not data.flags.writeable
+        assert np.array_equal(data, self.data)
+
+    def test_other_layouts_are_not_mapped(self) -> None:
+        with h5py.File(self.path, "r") as f:
+            assert memmapDataset(f["compressed"]) is None
+            assert memmapDataset(f["integer"]) is None
+
+    def test_values_out_of_float32_range_in_cgs_are_kept(self) -> None:
+        with fieldPrecision("float32"):
+            masses = BasicField("Masses").readData(self.snapshot)  # type: ignore
+        assert np.all(np.isfinite(masses))
+        assert np.allclose(masses.to_value(pq.g), [1.989e39, 3.978e39])
+        assert np.isfinite(np.sum(masses))
+
+    def test_columns_of_lower_precision_are_only_used_in_that_precision(self) -> None:
+        columnFolder = getColumnFolder(self.snapshot)  # type: ignore
+        columnFolder.mkdir(parents=True)
+        saveQuantity(columnFolder / "PartType0_Masses", np.array([1.0, 2.0], dtype=np.float32) * pq.g)
+        with (columnFolder / bob.config.columnCacheMetadataFileName).open("w") as f:
+            yaml.dump({"stats": getFileStats([self.path]), "columns": ["PartType0_Masses"], "dtypes": {"PartType0_Masses": "float32"}}, f)
+        masses = BasicField("Masses").readData(self.snapshot)  # type: ignore
+        assert masses.dtype == np.float64
+        assert np.allclose(masses.to_value(pq.g), [1.989e39, 3.978e39])
+        with fieldPrecision("float32"):
+            masses = BasicField("Masses").readData(self.snapshot)  # type: ignore
+        assert np.array_equal(masses.to_value(pq.g), [1.0, 2.0])
@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import astropy.units as pq
+import h5py
+import numpy as np
+import yaml
+
+import bob.config
+from bob.basicField import BasicField
+from bob.columnCache import ColumnCache, getColumnFolder
+from bob.convert import convertSnapshot
+from bob.hdf5Pool import hdf5Pool
+from bob.precision import fieldPrecision
+from bob.result import saveQuantity
+from bob.util import getFileStats
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        path = Path(self.folder.name) / "output" / "snap_000.hdf5"
+        path.parent.mkdir()
+        path.write_bytes(b"snapshot")
+        self.snapshot = SimpleNamespace(sim=SimpleNamespace(folder=Path(self.folder.name)), path=path, filenames=[path])
+        columnFolder = getColumnFolder(self.snapshot)  # type: ignore
+        columnFolder.mkdir(parents=True)
+        saveQuantity(columnFolder / "PartType0_Density", np.arange(5.0) * pq.g / pq.cm**3)
+        with (columnFolder / bob.config.columnCacheMetadataFileName).open("w") as f:
+            yaml.dump({"stats": getFileStats([path]), "columns": ["PartType0_Density"]}, f)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_fresh_columns_are_read(self) -> None:
+        cache = ColumnCache.open(self.snapshot)  # type: ignore
+        assert cache is not None
+        assert "PartType0_Density" in cache
+        assert "PartType0_Masses" not in cache
+        data = cache.read("PartType0_Density")
+        assert data.unit == pq.g / pq.cm**3
+        assert np.array_equal(data.value, np.arange(5.0))
+        assert cache.dtype("PartType0_Density") == np.float64
+
+    def test_columns_of_changed_snapshot_are_ignored(self) -> None:
+        self.snapshot.path.write_bytes(b"rewritten snapshot")
+        assert ColumnCache.open(self.snapshot) is None  # type: ignore
+
+    def test_dtype_is_read_from_metadata(self) -> None:
+        metadataFile = getColumnFolder(self.snapshot) / bob.config.columnCacheMetadataFileName  # type: ignore
+        with metadataFile.open("w") as f:
+            yaml.dump({"stats": getFileStats([self.snapshot.path]), "columns": ["PartType0_Density"], "dtypes": {"PartType0_Density": "float32"}}, f)
+        cache = ColumnCache.open(self.snapshot)  # type: ignore
+        assert cache is not None
+        assert cache.dtype("PartType0_Density") == np.float32
+
+    def test_large_values_are_not_cast_to_float32(self) -> None:
+        path = Path(self.folder.name) / "output" / "snap_001.hdf5"
+        with h5py.File(path, "w") as f:
+            f.create_dataset("PartType0/Masses", data=np.array([1e6, 2e6]))
+            f.create_group("Header").attrs["NumPart_ThisFile"] = np.array([2, 0, 0, 0, 0, 0])
+        snapshot = SimpleNamespace(
+            path=path,
+            filenames=[path],
+            sim=SimpleNamespace(folder=Path(self.folder.name), params={"UnitMass_in_g": 1.989e33}),
+            filenamesWithDataset=lambda dataset: [path],
+            hdf5File=hdf5Pool.get,
+            numPartThisFile=lambda filename: hdf5Pool.get(filename)["Header"].attrs["NumPart_ThisFile"],
+            close=lambda: hdf5Pool.close(path),
+        )
+        convertSnapshot(snapshot, ["Masses"], np.dtype(np.float64))  # type: ignore
+        with fieldPrecision("float32"):
+            fromColumns = BasicField("Masses").readData(snapshot)  # type: ignore
+            fromHdf5 = BasicField("Masses").readHdf5Data(snapshot)  # type: ignore
+        hdf5Pool.close(path)
+        assert np.all(np.isfinite(fromColumns))
+        assert np.array_equal(fromColumns.to_value(pq.g), fromHdf5.to_value(pq.g))
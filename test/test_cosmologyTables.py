@@ -0,0 +1,23 @@
+import unittest
+
+import astropy.units as pq
+import numpy as np
+from astropy.cosmology import FlatLambdaCDM
+
+from bob.cosmologyTables import getCosmologyTables, maxRelativeError
+
+
+class Test(unittest.TestCase):
+    def test_tables_match_astropy(self) -> None:
+        tables = getCosmologyTables(67.0, 0.3, 0.05)
+        cosmology = FlatLambdaCDM(H0=67.0, Om0=0.3, Ob0=0.05)
+        scaleFactors = np.random.default_rng(0).uniform(0.01, 1.0, 50)
+        ages = tables.age(scaleFactors)
+        assert np.allclose(ages.to_value(pq.Gyr), cosmology.age(1.0 / scaleFactors - 1.0).to_value(pq.Gyr), rtol=maxRelativeError)
+        assert np.allclose(tables.scaleFactorAtAge(ages).value, scaleFactors, rtol=10 * maxRelativeError)
+        assert tables.lookbackTime(1.0) == 0.0 * pq.Gyr
+        assert np.allclose(tables.age(5e-5).to_value(pq.Gyr), cosmology.age(1.0 / 5e-5 - 1.0).to_value(pq.Gyr))
+
+    def test_tables_are_shared(self) -> None:
+        assert getCosmologyTables(67.0, 0.3, 0.05) is getCosmologyTables(67.0, 0.3, 0.05)
+        assert getCosmologyTables(67.0, 0.3, 0.05) is not getCosmologyTables(70.0, 0.3, 0.05)
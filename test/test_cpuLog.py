@@ -0,0 +1,63 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import bob.config
+import bob.cpuLog
+from bob.cpuLog import CpuLog, parseBlock, readCpuLog, readLastBlock
+
+
+def cpuBlock(step: int, time: float, timers: dict[str, float]) -> str:
+    total = sum(timers.values())
+    lines = [
+        f"Step {step}, Time: {time}, CPUs: 4, MultiDomains: 8, HighestActiveTimeBin: 20",
+        "                          diff               cumulative",
+        f"total                     0.01  100.0%       {total:.2f}  100.0%",
+    ]
+    for name, cumTime in timers.items():
+        lines.append(f"  {name:24}0.00    0.0%       {cumTime:.2f}    0.0%")
+        lines.append(f"    {name}_sub              0.00    0.0%       {cumTime / 2:.2f}    0.0%")
+    return "\n".join(lines) + "\n\n"
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.simFolder = Path(self.folder.name)
+        self.cpuFile = self.simFolder / bob.config.cpuLogFile
+        self.cpuFile.write_text("".join(cpuBlock(step, step * 0.1, {"treegrav": step, "sweep": 2 * step}) for step in range(100)))
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_last_block(self) -> None:
+        tailChunkSize = bob.cpuLog.tailChunkSize
+        bob.cpuLog.tailChunkSize = 100
+        try:
+            total, entries = parseBlock(readLastBlock(self.cpuFile))
+        finally:
+            bob.cpuLog.tailChunkSize = tailChunkSize
+        assert total.cumTime.value == 297.0
+        assert [(entry.name, entry.cumTime.value) for entry in entries] == [("treegrav", 99.0), ("sweep", 198.0)]
+
+    def test_only_appended_blocks_are_parsed(self) -> None:
+        cpuLog = readCpuLog(self.simFolder, self.cpuFile)
+        assert np.array_equal(cpuLog.steps, np.arange(100))
+        assert cpuLog.names == ["total", "treegrav", "sweep"]
+        assert np.array_equal(cpuLog.cumTimes[:, 2], 2 * np.arange(100))
+        block = cpuBlock(100, 10.0, {"treegrav": 100, "sweep": 200, "voronoi": 5})
+        with self.cpuFile.open("a") as f:
+            f.write(block[:50])
+        cpuLog = readCpuLog(self.simFolder, self.cpuFile)
+        assert len(cpuLog.steps) == 100
+        with self.cpuFile.open("a") as f:
+            f.write(block[50:])
+        cpuLog = readCpuLog(self.simFolder, self.cpuFile)
+        loaded = CpuLog.load(self.simFolder / bob.config.cpuLogCacheFileName)
+        assert loaded is not None
+        assert loaded.position.offset == len(self.cpuFile.read_bytes())
+        assert cpuLog.names == loaded.names == ["total", "treegrav", "sweep", "voronoi"]
+        assert np.array_equal(cpuLog.cumTimes[-1], [305.0, 100.0, 200.0, 5.0])
+        assert np.isnan(loaded.cumTimes[0, 3])
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Sequence
+
+import astropy.units as pq
+import numpy as np
+
+import bob.config
+from bob.derivedFieldCache import DerivedFieldCache
+from bob.field import Field
+from bob.fieldEvaluation import evaluateFields
+
+
+class ExpensiveField(Field):
+    persistent = True
+
+    def __init__(self, log: List[int]) -> None:
+        self.log = log
+
+    def compute(self, snapshot: object, inputs: Sequence[pq.Quantity]) -> pq.Quantity:  # type: ignore[override]
+        self.log.append(1)
+        return np.arange(4.0) * pq.K
+
+    @property
+    def niceName(self) -> str:
+        return "Expensive"
+
+    @property
+    def symbol(self) -> str:
+        return "E"
+
+    @property
+    def unit(self) -> pq.Quantity:
+        return pq.K
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        path = Path(self.folder.name) / "output" / "snap_000.hdf5"
+        path.parent.mkdir()
+        path.write_bytes(b"snapshot")
+        self.snapshot = SimpleNamespace(sim=SimpleNamespace(folder=Path(self.folder.name)), path=path, filenames=[path])
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_fields_are_computed_once(self) -> None:
+        log: List[int] = []
+        (first,) = evaluateFields(self.snapshot, [ExpensiveField(log)])  # type: ignore
+        (second,) = evaluateFields(self.snapshot, [ExpensiveField(log)])  # type: ignore
+        assert log == [1]
+        assert second.unit == pq.K
+        assert np.array_equal(first.value, second.value)
+        self.snapshot.path.write_bytes(b"rewritten snapshot")
+        evaluateFields(self.snapshot, [ExpensiveField(log)])  # type: ignore
+        assert log == [1, 1]
+
+    def test_least_recently_used_entries_are_evicted(self) -> None:
+        cache = DerivedFieldCache(Path(self.folder.name) / "cache")
+        oldSize = bob.config.derivedFieldCacheSize
+        bob.config.derivedFieldCacheSize = 4000
+        try:
+            cache.add("a", np.zeros(200) * pq.K)
+            cache.add("b", np.zeros(200) * pq.K)
+            # b was used less recently than a
+            os.utime(Path(self.folder.name) / "cache" / "b.npy", ns=(0, 0))
+            cache.add("c", np.zeros(200) * pq.K)
+        finally:
+            bob.config.derivedFieldCacheSize = oldSize
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
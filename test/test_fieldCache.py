@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import astropy.units as pq
+
+import bob.config
+from bob.fieldCache import FieldCache
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.fieldCacheSize = bob.config.fieldCacheSize
+        bob.config.fieldCacheSize = 2 * 80
+
+    def tearDown(self) -> None:
+        bob.config.fieldCacheSize = self.fieldCacheSize
+
+    def test_least_recently_used_field_is_evicted(self) -> None:
+        cache = FieldCache()
+        keys = [("snap", 0, name, None, "float64") for name in ["Density", "Masses", "Coordinates"]]
+        for key in keys[:2]:
+            cache.add(key, np.zeros(10) * pq.g)
+        assert cache.get(keys[0]) is not None
+        cache.add(keys[2], np.zeros(10) * pq.g)
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[2]) is not None
+        assert cache.size == 2 * 80
+        assert cache.hits == 3
+        assert cache.misses == 1
+
+    def test_cached_fields_are_read_only(self) -> None:
+        cache = FieldCache()
+        key = ("snap", 0, "Density", None, "float64")
+        cache.add(key, np.zeros(10) * pq.g)
+        data = cache.get(key)
+        assert data is not None
+        try:
+            data[0] = 1.0 * pq.g
+        except ValueError:
+            pass
+        else:
+            assert False
+
+    def test_fields_larger_than_budget_are_not_stored(self) -> None:
+        cache = FieldCache()
+        key = ("snap", 0, "Density", None, "float64")
+        cache.add(key, np.zeros(100) * pq.g)
+        assert len(cache) == 0
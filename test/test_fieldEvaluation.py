@@ -0,0 +1,76 @@
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List, Sequence
+
+import astropy.units as pq
+import numpy as np
+
+from bob.field import Field, FieldKey
+from bob.fieldEvaluation import evaluateFields, getEvaluationOrder, loadFields, releaseFields
+
+
+class CountingField(Field):
+    def __init__(self, name: str, inputFields: Sequence[Field], log: List[str]) -> None:
+        self.name = name
+        self.inputFields = inputFields
+        self.log = log
+
+    @property
+    def key(self) -> FieldKey:
+        return ("CountingField", self.name)
+
+    def inputs(self, snapshot: object) -> Sequence[Field]:  # type: ignore[override]
+        return self.inputFields
+
+    def compute(self, snapshot: object, inputs: Sequence[pq.Quantity]) -> pq.Quantity:  # type: ignore[override]
+        self.log.append(self.name)
+        return sum(inputs, np.ones(3) * pq.dimensionless_unscaled)
+
+    @property
+    def niceName(self) -> str:
+        return self.name
+
+    @property
+    def symbol(self) -> str:
+        return self.name
+
+    @property
+    def unit(self) -> pq.Quantity:
+        return pq.dimensionless_unscaled
+
+
+class Test(unittest.TestCase):
+    def test_shared_inputs_are_computed_once(self) -> None:
+        log: List[str] = []
+        density = CountingField("density", [], log)
+        masses = CountingField("masses", [], log)
+        volume = CountingField("volume", [CountingField("density", [], log), masses], log)
+        temperature = CountingField("temperature", [density], log)
+        (volumeData, temperatureData) = evaluateFields(None, [volume, temperature])  # type: ignore
+        assert sorted(log) == ["density", "masses", "temperature", "volume"]
+        assert log.index("density") < log.index("volume")
+        assert np.all(volumeData.value == 3.0)
+        assert np.all(temperatureData.value == 2.0)
+
+    def test_inputs_come_before_consumers(self) -> None:
+        log: List[str] = []
+        a = CountingField("a", [], log)
+        b = CountingField("b", [a], log)
+        c = CountingField("c", [b, a], log)
+        (order, _, inputs) = getEvaluationOrder(None, [c])  # type: ignore
+        assert order == [("CountingField", "a"), ("CountingField", "b"), ("CountingField", "c")]
+        assert inputs[("CountingField", "c")] == [("CountingField", "b"), ("CountingField", "a")]
+
+    def test_loaded_fields_are_not_computed_again(self) -> None:
+        log: List[str] = []
+        density = CountingField("density", [], log)
+        temperature = CountingField("temperature", [density], log)
+        snapshot = SimpleNamespace(path=Path("snap_000.hdf5"))
+        loadFields(snapshot, [temperature])  # type: ignore
+        (temperatureData,) = evaluateFields(snapshot, [temperature])  # type: ignore
+        assert log == ["density", "temperature"]
+        assert np.all(temperatureData.value == 2.0)
+        releaseFields(snapshot)  # type: ignore
+        evaluateFields(snapshot, [temperature])  # type: ignore
+        assert log == ["density", "temperature", "density", "temperature"]
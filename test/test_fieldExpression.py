@@ -0,0 +1,55 @@
+import unittest
+from types import SimpleNamespace
+
+import astropy.units as pq
+import numpy as np
+
+from bob.allFields import getFieldByName, getFieldChoices
+from bob.constants import protonMass
+from bob.fieldExpression import FieldExpression, getFieldFileName
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.snapshot = SimpleNamespace(H0=70 * pq.km / pq.s / pq.Mpc)
+
+    def evaluate(self, expression: str, *inputs: pq.Quantity) -> pq.Quantity:
+        field = getFieldByName(expression)
+        assert isinstance(field, FieldExpression)
+        return field.compute(self.snapshot, list(inputs))  # type: ignore
+
+    def test_expression_matches_quantity_arithmetic(self) -> None:
+        density = np.array([1.0, 2.0, 3.0]) * pq.g / pq.cm**3
+        abundance = np.array([0.5, 0.25, 0.1]) * pq.dimensionless_unscaled
+        density.flags.writeable = False
+        result = self.evaluate("Density * ChemicalAbundances[1] / protonMass", density, abundance)
+        expected = density * abundance / protonMass
+        assert np.allclose(result.to_value(pq.cm**-3), expected.to_value(pq.cm**-3))
+        assert np.array_equal(density.value, [1.0, 2.0, 3.0])
+
+    def test_sums_convert_units(self) -> None:
+        masses = np.array([1.0, 2.0]) * pq.g
+        result = self.evaluate("2 * Masses + Masses", masses)
+        assert np.allclose(result.to_value(pq.g), [3.0, 6.0])
+        result = self.evaluate("sqrt(Masses ** 2)", masses)
+        assert np.allclose(result.to_value(pq.g), [1.0, 2.0])
+
+    def test_incompatible_units_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            self.evaluate("Density + Masses", np.ones(2) * pq.g / pq.cm**3, np.ones(2) * pq.g)
+        with self.assertRaises(ValueError):
+            self.evaluate("log10(Masses)", np.ones(2) * pq.g)
+
+    def test_choices_accept_expressions(self) -> None:
+        choices = getFieldChoices()
+        assert "Temperature" in choices
+        assert "Density / protonMass" in choices
+        assert "Temperatur" not in choices
+        assert "Temperatur * 2" not in choices
+        assert "ChemicalAbundance[1] * 2" not in choices
+        assert "InternalEnergy * Masses" in choices
+        assert "Density / (" not in choices
+        assert "__import__('os')" not in choices
+        # The units of the data are only known once the expression is evaluated
+        assert "Density + Masses" in choices
+        assert getFieldFileName("Density * Abundance1 / protonMass") == "Density_Abundance1_protonMass"
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import h5py
+
+import bob.config
+from bob.hdf5Pool import Hdf5Pool
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.paths = [Path(self.folder.name) / f"{i}.hdf5" for i in range(3)]
+        for path in self.paths:
+            with h5py.File(path, "w") as f:
+                f.create_group("Header")
+        self.maxOpenHdf5Files = bob.config.maxOpenHdf5Files
+        bob.config.maxOpenHdf5Files = 2
+
+    def tearDown(self) -> None:
+        bob.config.maxOpenHdf5Files = self.maxOpenHdf5Files
+        self.folder.cleanup()
+
+    def test_least_recently_used_file_is_closed(self) -> None:
+        pool = Hdf5Pool()
+        f0 = pool.get(self.paths[0])
+        f1 = pool.get(self.paths[1])
+        assert pool.get(self.paths[0]) is f0
+        pool.get(self.paths[2])
+        assert len(pool) == 2
+        assert f0.id.valid
+        assert not f1.id.valid
+        pool.closeAll()
+        assert not f0.id.valid
+
+    def test_closed_file_is_reopened(self) -> None:
+        pool = Hdf5Pool()
+        f0 = pool.get(self.paths[0])
+        pool.close(self.paths[0])
+        assert not f0.id.valid
+        assert "Header" in pool.get(self.paths[0])
+        pool.closeAll()
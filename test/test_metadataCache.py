@@ -0,0 +1,24 @@
+import pickle
+import unittest
+from typing import List
+
+from bob.metadataCache import MetadataCache
+
+
+class Test(unittest.TestCase):
+    def test_values_are_computed_once_per_version(self) -> None:
+        calls: List[int] = []
+
+        def compute() -> int:
+            calls.append(1)
+            return len(calls)
+
+        cache = MetadataCache()
+        assert cache.get("value", compute) == 1
+        assert cache.get("value", compute) == 1
+        assert cache.get("versioned", compute, version=1) == 2
+        assert cache.get("versioned", compute, version=1) == 2
+        assert cache.get("versioned", compute, version=2) == 3
+        cache.invalidate("value")
+        assert cache.get("value", compute) == 4
+        assert pickle.loads(pickle.dumps(cache)).get("value", compute) == 4
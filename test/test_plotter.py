@@ -0,0 +1,182 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+import astropy.units as pq
+import matplotlib.pyplot as plt
+import numpy as np
+
+import bob.config
+from bob.fieldCache import fieldCache
+from bob.plotConfig import PlotConfig
+from bob.plotter import Plotter, cleanUpInterruptedSave, getResultFingerprint, replaceFolder
+from bob.postprocessingFunctions import SetFn, SnapFn
+from bob.result import Result
+from bob.simulation import Simulation
+from bob.simulationSet import SimulationSet
+
+
+class CountingFn(SetFn):
+    name = "counting"
+
+    def __init__(self, config: PlotConfig) -> None:
+        super().__init__(config)
+        self.calls: List[str] = []
+
+    def post(self, sims: SimulationSet) -> Result:
+        self.calls.append("post")
+        result = Result()
+        result.values = np.arange(3.0) * pq.s
+        return result
+
+    def plot(self, plt: plt.axes, result: Result) -> None:
+        self.calls.append("plot")
+
+
+class RecordingSnapFn(SnapFn):
+    name = "recording"
+
+    def __init__(self, config: PlotConfig, calls: List[str], fail: bool = False) -> None:
+        super().__init__(config)
+        self.calls = calls
+        self.fail = fail
+
+    def post(self, sim: Simulation, snap: Any) -> Result:
+        self.calls.append(f"{self.config['label']} {snap.name}")
+        if self.fail:
+            raise RuntimeError("post failed")
+        result = Result()
+        result.values = np.arange(3.0) * pq.s
+        return result
+
+    def plot(self, plt: plt.axes, result: Result) -> None:
+        pass
+
+
+class RecordingSnapshot:
+    def __init__(self, folder: Path, name: str, calls: List[str]) -> None:
+        self.name = name
+        self.path = folder / f"snap_{name}.hdf5"
+        self.path.write_text("snapshot")
+        self.filenames = [self.path]
+        self.calls = calls
+
+    def close(self) -> None:
+        self.calls.append(f"close {self.name}")
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.inputFile = Path(self.folder.name) / "input.hdf5"
+        self.inputFile.write_text("snapshot")
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def runFn(self, fn: CountingFn, force: bool = False, sims: Optional[List[Simulation]] = None) -> List[str]:
+        plotter = Plotter(Path(self.folder.name), SimulationSet(Simulation, []), False, False, force)
+        fn.calls = []
+        fingerprint = getResultFingerprint(fn, sims or [], [self.inputFile])
+        plotter.runPostAndPlot(fn, "counting_0", lambda: fn.post(SimulationSet(Simulation, [])), fn.plot, fingerprint)
+        return fn.calls
+
+    def test_unchanged_results_are_skipped(self) -> None:
+        fn = CountingFn(PlotConfig({}))
+        assert self.runFn(fn) == ["post", "plot"]
+        assert self.runFn(fn) == []
+
+    def test_changed_inputs_are_recomputed(self) -> None:
+        fn = CountingFn(PlotConfig({}))
+        self.runFn(fn)
+        mtime = self.inputFile.stat().st_mtime
+        os.utime(self.inputFile, (mtime + 10, mtime + 10))
+        assert self.runFn(fn) == ["post", "plot"]
+
+    def test_force_recomputes(self) -> None:
+        fn = CountingFn(PlotConfig({}))
+        self.runFn(fn)
+        assert self.runFn(fn, force=True) == ["post", "plot"]
+
+    def test_stored_result_is_replotted_without_image(self) -> None:
+        fn = CountingFn(PlotConfig({}))
+        self.runFn(fn)
+        (Path(self.folder.name) / "pics" / "counting" / "counting_0.png").unlink()
+        assert self.runFn(fn) == ["plot"]
+
+    def test_files_in_config_are_part_of_fingerprint(self) -> None:
+        catalogFolder = Path(self.folder.name) / "groups"
+        catalogFolder.mkdir()
+        (catalogFolder / "fof_subhalo_tab_000.hdf5").write_text("catalog")
+        fn = CountingFn(PlotConfig({"groupCatalogFolder": str(catalogFolder)}))
+        fingerprint = getResultFingerprint(fn, [], [self.inputFile])
+        (catalogFolder / "fof_subhalo_tab_000.hdf5").write_text("new catalog")
+        assert getResultFingerprint(fn, [], [self.inputFile]) != fingerprint
+
+    def test_files_in_sim_params_are_part_of_fingerprint(self) -> None:
+        sourcesFile = Path(self.folder.name) / "sources.txt"
+        sourcesFile.write_text("1 1 1 1e50")
+        sim = Simulation(Path(self.folder.name), {"TestSrcFile": "sources.txt", "OutputDir": "output"})
+        fn = CountingFn(PlotConfig({}))
+        assert self.runFn(fn, sims=[sim]) == ["post", "plot"]
+        assert self.runFn(fn, sims=[sim]) == []
+        mtime = sourcesFile.stat().st_mtime
+        os.utime(sourcesFile, (mtime + 10, mtime + 10))
+        assert self.runFn(fn, sims=[sim]) == ["post", "plot"]
+
+    def runSnapFns(self, functions: List[RecordingSnapFn], snapshots: List[RecordingSnapshot]) -> List[List[str]]:
+        numProcesses = bob.config.numProcesses
+        bob.config.numProcesses = 1
+        try:
+            plotter = Plotter(Path(self.folder.name), SimulationSet(Simulation, []), True, False)
+            sim = SimpleNamespace(folder=Path(self.folder.name), params={})
+            items = {fn: [(f"{fn.config['label']}_{snap.name}", sim, snap) for snap in snapshots] for fn in functions}
+            plotter.getSnapFnItems = lambda function: items[function]  # type: ignore
+            return [[name.qualifiedName for name in names] for names in plotter.runSnapFns(functions)]  # type: ignore
+        finally:
+            bob.config.numProcesses = numProcesses
+
+    def test_snapshot_functions_run_snapshot_by_snapshot(self) -> None:
+        calls: List[str] = []
+        snapshots = [RecordingSnapshot(Path(self.folder.name), name, calls) for name in ["000", "001"]]
+        functions = [RecordingSnapFn(PlotConfig({"label": label}), calls) for label in ["a", "b"]]
+        names = self.runSnapFns(functions, snapshots)
+        assert names == [["a_000", "a_001"], ["b_000", "b_001"]]
+        assert calls == ["a 000", "b 000", "close 000", "a 001", "b 001", "close 001"]
+
+    def test_snapshot_is_released_if_function_fails(self) -> None:
+        calls: List[str] = []
+        snapshot = RecordingSnapshot(Path(self.folder.name), "000", calls)
+        key = (str(snapshot.path), 0, "Density", None, "float64")
+        fieldCache.add(key, np.zeros(3) * pq.g)
+        functions = [RecordingSnapFn(PlotConfig({"label": "a"}), calls, fail=True), RecordingSnapFn(PlotConfig({"label": "b"}), calls)]
+        with self.assertRaises(RuntimeError):
+            self.runSnapFns(functions, [snapshot])
+        assert calls == ["a 000", "close 000"]
+        assert key not in fieldCache.entries
+
+    def test_interrupted_save_is_cleaned_up(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            target = Path(folder) / "slice_0_005"
+            (Path(folder) / ".slice_0_005.12345").mkdir()
+            (Path(folder) / ".slice_0_005.old.12345").mkdir()
+            (Path(folder) / ".slice_0_005.old.12345" / "result.npy").write_text("old")
+            (Path(folder) / ".slice_0_0050.123").mkdir()
+            cleanUpInterruptedSave(target)
+            assert (target / "result.npy").read_text() == "old"
+            assert sorted(os.listdir(folder)) == [".slice_0_0050.123", "slice_0_005"]
+
+    def test_replace_folder(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            target = Path(folder) / "slice_0_005"
+            source = Path(folder) / ".slice_0_005.1"
+            target.mkdir()
+            (target / "result.npy").write_text("old")
+            source.mkdir()
+            (source / "result.npy").write_text("new")
+            replaceFolder(source, target)
+            assert (target / "result.npy").read_text() == "new"
+            assert os.listdir(folder) == ["slice_0_005"]
@@ -0,0 +1,44 @@
+import os
+import unittest
+
+import bob.config
+from bob.fieldCache import fieldCache
+from bob.pool import runInPool
+
+
+def getProcess(offset: int, item: int) -> tuple[int, int]:
+    return item + offset, os.getpid()
+
+
+def lookUpField(item: int) -> int:
+    fieldCache.get(("snap", 0, "Density", None, "float64"))
+    return fieldCache.maxSize
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.oldNumProcesses = bob.config.numProcesses
+        self.oldFieldCacheSize = bob.config.fieldCacheSize
+
+    def tearDown(self) -> None:
+        bob.config.numProcesses = self.oldNumProcesses
+        bob.config.fieldCacheSize = self.oldFieldCacheSize
+
+    def test_results_are_in_order(self) -> None:
+        bob.config.numProcesses = 2
+        results = runInPool(getProcess, list(range(20)), 100)
+        assert [value for (value, _) in results] == list(range(100, 120))
+
+    def test_serial_without_workers(self) -> None:
+        bob.config.numProcesses = 1
+        results = runInPool(getProcess, [1, 2], 0)
+        assert results == [(1, os.getpid()), (2, os.getpid())]
+
+    def test_workers_share_field_cache_budget_and_report_statistics(self) -> None:
+        bob.config.numProcesses = 2
+        bob.config.fieldCacheSize = 1000
+        misses = fieldCache.misses
+        results = runInPool(lookUpField, list(range(6)))
+        assert results == [500] * 6
+        assert fieldCache.misses == misses + 6
+        assert fieldCache.maxSize == 1000
@@ -0,0 +1,23 @@
+import unittest
+
+import astropy.units as pq
+import numpy as np
+
+import bob.config
+from bob.precision import castToFieldPrecision, fieldPrecision
+
+
+class Test(unittest.TestCase):
+    def test_data_is_cast_within_context(self) -> None:
+        data = np.ones(3) * pq.g
+        with fieldPrecision("float32"):
+            assert castToFieldPrecision(data).dtype == np.float32
+            assert castToFieldPrecision(data).unit == pq.g
+            assert castToFieldPrecision(np.arange(3)).dtype == np.arange(3).dtype
+        assert bob.config.precision == "float64"
+        assert castToFieldPrecision(data).dtype == np.float64
+
+    def test_data_out_of_range_is_not_cast(self) -> None:
+        data = np.array([1.0, 1e50]) * pq.cm**3
+        with fieldPrecision("float32"):
+            assert castToFieldPrecision(data).dtype == np.float64
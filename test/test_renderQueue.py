@@ -0,0 +1,48 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import List
+
+from bob.plotter import PlotName, Plotter
+from bob.renderQueue import RenderQueue
+from bob.simulationSet import SimulationSet
+from bob.simulation import Simulation
+
+
+def fail() -> None:
+    raise ValueError("rendering failed")
+
+
+class Test(unittest.TestCase):
+    def test_submission_is_bounded(self) -> None:
+        queue = RenderQueue(1, 1)
+        done: List[None] = []
+        queue.submit(time.sleep, (0.5,), done.append)
+        queue.submit(time.sleep, (0.0,), done.append)
+        # The second plot can only be submitted once the first one is rendered
+        assert len(done) == 1
+        queue.finish()
+        assert len(done) == 2
+
+    def test_errors_are_raised_in_finish(self) -> None:
+        queue = RenderQueue(1, 2)
+        done: List[None] = []
+        queue.submit(fail, (), done.append)
+        with self.assertRaises(ValueError):
+            queue.finish()
+        assert done == []
+
+    def test_only_rendered_plots_are_journaled(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            plotter = Plotter(Path(folder), SimulationSet(Simulation, []), False, False)
+            plotter.openJournal(Path("plot.bob"), False)
+            plotter.renderQueue = RenderQueue(1, 2)
+            # There is no saved result to render the plot from
+            name = PlotName(plotter.picFolder, "slice", "slice_0")
+            plotter.render(name)
+            with self.assertRaises(FileNotFoundError):
+                plotter.finishRendering()
+            assert plotter.journal is not None
+            assert not plotter.journal.contains(name.journalEntry())
+            plotter.closeJournal()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from bob.runJournal import RunJournal
+
+
+class Test(unittest.TestCase):
+    def test_resume(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            filename = Path(folder) / "pics" / "slices.journal"
+            journal = RunJournal.open(filename, resume=True)
+            assert journal is not None
+            journal.add("slice/slice_0_005")
+            journal.add("slice/slice_0_006")
+            journal.close()
+            with filename.open("a") as f:
+                f.write("slice/slice_0_0")
+            journal = RunJournal.open(filename, resume=True)
+            assert journal is not None
+            assert journal.contains("slice/slice_0_006")
+            assert not journal.contains("slice/slice_0_0")
+            journal.add("slice/slice_0_007")
+            journal.close()
+            journal = RunJournal.open(filename, resume=True)
+            assert journal is not None
+            assert journal.entries == {"slice/slice_0_005", "slice/slice_0_006", "slice/slice_0_007"}
+            journal.close()
+            journal = RunJournal.open(filename, resume=False)
+            assert journal is not None
+            assert not journal.contains("slice/slice_0_005")
+            journal.close()
+            assert filename.read_text() == ""
+
+    def test_journal_of_running_run_is_kept(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            filename = Path(folder) / "pics" / "slices.journal"
+            journal = RunJournal.open(filename, resume=False)
+            assert journal is not None
+            journal.add("slice/slice_0_005")
+            assert RunJournal.open(filename, resume=False) is None
+            assert filename.read_text() == "slice/slice_0_005\n"
+            journal.close()
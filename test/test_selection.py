@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from bob.selection import Selection
+
+
+def readSplit(selection: Selection, data: np.ndarray, counts: list) -> np.ndarray:
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    files = [data[start:end] for (start, end) in zip(offsets, offsets[1:])]
+    pieces = [f[s] for (f, s) in zip(files, selection.splitByFile(counts))]
+    return selection.restoreOrder(np.concatenate(pieces))
+
+
+class Test(unittest.TestCase):
+    def check(self, indices: object, counts: list = [7, 0, 12, 5]) -> None:
+        data = np.arange(sum(counts)) * 10
+        selection = Selection.fromIndices(indices, data.shape[0])
+        assert selection is not None
+        expected = data[indices]  # type: ignore
+        assert np.array_equal(readSplit(selection, data, counts), expected)
+
+    def test_full_selection(self) -> None:
+        self.check(...)
+        self.check(slice(None))
+
+    def test_strided_slices(self) -> None:
+        self.check(slice(3, 20, 4))
+        self.check(slice(None, None, -3))
+        self.check(slice(23, 100))
+
+    def test_index_arrays(self) -> None:
+        self.check(np.array([0, 1, 2, 3]))
+        self.check(np.array([2, 9, 10, 11, 20]))
+        self.check(np.array([15, 2, 2, -1, 9]))
+        self.check(np.array([], dtype=int))
+        self.check(np.where(np.arange(24) % 5 == 0))
+
+    def test_boolean_mask(self) -> None:
+        self.check(np.arange(24) % 3 == 1)
+
+    def test_regular_arrays_become_slices(self) -> None:
+        selection = Selection.fromIndices(np.arange(4, 20, 3), 24)
+        assert selection is not None
+        assert selection.indices == slice(4, 20, 3)
+        assert selection.inverse is None
+
+    def test_unsupported_indices(self) -> None:
+        assert Selection.fromIndices(np.zeros((2, 2), dtype=int), 24) is None
@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import bob.config
+from bob.simulationCatalog import SimulationCatalog
+from bob.simulationSet import Simulation, getSimsFromFolder
+
+
+def writeParams(folder: Path, sources: int, omegaBaryon: float, label: str) -> None:
+    folder.mkdir(exist_ok=True)
+    with (folder / "bobParams.yaml").open("w") as f:
+        f.write(f"SX_SOURCES:\n  Int: {sources}\nOmegaBaryon:\n  Float:\n    - {omegaBaryon}\nsimLabel:\n  Str: {label}\n")
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.simSetFolder = Path(self.folder.name)
+        writeParams(self.simSetFolder / "0", 10, 0.04, "a")
+        writeParams(self.simSetFolder / "1", 10, 0.05, "b")
+        writeParams(self.simSetFolder / "2", 9, 0.05, "c")
+        self.oldNumProcesses = bob.config.numProcesses
+        bob.config.numProcesses = 1
+
+    def tearDown(self) -> None:
+        bob.config.numProcesses = self.oldNumProcesses
+        self.folder.cleanup()
+
+    def test_queries(self) -> None:
+        sims = getSimsFromFolder(Simulation, self.simSetFolder)
+        assert [sim.params["SX_SOURCES"] for sim in sims] == [10, 10, 9]
+        catalog = SimulationCatalog.open(self.simSetFolder)
+
+        def query(query: str) -> list:
+            return sorted(folder.name for folder in catalog.query(query))
+
+        assert query("SX_SOURCES == 10") == ["0", "1"]
+        assert query("SX_SOURCES = 10, OmegaBaryon > 0.045") == ["1"]
+        assert query("OmegaBaryon >= 0.05 and simLabel != a") == ["1", "2"]
+        assert query("simLabel == c") == ["2"]
+        assert query("") == ["0", "1", "2"]
+        with self.assertRaises(ValueError):
+            query("simLabel < c")
+
+    def test_changed_params_are_reparsed(self) -> None:
+        getSimsFromFolder(Simulation, self.simSetFolder)
+        writeParams(self.simSetFolder / "2", 10, 0.05, "changed label")
+        sims = getSimsFromFolder(Simulation, self.simSetFolder)
+        assert sims[2].params["simLabel"] == "changed label"
+        assert len(SimulationCatalog.open(self.simSetFolder).query("SX_SOURCES == 10")) == 3
@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+from bob.simulation import Simulation
+from bob.snapshotIndex import SnapshotIndex
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.paths = [Path(self.folder.name) / f"snap_{i:03}.hdf5" for i in range(3)]
+        for i, path in enumerate(self.paths):
+            self.writeSnapshot(path, float(i))
+        self.indexFile = Path(self.folder.name) / "snapshotIndex.yaml"
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def writeSnapshot(self, path: Path, time: float, redshift: float = 0.0) -> None:
+        with h5py.File(path, "w") as f:
+            header = f.create_group("Header")
+            header.attrs["Time"] = time
+            header.attrs["Redshift"] = redshift
+            header.attrs["NumPart_Total"] = np.array([10, 0, 0, 0, 0, 0], dtype=np.uint32)
+            header.attrs["NumPart_Total_HighWord"] = np.array([1, 0, 0, 0, 0, 0], dtype=np.uint32)
+
+    def test_index_is_read_from_disk(self) -> None:
+        entries = SnapshotIndex(self.indexFile).update(self.paths)
+        assert [entry.time for entry in entries] == [0.0, 1.0, 2.0]
+        assert entries[0].numPartTotal[0] == 10 + 2**32
+        index = SnapshotIndex(self.indexFile)
+        index.entries = index.load(self.paths[0].parent)
+        assert [index.entries[path].time for path in self.paths] == [0.0, 1.0, 2.0]
+
+    def test_changed_and_new_snapshots_are_updated(self) -> None:
+        SnapshotIndex(self.indexFile).update(self.paths[:2])
+        self.writeSnapshot(self.paths[1], 5.0)
+        entries = SnapshotIndex(self.indexFile).update(self.paths)
+        assert [entry.time for entry in entries] == [0.0, 5.0, 2.0]
+
+    def test_snapshot_at_redshift_is_found_from_index(self) -> None:
+        for path, redshift in zip(self.paths, [10.0, 6.0, 3.0]):
+            self.writeSnapshot(path, 1.0 / (1.0 + redshift), redshift)
+        params = {
+            "OutputDir": ".",
+            "NumFilesPerSnapshot": 1,
+            "SnapshotFileBase": "snap",
+            "ComovingIntegrationOn": True,
+            "UnitLength_in_cm": 1.0,
+            "BoxSize": 1.0,
+        }
+        sim = Simulation(Path(self.folder.name), params)
+        assert [snap.metadata.redshift for snap in sim.snapshots] == [10.0, 6.0, 3.0]  # type: ignore
+        assert sim.getSnapshotAtRedshift(5.0).path == self.paths[1]
+        assert sim.getSnapshotAtRedshift(0.0).path == self.paths[2]
+        assert sim.getSnapshotAtRedshift(100.0).path == self.paths[0]
@@ -0,0 +1,36 @@
+import unittest
+from types import SimpleNamespace
+
+import astropy.units as pq
+import numpy as np
+
+from bob.spatialIndex import Box, Slab, Sphere, SpatialIndex
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        # Three unit cubes next to each other along the x axis
+        lower = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0]])
+        upper = lower + 1.0
+        starts = np.array([0, 10, 20])
+        self.index = SpatialIndex([], starts, starts + 10, lower, upper, pq.cm)
+
+    def toValue(self, quantity: pq.Quantity) -> np.ndarray:
+        return quantity.to_value(pq.cm)
+
+    def test_regions_intersect_boxes(self) -> None:
+        lower, upper = self.index.lower, self.index.upper
+        box = Box(np.array([0.5, 0.5, 0.5]) * pq.cm, np.array([1.5, 0.6, 0.6]) * pq.cm)
+        assert list(box.intersects(lower, upper, self.toValue)) == [True, True, False]
+        sphere = Sphere(np.array([3.5, 0.5, 0.5]) * pq.cm, 0.6 * pq.cm)
+        assert list(sphere.intersects(lower, upper, self.toValue)) == [False, False, True]
+        slab = Slab(0, 1.2 * pq.cm, 1.3 * pq.cm)
+        assert list(slab.intersects(lower, upper, self.toValue)) == [False, True, False]
+
+    def test_indices_of_intersecting_blocks(self) -> None:
+        slab = Slab(0, 0.5 * pq.cm, 0.6 * pq.cm)
+        sphere = Sphere(np.array([25.0, 5.0, 5.0]) * pq.mm, 1.0 * pq.mm)
+        snapshot = SimpleNamespace(H0=70 * pq.km / pq.s / pq.Mpc)
+        indices = self.index.getIndices(snapshot, [slab, sphere])  # type: ignore
+        assert np.array_equal(indices, np.concatenate([np.arange(0, 10), np.arange(20, 30)]))
+        assert self.index.getIndices(snapshot, []).shape == (0,)  # type: ignore
@@ -0,0 +1,56 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+import bob.config
+from bob.plots.ionization import IonizationData
+from bob.simulation import Simulation
+from bob.sweepLog import SweepLog, readSweepLog
+
+
+def sweepLine(time: float, ionization: float) -> str:
+    return (
+        f"SWEEP: Time {time}: Volume Av. H ionization: {ionization}, Mass Av. H ionization: {ionization}, "
+        f"Volume av. Ionization rate: 1.5e-13, Mass av. Ionization rate: 2.5e-13\n"
+    )
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.simFolder = Path(self.folder.name)
+        self.logFile = self.simFolder / bob.config.arepoLogFile
+        self.logFile.write_text("Starting\n" + sweepLine(0.1, 0.5) + "other output\n" + sweepLine(0.2, 0.25))
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_only_appended_lines_are_parsed(self) -> None:
+        columns = readSweepLog(self.simFolder)
+        assert np.array_equal(columns["time"], [0.1, 0.2])
+        assert np.array_equal(columns["volumeAv"], [0.5, 0.25])
+        assert np.array_equal(columns["massAvRate"], [2.5e-13, 2.5e-13])
+        with self.logFile.open("a") as f:
+            f.write(sweepLine(0.3, 0.125) + sweepLine(0.4, 0.0)[:20])
+        columns = readSweepLog(self.simFolder)
+        assert np.array_equal(columns["time"], [0.1, 0.2, 0.3])
+        sweepLog = SweepLog.load(self.simFolder / bob.config.sweepLogCacheFileName)
+        assert sweepLog is not None
+        assert sweepLog.position.offset == len(self.logFile.read_bytes()) - 20
+        with self.logFile.open("a") as f:
+            f.write(sweepLine(0.4, 0.0)[20:])
+        assert np.array_equal(readSweepLog(self.simFolder)["time"], [0.1, 0.2, 0.3, 0.4])
+
+    def test_rewritten_log_is_parsed_again(self) -> None:
+        readSweepLog(self.simFolder)
+        self.logFile.write_text("Restarted\n" + sweepLine(0.7, 0.5) + "more output than before\n")
+        assert np.array_equal(readSweepLog(self.simFolder)["time"], [0.7])
+
+    def test_run_without_records_gives_empty_curve(self) -> None:
+        self.logFile.write_text("Starting\n")
+        sim = Simulation(self.simFolder, {"ComovingIntegrationOn": 0})
+        data = IonizationData([[sim]])  # type: ignore
+        assert len(data.time[0]) == 0
+        assert len(data.volumeAv[0]) == 0
@@ -0,0 +1,45 @@
+import unittest
+
+import astropy.units as pq
+import numpy as np
+
+import bob.config
+from bob.constants import gamma, kB, protonMass
+from bob.precision import fieldPrecision
+from bob.temperature import getSgchemTemperature, getTngTemperature
+
+
+class Test(unittest.TestCase):
+    def setUp(self) -> None:
+        self.oldChunkSize = bob.config.fieldChunkSize
+        bob.config.fieldChunkSize = 7
+        rng = np.random.default_rng(0)
+        self.density = rng.uniform(1e-28, 1e-22, 100) * pq.g / pq.cm**3
+        self.internalEnergy = rng.uniform(1e10, 1e14, 100) * pq.cm**2 / pq.s**2
+        self.xH2 = rng.uniform(0.0, 0.5, 100) * pq.dimensionless_unscaled
+        self.xHP = rng.uniform(0.0, 1.0, 100) * pq.dimensionless_unscaled
+
+    def tearDown(self) -> None:
+        bob.config.fieldChunkSize = self.oldChunkSize
+
+    def test_sgchem_temperature_matches_quantity_formula(self) -> None:
+        x0He = 0.1
+        yn = self.density / ((1.0 + 4.0 * x0He) * protonMass)
+        en = self.internalEnergy * self.density
+        mu = 1.0 / ((1.0 + x0He - self.xH2 + self.xHP) * yn)
+        expected = ((gamma - 1.0) * en * mu / kB).decompose()
+        temperature = getSgchemTemperature(self.internalEnergy, self.xH2, self.xHP)
+        assert temperature.unit == pq.K
+        assert np.allclose(temperature.value, expected.to_value(pq.K), rtol=1e-12)
+
+    def test_tng_temperature_matches_quantity_formula(self) -> None:
+        xH = 0.76
+        mu = 4.0 / (1 + 3 * xH + 4 * xH * self.xHP) * protonMass
+        expected = ((gamma - 1.0) * self.internalEnergy * mu / kB).decompose()
+        temperature = getTngTemperature(self.internalEnergy.to(pq.km**2 / pq.s**2), self.xHP)
+        assert np.allclose(temperature.value, expected.to_value(pq.K), rtol=1e-12)
+
+    def test_precision_of_result(self) -> None:
+        with fieldPrecision("float32"):
+            temperature = getTngTemperature(self.internalEnergy, self.xHP)
+        assert temperature.dtype == np.float32
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import astropy.units as pq
+
+from bob.plotConfig import PlotConfig
+from bob.plots.timePlots import SnapshotValues, TimePlot
+from bob.simulation import Simulation
+from bob.snapshot import Snapshot
+
+
+class MassOverTime(TimePlot):
+    name = "massOverTime"
+    quantityConfigKeys = ["field"]
+
+    def getQuantity(self, sim: Simulation, snap: Snapshot) -> pq.Quantity:
+        return 1.0 * pq.g
+
+
+class Test(unittest.TestCase):
+    def test_only_new_snapshots_are_computed(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            filename = Path(folder) / "data" / "snapshotValues.pickle"
+            computed = []
+
+            def compute(name: str) -> tuple[pq.Quantity, pq.Quantity]:
+                computed.append(name)
+                return (1.0 * pq.Myr, [2.0 * pq.K])
+
+            values = SnapshotValues.load(filename)
+            values.get("a", lambda: compute("a"))
+            values.get("b", lambda: compute("b"))
+            values.save()
+            values = SnapshotValues.load(filename)
+            assert values.get("b", lambda: compute("b")) == (1.0 * pq.Myr, [2.0 * pq.K])
+            values.get("c", lambda: compute("c"))
+            values.save()
+            assert computed == ["a", "b", "c"]
+            assert sorted(SnapshotValues.load(filename).stored) == ["b", "c"]
+
+    def test_snapshot_fingerprint_depends_only_on_quantity_config_and_files(self) -> None:
+        with tempfile.TemporaryDirectory() as folder:
+            filename = Path(folder) / "snap_000.hdf5"
+            filename.write_text("snapshot")
+            snap = SimpleNamespace(path=filename, filenames=[filename])
+
+            def getFingerprint(config: dict) -> str:
+                return MassOverTime(PlotConfig({"field": "Masses", **config})).getSnapshotFingerprint("z", snap)  # type: ignore
+
+            fingerprint = getFingerprint({})
+            assert getFingerprint({"xLim": [10, 5], "yLabel": "mass"}) == fingerprint
+            assert getFingerprint({"field": "Density"}) != fingerprint
+            mtime = filename.stat().st_mtime
+            os.utime(filename, (mtime + 10, mtime + 10))
+            assert getFingerprint({}) != fingerprint